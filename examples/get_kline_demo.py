@@ -9,6 +9,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data import RealtimeDataFetcher, MarketDataManager
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -43,13 +44,17 @@ def demo_basic_kline():
         # 显示最近5天
         print("📈 最近5个交易日:")
         recent = df.tail(5)
+        # 列一次性取成 ndarray 按位置遍历，避免 iterrows 逐行装箱成 Series
+        ohlcv = recent[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+        changes = (recent['change_pct'].to_numpy(dtype=float) if 'change_pct' in recent.columns
+                   else np.zeros(len(recent)))
+        dates = recent.index.strftime('%Y-%m-%d')
         
-        for idx, row in recent.iterrows():
-            change_pct = row.get('change_pct', 0)
+        for day, (o, h, l, c, v), change_pct in zip(dates, ohlcv, changes):
             direction = "📈" if change_pct >= 0 else "📉"
-            print(f"\n   {idx.strftime('%Y-%m-%d')} {direction}")
-            print(f"   开: {row['open']:.2f}  高: {row['high']:.2f}  低: {row['low']:.2f}  收: {row['close']:.2f}")
-            print(f"   涨跌幅: {change_pct:+.2f}%  成交量: {row['volume']/10000:.0f}万手")
+            print(f"\n   {day} {direction}")
+            print(f"   开: {o:.2f}  高: {h:.2f}  低: {l:.2f}  收: {c:.2f}")
+            print(f"   涨跌幅: {change_pct:+.2f}%  成交量: {v/10000:.0f}万手")
         
         return df
     else:
@@ -108,14 +113,16 @@ def demo_strategy_data():
             # 显示最近3天（包括今天）
             recent = df.tail(3)
             print("📊 最近3天（含今日实时）:")
+            ohlcv = recent[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+            dates = recent.index.strftime('%Y-%m-%d')
+            today = datetime.now().strftime('%Y-%m-%d')
             
-            for idx, row in recent.iterrows():
-                is_today = idx.date() == datetime.now().date()
-                tag = "🔴 今日实时" if is_today else ""
+            for day, (o, h, l, c, v) in zip(dates, ohlcv):
+                tag = "🔴 今日实时" if day == today else ""
                 
-                print(f"\n   {idx.strftime('%Y-%m-%d')} {tag}")
-                print(f"   开: {row['open']:.2f}  高: {row['high']:.2f}  低: {row['low']:.2f}  收: {row['close']:.2f}")
-                print(f"   成交量: {row['volume']/10000:.0f}万手")
+                print(f"\n   {day} {tag}")
+                print(f"   开: {o:.2f}  高: {h:.2f}  低: {l:.2f}  收: {c:.2f}")
+                print(f"   成交量: {v/10000:.0f}万手")
             
             # 计算简单指标
             print("\n📈 技术指标（MA）:")
@@ -76,17 +76,11 @@ class MarketRegimeEngine:
                 return cached_df
         
         try:
-            from ..data.bs_fuse import is_fused, record_fail, record_success
+            from ..data.bs_fuse import is_fused, record_success
             if is_fused():
                 logger.debug("[MarketRegime] Baostock已全局熔断，跳过")
                 return None
-            import baostock as bs
-            
-            lg = bs.login()
-            if lg.error_code != '0':
-                record_fail(f"market_regime login: {lg.error_msg}")
-                logger.error(f"[MarketRegime] baostock登录失败: {lg.error_msg}")
-                return None
+            from ..data.provider.adapters import bs_query_history_k
             
             # 计算日期范围
             end_date = datetime.now().strftime("%Y-%m-%d")
@@ -101,8 +95,8 @@ class MarketRegimeEngine:
             
             bs_code = index_code_map.get(self.index_symbol, f'sh.{self.index_symbol}')
             
-            # 获取指数数据
-            rs = bs.query_history_k_data_plus(
+            # 获取指数数据（共用进程级 baostock 会话，不再每次 login/logout）
+            rs = bs_query_history_k(
                 bs_code,
                 "date,open,high,low,close",
                 start_date=start_date,
@@ -112,15 +106,11 @@ class MarketRegimeEngine:
             
             if rs.error_code != '0':
                 logger.error(f"[MarketRegime] 获取指数数据失败: {rs.error_msg}")
-                bs.logout()
                 return None
             
             # 转换为DataFrame
-            data_list = []
-            while rs.next():
-                data_list.append(rs.get_row_data())
+            data_list = rs.rows
             
-            bs.logout()
             record_success()
             
             if not data_list:
@@ -145,10 +135,6 @@ class MarketRegimeEngine:
             
         except Exception as e:
             logger.error(f"[MarketRegime] 获取指数数据失败: {e}")
-            try:
-                bs.logout()
-            except:
-                pass
             return None
     
     def classify_regime(self, df: Optional[pd.DataFrame] = None) -> pd.Series:
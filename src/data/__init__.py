@@ -14,11 +14,14 @@
 """
 
 from .fetchers.realtime_data import RealtimeDataFetcher, MarketDataManager
-from .fetchers.fundamental_fetcher import FundamentalFetcher, create_mock_fundamental_data
+from .fetchers.fundamental_fetcher import (
+    FundamentalFetcher, create_mock_fundamental_data, create_mock_fundamental_arrays,
+)
 
 __all__ = [
     'RealtimeDataFetcher',
     'MarketDataManager',
     'FundamentalFetcher',
     'create_mock_fundamental_data',
+    'create_mock_fundamental_arrays',
 ]
@@ -8,7 +8,9 @@
 """
 
 from .realtime_data import RealtimeDataFetcher, MarketDataManager
-from .fundamental_fetcher import FundamentalFetcher, create_mock_fundamental_data
+from .fundamental_fetcher import (
+    FundamentalFetcher, create_mock_fundamental_data, create_mock_fundamental_arrays,
+)
 from .data_prefetch import (
     fetch_stock_daily,
     get_realtime_snapshot_sina,
@@ -27,6 +29,7 @@ __all__ = [
     'MarketDataManager',
     'FundamentalFetcher',
     'create_mock_fundamental_data',
+    'create_mock_fundamental_arrays',
     'fetch_stock_daily',
     'get_realtime_snapshot_sina',
     'get_realtime_snapshot_eastmoney',
@@ -14,6 +14,9 @@ from typing import Callable, List, Optional, Tuple
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.quote_parse import parse_sina_kline, to_float64
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +108,12 @@ def _eastmoney_secid(code: str) -> str:
 
 
 # ------ 主数据源：Sina 日线 K 线（与文档 money.finance.sina KLine 一致）------
+# 模块级会话：逐只拉取时复用 keep-alive 连接，省去每只股票一次 TCP+TLS 握手；
+# 连接池按多线程预取的并发度放大
+_SINA_SESSION = requests.Session()
+_SINA_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+
 def _fetch_sina_kline(code: str, datalen: int, timeout: int = STOCK_DAILY_TIMEOUT) -> pd.DataFrame:
     """Sina 日线 K 线：CN_MarketData.getKLineData。"""
     prefix, sym = _market_prefix(code)
@@ -122,21 +131,14 @@ def _fetch_sina_kline(code: str, datalen: int, timeout: int = STOCK_DAILY_TIMEOU
     }
     
     try:
-        r = requests.get(
+        r = _SINA_SESSION.get(
             url,
             params={"symbol": symbol, "scale": "240", "ma": "no", "datalen": str(datalen)},
             headers=headers,
             timeout=timeout,
         )
         r.raise_for_status()  # 检查HTTP状态码
-        data = json.loads(r.text) if r.text and r.text.strip() else None
-        if not data:
-            return pd.DataFrame()
-        df = pd.DataFrame(data)
-        df["date"] = pd.to_datetime(df["day"])
-        for c in ["open", "high", "low", "close", "volume"]:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-        return df
+        return parse_sina_kline(r.content)
     except Exception as e:
         logger.debug(f"新浪K线获取失败 {code}: {e}")
         return pd.DataFrame()
@@ -269,8 +271,7 @@ def _fetch_tencent_kline(code: str, datalen: int, timeout: int = STOCK_DAILY_TIM
         df = pd.DataFrame(rows, columns=["date", "open", "close", "high", "low", "volume", "_"])[:datalen]
         df = df[["date", "open", "high", "low", "close", "volume"]]
         df["date"] = pd.to_datetime(df["date"])
-        for c in ["open", "high", "low", "close", "volume"]:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
+        df = to_float64(df, ["open", "high", "low", "close", "volume"])
         return df.dropna(subset=["close"])
     except Exception as e:
         logger.debug("腾讯日线 %s 失败: %s", code, e)
@@ -377,12 +378,8 @@ def fetch_index_daily(
             "Referer": "https://finance.sina.com.cn/",
         }
         r = requests.get(url, params={"symbol": symbol, "scale": "240", "ma": "no", "datalen": str(datalen)}, headers=headers, timeout=timeout)
-        data = json.loads(r.text) if r.text and r.text.strip() else None
-        if data:
-            df = pd.DataFrame(data)
-            df["date"] = pd.to_datetime(df["day"])
-            for c in ["open", "high", "low", "close", "volume"]:
-                df[c] = pd.to_numeric(df[c], errors="coerce")
+        df = parse_sina_kline(r.content)
+        if not df.empty:
             df = df[["date", "open", "high", "low", "close", "volume"]].dropna(subset=["close"])
             if len(df) >= min_bars:
                 logger.info("[fetch_index_daily] sina 获取 %s 成功: %d 条", pure_code, len(df))
@@ -408,8 +405,7 @@ def fetch_index_daily(
                     df = pd.DataFrame(rows, columns=["date", "open", "close", "high", "low", "volume", "_"])[:datalen]
                     df = df[["date", "open", "high", "low", "close", "volume"]]
                     df["date"] = pd.to_datetime(df["date"])
-                    for c in ["open", "high", "low", "close", "volume"]:
-                        df[c] = pd.to_numeric(df[c], errors="coerce")
+                    df = to_float64(df, ["open", "high", "low", "close", "volume"])
                     df = df.dropna(subset=["close"])
                     if len(df) >= min_bars:
                         logger.info("[fetch_index_daily] tencent 获取 %s 成功: %d 条", pure_code, len(df))
@@ -421,32 +417,24 @@ def fetch_index_daily(
 
     # 数据源4: baostock（需要登录，受全局熔断保护）
     try:
-        from ..bs_fuse import is_fused, record_fail, record_success
+        from ..bs_fuse import is_fused, record_success
         if is_fused():
             raise RuntimeError("Baostock 已全局熔断")
-        import baostock as bs
-        lg = bs.login()
-        if lg.error_code != '0':
-            record_fail(f"data_prefetch login: {lg.error_msg}")
-            raise RuntimeError(f"baostock登录失败: {lg.error_msg}")
+        from ..provider.adapters import bs_query_history_k
         ts_code = f"{prefix}.{pure_code}"
         end_d = datetime.now()
         start_d = end_d - timedelta(days=min(datalen + 60, 1200))
-        rs = bs.query_history_k_data_plus(
+        rs = bs_query_history_k(
             ts_code, "date,open,high,low,close,volume",
             start_date=start_d.strftime("%Y-%m-%d"), end_date=end_d.strftime("%Y-%m-%d"),
             frequency="d", adjustflag="3"
         )
-        rows = []
-        while (rs.error_code == '0') and rs.next():
-            rows.append(rs.get_row_data())
-        bs.logout()
+        rows = rs.rows
         if rows:
             record_success()
             df = pd.DataFrame(rows, columns=["date", "open", "high", "low", "close", "volume"])
             df["date"] = pd.to_datetime(df["date"])
-            for c in ["open", "high", "low", "close", "volume"]:
-                df[c] = pd.to_numeric(df[c], errors="coerce")
+            df = to_float64(df, ["open", "high", "low", "close", "volume"])
             df = df.dropna(subset=["close"])
             if len(df) >= min_bars:
                 logger.info("[fetch_index_daily] baostock 获取 %s 成功: %d 条", pure_code, len(df))
@@ -1174,6 +1174,30 @@ class FundamentalFetcher:
 # 便捷函数
 # ============================================================
 
+def create_mock_fundamental_arrays(close: np.ndarray,
+                                   pe_range: tuple = (5, 50),
+                                   pb_range: tuple = (0.5, 5.0),
+                                   random_seed: int = 42) -> Dict[str, np.ndarray]:
+    """
+    按收盘价数组生成模拟 PE/PB 数组 {'pe_ttm', 'pb'}（仅用于测试流程）
+
+    与日线行对齐，调用方可直接作为列放进 DataFrame 构造，无需再按日期 merge。
+    ⚠️ 同 create_mock_fundamental_data，基于整段价格归一化，隐含未来信息。
+    """
+    rng = np.random.RandomState(random_seed)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    price_normalized = (close - close.min()) / (close.max() - close.min() + 1e-6)
+    pe_base = pe_range[0] + price_normalized * (pe_range[1] - pe_range[0])
+    noise = rng.normal(0, (pe_range[1] - pe_range[0]) * 0.1, n)
+    pe = np.clip(pe_base + noise, pe_range[0], pe_range[1])
+
+    pb_base = pb_range[0] + price_normalized * (pb_range[1] - pb_range[0])
+    noise = rng.normal(0, (pb_range[1] - pb_range[0]) * 0.1, n)
+    pb = np.clip(pb_base + noise, pb_range[0], pb_range[1])
+    return {'pe_ttm': pe, 'pb': pb}
+
+
 def create_mock_fundamental_data(daily_df: pd.DataFrame,
                                  pe_range: tuple = (5, 50),
                                  pb_range: tuple = (0.5, 5.0),
@@ -1183,16 +1207,7 @@ def create_mock_fundamental_data(daily_df: pd.DataFrame,
     
     ⚠️ 警告: 此函数基于整个DataFrame的价格生成PE/PB，隐含未来信息。
     """
-    rng = np.random.RandomState(random_seed)
-    df = daily_df.copy()
-    
-    price_normalized = (df['close'] - df['close'].min()) / (df['close'].max() - df['close'].min() + 1e-6)
-    pe_base = pe_range[0] + price_normalized * (pe_range[1] - pe_range[0])
-    noise = rng.normal(0, (pe_range[1] - pe_range[0]) * 0.1, len(df))
-    df['pe_ttm'] = np.clip(pe_base + noise, pe_range[0], pe_range[1])
-    
-    pb_base = pb_range[0] + price_normalized * (pb_range[1] - pb_range[0])
-    noise = rng.normal(0, (pb_range[1] - pb_range[0]) * 0.1, len(df))
-    df['pb'] = np.clip(pb_base + noise, pb_range[0], pb_range[1])
-    
-    return df[['date', 'pe_ttm', 'pb']]
+    arrays = create_mock_fundamental_arrays(daily_df['close'].to_numpy(),
+                                            pe_range, pb_range, random_seed)
+    return pd.DataFrame({'date': daily_df['date'].to_numpy(), **arrays},
+                        index=daily_df.index)
@@ -7,16 +7,22 @@
 
 from datetime import datetime, timedelta
 from typing import Optional
+import io
 import os
 import threading
+from collections import namedtuple
+from contextlib import contextmanager
 from pathlib import Path
 
 import pandas as pd
 
+from src.utils.quote_parse import json_loads, parse_sina_hq_fields
 from .base import KlineAdapter, KLINE_COLUMNS
 
 
-_bs_lock = threading.Lock()
+# baostock 全进程只有一个会话、一条 socket，且不是线程安全的：
+# login 与每次查询（含逐页读结果）都在这把锁内进行。可重入，bs_session 内可再调 _ensure_bs_login
+_bs_lock = threading.RLock()
 _bs_logged_in = False
 
 
@@ -49,6 +55,59 @@ def _ensure_bs_login():
             raise
 
 
+_BS_NO_LOGIN = "10001001"  # baostock 错误码：用户未登录（会话被别处 logout 或服务端过期）
+
+
+@contextmanager
+def bs_session():
+    """
+    持有 _bs_lock 并确保已 login：块内可直接调用 baostock 的查询函数并读完结果。
+
+    进程内所有 baostock 访问都应经过这里（或 bs_query_history_k），
+    不要自行 bs.login()/bs.logout()，否则会登出其他调用方正在用的会话。
+    """
+    with _bs_lock:
+        _ensure_bs_login()
+        yield
+
+
+BsQueryResult = namedtuple('BsQueryResult', ['error_code', 'error_msg', 'fields', 'rows'])
+
+
+def bs_query_history_k(*args, **kwargs) -> BsQueryResult:
+    """
+    在进程级 baostock 会话上执行 query_history_k_data_plus，返回读完的全部行。
+
+    只在第一次使用时 login，之后各调用方共用同一会话、不再各自 login/logout；
+    仅当服务端返回「未登录」时才重新 login 一次并重试。
+    查询、重试与逐页读取结果都在 _bs_lock 内完成，多线程调用不会交错使用同一 socket。
+    """
+    global _bs_logged_in
+    import baostock as bs
+    with bs_session():
+        rs = bs.query_history_k_data_plus(*args, **kwargs)
+        if rs.error_code == _BS_NO_LOGIN:
+            _bs_logged_in = False
+            _ensure_bs_login()
+            rs = bs.query_history_k_data_plus(*args, **kwargs)
+        rows = []
+        while rs.error_code == '0' and rs.next():
+            rows.append(rs.get_row_data())
+        return BsQueryResult(rs.error_code, rs.error_msg, list(getattr(rs, 'fields', []) or []), rows)
+
+
+def _sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    按 date 升序并重建 RangeIndex。
+
+    各数据源（东财 / 新浪 / 本地缓存）返回的 K 线本就按时间升序，
+    已有序时跳过 O(N log N) 的排序，只在乱序时才排。
+    """
+    if not df['date'].is_monotonic_increasing:
+        df = df.sort_values('date')
+    return df.reset_index(drop=True)
+
+
 def _ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
     """保证输出仅含标准列且类型正确。"""
     if df is None or df.empty:
@@ -242,10 +301,26 @@ class AkshareETFAdapter(KlineAdapter):
                 return None
         df['date'] = pd.to_datetime(df['date'], errors='coerce')
         df = df[['date'] + required].dropna(subset=['close', 'date'])
-        df = df.sort_values('date').reset_index(drop=True)
+        df = _sort_by_date(df)
         return df if len(df) >= 10 else None
 
 
+_EM_KLINE_NAMES = ["date", "open", "close", "high", "low", "volume"]
+
+
+def _parse_em_klines(klines: list) -> pd.DataFrame:
+    """
+    东方财富 klines（每行 "日期,开,收,高,低,量,..." 字符串）整体交给 pandas C 解析器，
+    取前 6 列；round_trip 与逐行 float() 的结果逐位一致。
+    """
+    return pd.read_csv(
+        io.StringIO("\n".join(klines)), header=None,
+        usecols=range(len(_EM_KLINE_NAMES)), names=_EM_KLINE_NAMES,
+        dtype={c: "float64" for c in _EM_KLINE_NAMES[1:]},
+        float_precision="round_trip",
+    )
+
+
 class Push2hisETFAdapter(KlineAdapter):
     """东方财富 push2his 直接接口，专用于 ETF，作为 akshare_etf 的备用。"""
 
@@ -285,25 +360,15 @@ class Push2hisETFAdapter(KlineAdapter):
 
         try:
             resp = requests.get(url, params=params, headers=headers, timeout=timeout)
-            data = resp.json()
+            # 直接解析响应字节（有 orjson 时走 C 解析器），不经 resp.json() 的文本解码
+            data = json_loads(resp.content)
             if not data.get("data") or not data["data"].get("klines"):
                 logger.debug(f"[Push2hisETFAdapter] {code} 返回数据为空")
                 return pd.DataFrame()
 
-            rows = []
-            for k in data["data"]["klines"]:
-                parts = k.split(",")
-                rows.append({
-                    "date": parts[0],
-                    "open": float(parts[1]),
-                    "close": float(parts[2]),
-                    "high": float(parts[3]),
-                    "low": float(parts[4]),
-                    "volume": float(parts[5]),
-                })
-            df = pd.DataFrame(rows)
+            df = _parse_em_klines(data["data"]["klines"])
             df["date"] = pd.to_datetime(df["date"])
-            df = df[KLINE_COLUMNS].sort_values("date").reset_index(drop=True)
+            df = _sort_by_date(df[KLINE_COLUMNS])
             logger.debug(f"[Push2hisETFAdapter] {code} 获取成功: {len(df)} 条")
             return df if len(df) >= 10 else pd.DataFrame()
         except Exception as e:
@@ -380,7 +445,7 @@ class LocalCacheAdapter(KlineAdapter):
                             if all(c in df.columns for c in required):
                                 df = df[required].copy()
                                 df['date'] = pd.to_datetime(df['date'])
-                                df = df.sort_values('date').reset_index(drop=True)
+                                df = _sort_by_date(df)
                                 logger.info(f"[LocalCacheAdapter] {code} 从本地缓存加载成功: {latest.name}, {len(df)} 条")
                                 return df
                     except Exception as e:
@@ -391,8 +456,77 @@ class LocalCacheAdapter(KlineAdapter):
         return pd.DataFrame()
 
 
+_BS_CACHE_DIR = Path(__file__).resolve().parents[3] / 'mycache' / 'baostock_kline'
+_BS_CACHE_TTL = 20 * 3600  # 秒；盘后数据次日才会变，20 小时足够覆盖同一天内的反复调参
+
+
+def _bs_range_complete(df: pd.DataFrame, end_str: str) -> bool:
+    """
+    区间数据是否已定型、可以缓存复用。
+
+    截止日在今天之前的区间不会再变；截止到今天（或以后）的区间，
+    只有已包含今天这根 K 线（baostock 收盘后才发布当日日线）才算完整，
+    否则盘中/发布前取到的缺当日数据会在当天余下时间里一直被复用。
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    if end_str < today:
+        return True
+    if df is None or df.empty:
+        return False
+    return pd.Timestamp(df['date'].iloc[-1]) >= pd.Timestamp(today)
+
+
+def _bs_cache_get(code: str, start_str: str, end_str: str) -> Optional[pd.DataFrame]:
+    """
+    查 baostock 磁盘缓存：每只代码只保留一个文件 {code}_{start}_{end}.parquet，
+    截止日相同且起点不晚于本次请求的（更长的）缓存可切片复用；
+    截止到今天的缓存缺当日 K 线时视为未命中（见 _bs_range_complete）。
+    过期文件在这里顺手删除，目录不会随每日运行无限增长。
+    """
+    import time
+
+    hit = None
+    for p in _BS_CACHE_DIR.glob(f"{code}_*.parquet"):
+        if time.time() - p.stat().st_mtime > _BS_CACHE_TTL:
+            p.unlink(missing_ok=True)
+            continue
+        _, cached_start, cached_end = p.stem.split('_')
+        if cached_end == end_str and cached_start <= start_str:
+            hit = (cached_start, p)
+    if hit is None:
+        return None
+    try:
+        df = pd.read_parquet(hit[1])
+    except Exception:
+        return None
+    if not _bs_range_complete(df, end_str):
+        return None
+    if hit[0] < start_str:
+        df = df[df['date'] >= pd.Timestamp(start_str)].reset_index(drop=True)
+    return df
+
+
+def _bs_cache_put(code: str, start_str: str, end_str: str, df: pd.DataFrame) -> None:
+    """写入本次区间并删除该代码的其他缓存文件（每只代码只保留最近一次的区间）"""
+    if not _bs_range_complete(df, end_str):
+        return
+    try:
+        _BS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _BS_CACHE_DIR / f"{code}_{start_str}_{end_str}.parquet"
+        df.to_parquet(path, index=False)
+        for p in _BS_CACHE_DIR.glob(f"{code}_*.parquet"):
+            if p != path:
+                p.unlink(missing_ok=True)
+    except Exception:
+        pass  # 写缓存失败不影响本次返回
+
+
 class BaostockStockAdapter(KlineAdapter):
-    """baostock 股票 K 线适配器：免费数据源，稳定可靠，作为股票 K 线的最后网络备用。"""
+    """
+    baostock 股票 K 线适配器：免费数据源，稳定可靠，作为股票 K 线的最后网络备用。
+    结果按代码落盘到 mycache/baostock_kline/（每只代码一个文件，记录起止日期），20 小时内重复请求直接读本地；
+    截止到今天的区间只有拿到当日 K 线后才落盘。
+    """
 
     @property
     def source_id(self) -> str:
@@ -413,9 +547,6 @@ class BaostockStockAdapter(KlineAdapter):
         code = symbol.strip()
 
         try:
-            import baostock as bs
-            _ensure_bs_login()
-
             prefix = "sh" if code.startswith(("5", "6")) else "sz"
             bs_code = f"{prefix}.{code}"
 
@@ -430,7 +561,11 @@ class BaostockStockAdapter(KlineAdapter):
                 days_back = int((datalen or 800) * 1.6)
                 start_str = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
 
-            rs = bs.query_history_k_data_plus(
+            cached = _bs_cache_get(code, start_str, end_str)
+            if cached is not None and not cached.empty:
+                return cached
+
+            rs = bs_query_history_k(
                 bs_code,
                 "date,open,high,low,close,volume",
                 start_date=start_str,
@@ -443,15 +578,14 @@ class BaostockStockAdapter(KlineAdapter):
                 logger.debug("[BaostockStockAdapter] %s 查询失败: %s", code, rs.error_msg)
                 return pd.DataFrame()
 
-            rows = []
-            while rs.next():
-                rows.append(rs.get_row_data())
-
+            rows = rs.rows
             if not rows:
                 return pd.DataFrame()
 
             df = pd.DataFrame(rows, columns=["date", "open", "high", "low", "close", "volume"])
-            return _ensure_columns(df)
+            df = _ensure_columns(df)
+            _bs_cache_put(code, start_str, end_str, df)
+            return df
 
         except Exception as e:
             logger.debug("[BaostockStockAdapter] %s 异常: %s", code, e)
@@ -480,9 +614,6 @@ class BaostockETFAdapter(KlineAdapter):
         code = symbol.strip()
 
         try:
-            import baostock as bs
-            _ensure_bs_login()
-
             if code.startswith('5') or code.startswith('6'):
                 exchange = 'sh'
             elif code.startswith('159') or code.startswith('15'):
@@ -502,7 +633,7 @@ class BaostockETFAdapter(KlineAdapter):
             else:
                 start_str = (datetime.now() - timedelta(days=1200)).strftime('%Y-%m-%d')
 
-            rs = bs.query_history_k_data_plus(
+            rs = bs_query_history_k(
                 bs_code,
                 "date,open,high,low,close,volume",
                 start_date=start_str,
@@ -515,10 +646,7 @@ class BaostockETFAdapter(KlineAdapter):
                 logger.debug("[BaostockETFAdapter] %s 查询失败: %s", code, rs.error_msg)
                 return pd.DataFrame()
 
-            rows = []
-            while rs.next():
-                rows.append(rs.get_row_data())
-
+            rows = rs.rows
             if not rows:
                 return pd.DataFrame()
 
@@ -536,16 +664,109 @@ class BaostockETFAdapter(KlineAdapter):
 # 实时行情获取（盘中拼接当日数据）
 # ============================================================
 
+_SINA_HQ_HEADERS = {
+    'Referer': 'https://finance.sina.com.cn/',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+}
+_realtime_lock = threading.Lock()
+# code -> (一行 DataFrame, 行情来源)；仅在 prefetch_realtime_bars 与 clear_realtime_cache 之间有效
+_realtime_cache = {}
+
+
+def _sina_hq_prefix(code: str) -> str:
+    return 'sh' if code.startswith(('5', '6')) else 'sz'
+
+
+def _sina_hq_bar(data_str: str, today_str: str) -> Optional[pd.DataFrame]:
+    """新浪 hq_str 引号内的字段串 → 一行 KLINE_COLUMNS，无效/停牌行情返回 None"""
+    parts = data_str.split(',')
+    if len(parts) < 32 or not parts[3]:
+        return None
+    q = parse_sina_hq_fields(parts)
+    if q['price'] <= 0:
+        return None
+    return pd.DataFrame([{
+        'date': pd.Timestamp(today_str),
+        'open': q['open'],
+        'high': q['high'],
+        'low': q['low'],
+        'close': q['price'],
+        'volume': q['volume'],
+    }])
+
+
+def prefetch_realtime_bars(codes, batch_size: int = 80) -> int:
+    """
+    通过新浪 hq.sinajs 多代码接口批量预取实时行情，写入进程内缓存。
+
+    新浪 list= 参数支持一次传入多个代码（逗号分隔），一个请求即可覆盖一批股票，
+    省去逐只请求的连接/TLS 握手开销。缓存不按时间过期，而是跟随调用方的一轮运行：
+    预取后 fetch_realtime_bar 直接使用缓存（记录来源为 sina_batch，不再走妙想/东财），
+    本轮结束时必须调用 clear_realtime_cache()。
+    返回成功写入缓存的代码数量；网络失败只记日志，调用方照常逐只降级获取。
+    """
+    import logging
+    import requests
+
+    logger = logging.getLogger(__name__)
+    codes = [str(c).zfill(6) for c in codes]
+    if not codes:
+        return 0
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    n_ok = 0
+    with requests.Session() as session:
+        session.headers.update(_SINA_HQ_HEADERS)
+        for i in range(0, len(codes), batch_size):
+            batch = codes[i:i + batch_size]
+            symbols = ','.join(_sina_hq_prefix(c) + c for c in batch)
+            try:
+                r = session.get(f'https://hq.sinajs.cn/list={symbols}', timeout=10)
+                r.encoding = 'gbk'
+            except Exception as e:
+                logger.debug("[realtime] 新浪批量 %d-%d 失败: %s", i, i + len(batch), e)
+                continue
+            parsed = {}
+            for line in r.text.splitlines():
+                # var hq_str_sh600000="...";
+                if 'hq_str_' not in line or '="' not in line:
+                    continue
+                head, _, body = line.partition('="')
+                code = head.rsplit('hq_str_', 1)[-1][2:]
+                try:
+                    df = _sina_hq_bar(body.rstrip('";'), today_str)
+                except (ValueError, IndexError):
+                    df = None
+                if df is not None:
+                    parsed[code] = (df, 'sina_batch')
+            with _realtime_lock:
+                _realtime_cache.update(parsed)
+            n_ok += len(parsed)
+    logger.debug("[realtime] 新浪批量预取 %d/%d", n_ok, len(codes))
+    return n_ok
+
+
+def clear_realtime_cache() -> None:
+    """清空 prefetch_realtime_bars 写入的实时行情缓存（一轮运行结束时调用）"""
+    with _realtime_lock:
+        _realtime_cache.clear()
+
+
 def fetch_realtime_bar(code: str) -> Optional[pd.DataFrame]:
     """
     获取单只股票/ETF的当日实时行情，返回一行标准 KLINE_COLUMNS 格式。
-    多源降级：妙想 → 东方财富push2 → 新浪hq → 返回None。
+    本轮运行已调用 prefetch_realtime_bars 时直接使用其缓存；未命中时多源降级：
+    妙想 → 东方财富push2 → 新浪hq → 返回None。
     仅在交易日盘中/盘后调用，用于拼接到历史日K线末尾。
     """
     import logging
     import requests
 
     logger = logging.getLogger(__name__)
+    with _realtime_lock:
+        hit = _realtime_cache.get(code)
+    if hit is not None:
+        logger.debug("[realtime] %s 命中预取缓存（来源: %s）", code, hit[1])
+        return hit[0].copy()
     today_str = datetime.now().strftime('%Y-%m-%d')
 
     # 源1: 妙想实时行情（稳定官方API，优先使用）
@@ -605,26 +826,12 @@ def fetch_realtime_bar(code: str) -> Optional[pd.DataFrame]:
 
     # 源3: 新浪 hq.sinajs 实时
     try:
-        prefix = 'sh' if code.startswith(('5', '6')) else 'sz'
-        url = f'https://hq.sinajs.cn/list={prefix}{code}'
-        headers = {
-            'Referer': 'https://finance.sina.com.cn/',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        }
-        r = requests.get(url, headers=headers, timeout=5)
+        url = f'https://hq.sinajs.cn/list={_sina_hq_prefix(code)}{code}'
+        r = requests.get(url, headers=_SINA_HQ_HEADERS, timeout=5)
         text = r.text.strip()
         if 'hq_str' in text and '="' in text:
-            data_str = text.split('="')[1].rstrip('";')
-            fields = data_str.split(',')
-            if len(fields) > 10 and fields[3] and float(fields[3]) > 0:
-                df = pd.DataFrame([{
-                    'date': pd.Timestamp(today_str),
-                    'open': float(fields[1]),
-                    'high': float(fields[4]),
-                    'low': float(fields[5]),
-                    'close': float(fields[3]),
-                    'volume': float(fields[8]),
-                }])
+            df = _sina_hq_bar(text.split('="')[1].rstrip('";'), today_str)
+            if df is not None:
                 return df
     except Exception as e:
         logger.debug("[realtime] 新浪 %s 失败: %s", code, e)
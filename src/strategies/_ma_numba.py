@@ -0,0 +1,118 @@
+"""
+MA 均线交叉数值内核（numba 可选）
+
+rolling_mean 按 pandas rolling(window).mean() 的递推方式实现：滑窗加入/移出各用一组
+Kahan 补偿，连续相同值直接取该值，全正/全负窗口的符号修正也照搬，结果与 pandas 逐位一致。
+ma_cross_lines 一次遍历给出 MACrossStrategy 用到的整段序列（短/长均线、斜率、乖离率），
+供回测预计算后按前缀切片复用。未安装 numba 时按纯 Python 执行，结果相同。
+
+注意不要加 fastmath：它允许重排浮点运算，会把 Kahan 补偿项优化掉。
+"""
+
+import numpy as np
+
+from src.utils._njit import njit
+
+
+@njit(cache=True)
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """与 pd.Series(x).rolling(window).mean() 逐位一致（窗口内有 NaN 时输出 NaN）"""
+    n = x.shape[0]
+    out = np.empty(n)
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    comp_add = 0.0
+    comp_rem = 0.0
+    same = 0
+    prev_value = 0.0
+    for i in range(n):
+        s = i + 1 - window
+        if s < 0:
+            s = 0
+        if i == 0 or window == 1:
+            # 窗口与上一步不重叠：从头累加
+            prev_value = x[s]
+            same = 0
+            nobs = 0
+            neg_ct = 0
+            sum_x = 0.0
+            comp_add = 0.0
+            comp_rem = 0.0
+            for j in range(s, i + 1):
+                v = x[j]
+                if v == v:
+                    nobs += 1
+                    y = v - comp_add
+                    t = sum_x + y
+                    comp_add = t - sum_x - y
+                    sum_x = t
+                    if np.signbit(v):
+                        neg_ct += 1
+                    if v == prev_value:
+                        same += 1
+                    else:
+                        same = 1
+                    prev_value = v
+        else:
+            if s > 0:
+                v = x[s - 1]
+                if v == v:
+                    nobs -= 1
+                    y = -v - comp_rem
+                    t = sum_x + y
+                    comp_rem = t - sum_x - y
+                    sum_x = t
+                    if np.signbit(v):
+                        neg_ct -= 1
+            v = x[i]
+            if v == v:
+                nobs += 1
+                y = v - comp_add
+                t = sum_x + y
+                comp_add = t - sum_x - y
+                sum_x = t
+                if np.signbit(v):
+                    neg_ct += 1
+                if v == prev_value:
+                    same += 1
+                else:
+                    same = 1
+                prev_value = v
+        if nobs >= window and nobs > 0:
+            r = sum_x / nobs
+            if same >= nobs:
+                r = prev_value
+            elif neg_ct == 0 and r < 0:
+                r = 0.0
+            elif neg_ct == nobs and r > 0:
+                r = 0.0
+            out[i] = r
+        else:
+            out[i] = np.nan
+    return out
+
+
+@njit(cache=True)
+def ma_cross_lines(close: np.ndarray, short: int, long: int):
+    """
+    返回 (短期均线, 长期均线, 短期均线日变化率, 乖离率) 四条整段序列。
+
+    变化率、乖离率与 pct_change / (s - l) / l 后把 ±inf 置 NaN 的结果一致；
+    close 需无缺失（有缺失时 pct_change 会先前向填充，应走 pandas）。
+    """
+    ma_s = rolling_mean(close, short)
+    ma_l = rolling_mean(close, long)
+    n = close.shape[0]
+    slope = np.empty(n)
+    bias = np.empty(n)
+    for i in range(n):
+        if i == 0 or ma_s[i - 1] == 0.0:
+            slope[i] = np.nan
+        else:
+            slope[i] = ma_s[i] / ma_s[i - 1] - 1.0
+        if ma_l[i] == 0.0:
+            bias[i] = np.nan
+        else:
+            bias[i] = (ma_s[i] - ma_l[i]) / ma_l[i]
+    return ma_s, ma_l, slope, bias
@@ -0,0 +1,70 @@
+"""
+MACD 数值内核（numba 可选）
+
+ema / macd_lines 与 pandas ewm(span, adjust=False) 的递推逐位一致，
+供 MACDStrategy 回测预计算与 tools/optimization/optimize_macd.py 共用；
+macd_series 是各策略在单个 df 上取 (DIF, DEA) 的入口。
+未安装 numba 时按纯 Python 执行，结果相同。
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils._njit import HAS_NUMBA, njit
+
+
+@njit(cache=True)
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """EMA，与 pandas ewm(span, adjust=False) 一致"""
+    out = np.empty_like(x)
+    alpha = 2.0 / (span + 1.0)
+    out[0] = x[0]
+    for t in range(1, x.shape[0]):
+        out[t] = alpha * x[t] + (1.0 - alpha) * out[t - 1]
+    return out
+
+
+@njit(cache=True)
+def macd_lines(close: np.ndarray, fast: int, slow: int, signal: int):
+    """
+    单次遍历同时递推快线、慢线与信号线，返回 (DIF, DEA)。
+
+    EMA 是因果递推，整段序列上第 i 个值与只用前 i+1 根 K 线算出的值相同，
+    因此回测时算一次整段即可按前缀切片复用。
+    """
+    n = close.shape[0]
+    dif = np.empty(n)
+    dea = np.empty(n)
+    af = 2.0 / (fast + 1.0)
+    a_s = 2.0 / (slow + 1.0)
+    ag = 2.0 / (signal + 1.0)
+    ef = close[0]
+    es = close[0]
+    dif[0] = 0.0
+    dea[0] = 0.0
+    for t in range(1, n):
+        x = close[t]
+        ef = af * x + (1.0 - af) * ef
+        es = a_s * x + (1.0 - a_s) * es
+        dif[t] = ef - es
+        dea[t] = ag * dif[t] + (1.0 - ag) * dea[t - 1]
+    return dif, dea
+
+
+def macd_series(close: pd.Series, fast: int = 12, slow: int = 26,
+                signal: int = 9) -> Tuple[pd.Series, pd.Series]:
+    """
+    返回 (DIF, DEA) 两条 Series，与各策略内联的 ewm 写法逐位一致。
+
+    安装了 numba 且收盘价无缺失时用 macd_lines 单遍递推，省掉三次 ewm 的调度开销；
+    否则走 pandas ewm（ewm 对 NaN 有专门处理）。
+    """
+    arr = close.to_numpy(dtype=np.float64)
+    if HAS_NUMBA and arr.size and not np.isnan(arr).any():
+        dif, dea = macd_lines(arr, fast, slow, signal)
+        return pd.Series(dif, index=close.index), pd.Series(dea, index=close.index)
+    dif = (close.ewm(span=fast, adjust=False).mean()
+           - close.ewm(span=slow, adjust=False).mean())
+    return dif, dif.ewm(span=signal, adjust=False).mean()
@@ -48,17 +48,111 @@ confidence 与 position 的关系:
 """
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 import logging
+import numpy as np
 import pandas as pd
 
+from src.utils._njit import njit
+
 logger = logging.getLogger(__name__)
 
 # 回测进行中：设为 True 时，依赖外部 I/O 的策略可跳过拉取、直接 HOLD，用于快速验证
+# 只通过 backtest_mode() 设置，不要直接赋值
 _BACKTEST_ACTIVE = False
 
 
+@contextmanager
+def backtest_mode():
+    """
+    回测上下文：进入时置 _BACKTEST_ACTIVE=True，退出（含异常）时恢复进入前的值。
+
+    可嵌套：外层脚本整段开启时，内层 Strategy.backtest 结束不会把标志提前关掉。
+    """
+    global _BACKTEST_ACTIVE
+    prev = _BACKTEST_ACTIVE
+    _BACKTEST_ACTIVE = True
+    try:
+        yield
+    finally:
+        _BACKTEST_ACTIVE = prev
+
+
+def _data_ptr(arr: np.ndarray) -> int:
+    return arr.__array_interface__['data'][0]
+
+
+def _same(a, b) -> bool:
+    return a == b or (a != a and b != b)  # NaN 视为相同
+
+
+def _bt_prefix_len(close: pd.Series, cached: Optional[np.ndarray]) -> int:
+    """
+    回测中 close 是 prepare_backtest 那段收盘价 cached 的前缀时返回其长度，否则返回 0。
+
+    除回测标志与长度外，还要求 close 与 cached 共享同一块内存且起点、步长相同
+    （backtest 的 df.iloc[:i+1] 窗口即如此），首尾值也一致；
+    换了一份数据、窗口被复制过或值被改动时都返回 0，调用方走常规计算。
+    """
+    if not _BACKTEST_ACTIVE or cached is None:
+        return 0
+    n = len(close)
+    if not 0 < n <= len(cached):
+        return 0
+    arr = close.to_numpy()
+    if _data_ptr(arr) != _data_ptr(cached) or arr.strides != cached.strides:
+        return 0
+    if not (_same(arr[0], cached[0]) and _same(arr[-1], cached[n - 1])):
+        return 0
+    return n
+
+
+@njit(cache=True)
+def _equity_stats(equity: np.ndarray, daily_rf: float) -> Tuple[float, float]:
+    """
+    权益曲线统计内核：一次遍历得到最大回撤（比例）与年化夏普
+
+    夏普与 pd.Series.pct_change().dropna() + std(ddof=1) 口径一致；
+    std 低于 1e-10 视为常数序列，夏普记 0。
+    """
+    n = equity.shape[0]
+    max_dd = 0.0
+    if n == 0:
+        return 0.0, 0.0
+    peak = equity[0]
+    for k in range(n):
+        eq = equity[k]
+        if eq > peak:
+            peak = eq
+        dd = (peak - eq) / peak
+        if dd > max_dd:
+            max_dd = dd
+
+    sharpe = 0.0
+    if n > 1:
+        cnt = 0
+        total = 0.0
+        for k in range(1, n):
+            r = equity[k] / equity[k - 1] - 1.0
+            if r == r:          # 跳过 NaN（同 dropna）
+                total += r - daily_rf
+                cnt += 1
+        if cnt > 1:
+            mean = total / cnt
+            ss = 0.0
+            for k in range(1, n):
+                r = equity[k] / equity[k - 1] - 1.0
+                if r == r:
+                    d = r - daily_rf - mean
+                    ss += d * d
+            std = (ss / (cnt - 1)) ** 0.5
+            if std > 1e-10:
+                sharpe = mean / std * (252 ** 0.5)
+    return max_dd, sharpe
+
+
 @dataclass
 class StrategySignal:
     """
@@ -222,8 +316,6 @@ class Strategy(ABC):
                 'sharpe': float,
             }
         """
-        import numpy as np
-
         if len(df) < self.min_bars + 1:
             return {
                 'trades': [], 'final_value': initial_cash,
@@ -233,9 +325,7 @@ class Strategy(ABC):
             }
 
         # 回测前预取：依赖外部数据的策略可实现 prepare_backtest(df)，只拉取一次，避免逐 bar 重复 I/O
-        global _BACKTEST_ACTIVE
-        _BACKTEST_ACTIVE = True
-        try:
+        with backtest_mode():
             if hasattr(self, 'prepare_backtest') and callable(getattr(self, 'prepare_backtest')):
                 try:
                     self.prepare_backtest(df)
@@ -252,17 +342,24 @@ class Strategy(ABC):
             completed_trips: List[float] = []   # 每次完整清仓的盈亏率，用于胜率计算
             equity_curve: List[float] = []
 
+            # 逐 bar 用到的列一次性转为 ndarray，避免每根 K 线构造一次 iloc 行 Series
+            closes = df['close'].to_numpy(dtype=np.float64)
+            if 'open' in df.columns:
+                opens = pd.to_numeric(df['open'], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                opens = np.zeros(len(df), dtype=np.float64)
+            dates = df['date'].to_numpy()
+
             # T 日收盘后生成信号，T+1 日开盘价执行
             # 循环从 min_bars 开始（T 日），执行发生在 i+1（T+1 日）
             for i in range(self.min_bars, len(df) - 1):
                 # T 日：只用 T 日及之前的数据生成信号（不含 T+1）
                 window = df.iloc[:i + 1]
-                t1_row = df.iloc[i + 1]                         # T+1 日数据
-                exec_date = str(t1_row['date'])[:10]
-                t1_close = float(t1_row['close'])               # T+1 收盘用于权益估值
+                exec_date = str(dates[i + 1])[:10]              # T+1 日
+                t1_close = float(closes[i + 1])                 # T+1 收盘用于权益估值
                 # T+1 开盘价执行；开盘价缺失/异常时退回收盘价
-                _open = t1_row.get('open', 0) if hasattr(t1_row, 'get') else t1_row['open']
-                exec_price = float(_open) if (float(_open) > 0) else t1_close
+                _open = opens[i + 1]
+                exec_price = float(_open) if _open > 0 else t1_close
 
                 # ---- 当前权益（用 T+1 开盘价估值，执行前）----
                 equity = cash + shares * exec_price
@@ -401,17 +498,12 @@ class Strategy(ABC):
             years = max(days / 365.0, 0.01)
             annualized = ((final_value / initial_cash) ** (1 / years) - 1) * 100
 
-            # 最大回撤
-            max_drawdown = 0.0
-            if equity_curve:
-                peak = equity_curve[0]
-                for eq in equity_curve:
-                    if eq > peak:
-                        peak = eq
-                    dd = (peak - eq) / peak
-                    if dd > max_drawdown:
-                        max_drawdown = dd
-            max_drawdown *= 100
+            # 最大回撤 + 夏普比率（统一扣除无风险利率），一次遍历权益曲线
+            # 最小 std 阈值防止浮点精度误差（全常数序列 std≈1e-20）导致天文数字
+            max_drawdown, sharpe = _equity_stats(
+                np.asarray(equity_curve, dtype=np.float64), risk_free_rate / 252)
+            max_drawdown = float(max_drawdown) * 100
+            sharpe = float(sharpe)
 
             # 胜率：基于完整买卖对（清仓时结算），避免部分减仓导致的失真
             # 对于未完全清仓的持仓，用最终收盘价估算最后一笔盈亏
@@ -424,16 +516,6 @@ class Strategy(ABC):
             # 卖出次数（用于 trade_count）
             sell_trades = [t for t in trades if t['action'] == 'SELL']
 
-            # 夏普比率（统一扣除无风险利率）
-            # 最小 std 阈值防止浮点精度误差（全常数序列 std≈1e-20）导致天文数字
-            sharpe = 0.0
-            if len(equity_curve) > 1:
-                returns = pd.Series(equity_curve).pct_change().dropna()
-                daily_rf = risk_free_rate / 252
-                excess = returns - daily_rf
-                if excess.std() > 1e-10:
-                    sharpe = float((excess.mean() / excess.std()) * (252 ** 0.5))
-
             return {
                 'trades': trades,
                 'final_value': round(final_value, 2),
@@ -444,5 +526,3 @@ class Strategy(ABC):
                 'trade_count': len(sell_trades),
                 'sharpe': round(sharpe, 2),
             }
-        finally:
-            _BACKTEST_ACTIVE = False
@@ -13,6 +13,7 @@ from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
 
 from src.strategies.base import Strategy, StrategySignal
 
@@ -129,10 +130,7 @@ class BreakoutPullbackStrategy(Strategy):
         if len(df) < self.min_bars:
             return None
 
-        df = df.copy().reset_index(drop=True)
-        for col in ("open", "high", "low", "close", "volume"):
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df.dropna(subset=["open", "high", "low", "close", "volume"], inplace=True)
+        df = self._clean_ohlcv(df)
         if len(df) < self.min_bars:
             return None
 
@@ -250,6 +248,22 @@ class BreakoutPullbackStrategy(Strategy):
     # Step 1: 突破检测
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _clean_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        OHLCV 转数值并去掉有缺失的行。scan 之后只按位置读取、不改 df，
+        因此列已是数值且无缺失时直接返回原对象，不再每次整表复制
+        （回测逐 bar 传入前缀窗口时省去一次 O(N) 拷贝）。
+        """
+        cols = ["open", "high", "low", "close", "volume"]
+        if all(is_numeric_dtype(df[c]) and not df[c].hasnans for c in cols):
+            return df
+        df = df.copy().reset_index(drop=True)
+        for col in cols:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df.dropna(subset=cols, inplace=True)
+        return df
+
     def _find_breakout(self, df: pd.DataFrame) -> Optional[BreakoutDetail]:
         close = df["close"].values
         high = df["high"].values
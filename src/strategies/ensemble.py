@@ -324,8 +324,11 @@ class EnsembleStrategy(Strategy):
             days_needed = max(90, (end_d - start_d).days + 30)
             idx_df = fetch_index_for_state(symbol='000300', days=days_needed)
             if idx_df is not None and not idx_df.empty:
-                # 截取需要的时间范围
-                idx_df = idx_df[idx_df['date'] >= pd.Timestamp(start_d)].reset_index(drop=True)
+                # 截取需要的时间范围（按日期有序，二分定位起点后切片）
+                if not idx_df['date'].is_monotonic_increasing:
+                    idx_df = idx_df.sort_values('date')
+                lo = idx_df['date'].searchsorted(pd.Timestamp(start_d), side='left')
+                idx_df = idx_df.iloc[lo:].reset_index(drop=True)
         except Exception:
             pass
         if idx_df is None or idx_df.empty:
@@ -358,7 +361,9 @@ class EnsembleStrategy(Strategy):
         from .base import _BACKTEST_ACTIVE
         index_df = None
         if _BACKTEST_ACTIVE and self._backtest_index_df is not None:
-            sub = self._backtest_index_df[self._backtest_index_df['date'] <= as_of].tail(60)
+            # 指数表已按日期升序：二分找到 as_of 右界，直接按位置取最近 60 根
+            hi = self._backtest_index_df['date'].searchsorted(as_of, side='right')
+            sub = self._backtest_index_df.iloc[max(0, hi - 60):hi]
             if len(sub) >= 30:
                 index_df = sub.reset_index(drop=True)
         elif not _BACKTEST_ACTIVE and fetch_index_for_state is not None:
@@ -503,8 +508,9 @@ class EnsembleStrategy(Strategy):
         sell_votes: List[tuple] = []
         hold_votes: List[tuple] = []
 
+        n_bars = len(df)
         for strat_name, strat in self.sub_strategies.items():
-            if len(df) < strat.min_bars:
+            if n_bars < strat.min_bars:
                 continue
             try:
                 sig = strat.analyze(df)
@@ -53,14 +53,26 @@ MA均线交叉策略
 
 import numpy as np
 import pandas as pd
+from src.utils._njit import HAS_NUMBA
+
+from . import base as _base
+from ._ma_numba import ma_cross_lines
 from .base import Strategy, StrategySignal
 from .turnover_helper import (
     calc_relative_turnover_rate,
+    calc_relative_turnover_rate_vec,
     check_turnover_liquidity,
     enhance_signal_with_turnover
 )
 
 
+def _tail_std(values: np.ndarray, n: int) -> float:
+    """最近 n 个值去掉 NaN 后的样本标准差（ddof=1）；不足 2 个有效值返回 NaN"""
+    tail = values[-n:]
+    tail = tail[~np.isnan(tail)]
+    return float(tail.std(ddof=1)) if tail.size > 1 else float('nan')
+
+
 class MACrossStrategy(Strategy):
 
     name = 'MA均线交叉'
@@ -98,9 +110,63 @@ class MACrossStrategy(Strategy):
         # VOL_MA(20) < _SLOPE_LOOKBACK(60)，被后者覆盖
         ma_warmup = max(short_window, long_window)
         self.min_bars = ma_warmup + self._SLOPE_LOOKBACK + 5
+        self._bt_close = None   # prepare_backtest 预计算的整段收盘价 / 短期 / 长期均线
+        self._bt_ma_short = None
+        self._bt_ma_long = None
+        self._bt_slope = None   # 整段短期均线日变化率 / 乖离率（±inf 已置 NaN）
+        self._bt_bias = None
+        self._bt_volume = None  # 整段成交量（float64；无成交量列或无法转换时为 None）
+        self._bt_rel_turnover = None  # 逐前缀的相对换手率（无换手率列时为 None）
+
+    def prepare_backtest(self, df: pd.DataFrame) -> None:
+        """
+        回测前一次性算出整段短期/长期均线及斜率、乖离率序列。
+        这些序列只依赖当前及之前的数据，整段结果的前 i 个值与只用前 i 根 K 线
+        算出的相同；回测逐 bar 传入的前缀窗口直接切片复用，不再每根 K 线重算 rolling。
+        安装了 numba 且收盘价无缺失时走 _ma_numba.ma_cross_lines 单遍内核，与 pandas 逐位一致。
+        """
+        self._bt_close = None
+        if df is None or df.empty or 'close' not in df.columns:
+            return
+        close = df['close']
+        arr = close.to_numpy(dtype=np.float64)
+        if HAS_NUMBA and not np.isnan(arr).any():
+            (self._bt_ma_short, self._bt_ma_long,
+             self._bt_slope, self._bt_bias) = ma_cross_lines(arr, self.short_window,
+                                                             self.long_window)
+        else:
+            ma_short = close.rolling(self.short_window).mean()
+            ma_long = close.rolling(self.long_window).mean()
+            self._bt_ma_short = ma_short.to_numpy()
+            self._bt_ma_long = ma_long.to_numpy()
+            self._bt_slope = ma_short.pct_change().replace(
+                [np.inf, -np.inf], np.nan).to_numpy()
+            self._bt_bias = ((ma_short - ma_long) / ma_long).replace(
+                [np.inf, -np.inf], np.nan).to_numpy()
+        self._bt_volume = None
+        if 'volume' in df.columns:
+            try:
+                self._bt_volume = df['volume'].to_numpy(dtype=np.float64)
+            except (TypeError, ValueError):
+                pass
+        rel = calc_relative_turnover_rate_vec(df, ma_period=20)
+        self._bt_rel_turnover = None if rel is None else rel.to_numpy()
+        self._bt_close = close.to_numpy()
+
+    def _prefix_len(self, df: pd.DataFrame) -> int:
+        """回测中 df 是 prepare_backtest 那段数据的前缀窗口时返回其长度，否则返回 0"""
+        return _base._bt_prefix_len(df['close'], self._bt_close)
+
+    def _ma_lines(self, df: pd.DataFrame, prefix: int = 0):
+        """返回 (短期均线, 长期均线) 的 ndarray；prefix>0 时直接切预计算序列（视图，不复制）"""
+        if prefix:
+            return self._bt_ma_short[:prefix], self._bt_ma_long[:prefix]
+        close = df['close']
+        return (close.rolling(self.short_window).mean().to_numpy(),
+                close.rolling(self.long_window).mean().to_numpy())
 
-    def _calc_dynamics(self, df: pd.DataFrame,
-                       ma_short: pd.Series, ma_long: pd.Series) -> dict:
+    def _calc_dynamics(self, df: pd.DataFrame, ma_short: np.ndarray,
+                       ma_long: np.ndarray, prefix: int = 0) -> dict:
         """
         计算动态因子:
         - slope:      短期均线日变化率 (正=上行, 负=下行)
@@ -108,10 +174,13 @@ class MACrossStrategy(Strategy):
         - bias:       乖离率 (MA_short - MA_long) / MA_long
         - bias_std:   过去 _SLOPE_LOOKBACK 日乖离率的标准差（用于自适应归一化）
         - vol_ratio:  当日成交量 / 20日均量 (>1 放量, <1 缩量)
+
+        prefix>0（回测前缀窗口）时斜率、乖离率、成交量都取预计算数组的末尾几段，
+        每根 K 线的工作量只与回看窗口有关，不随历史长度增长。
         """
-        cur_short = float(ma_short.iloc[-1])
-        prev_short = float(ma_short.iloc[-2])
-        cur_long = float(ma_long.iloc[-1])
+        cur_short = float(ma_short[-1])
+        prev_short = float(ma_short[-2])
+        cur_long = float(ma_long[-1])
 
         slope = (cur_short - prev_short) / prev_short if prev_short != 0 else 0
         bias = (cur_short - cur_long) / cur_long if cur_long != 0 else 0
@@ -121,9 +190,13 @@ class MACrossStrategy(Strategy):
         # 斜率标准差: 过去 N 日均线日变化率的 std，作为自适应归一化基准
         # 这样低波动蓝筹和高波动小盘股都能获得充分的区分度
         slope_std = 0.01  # 降级默认值（如果数据不足）
-        slopes = ma_short.pct_change().replace([np.inf, -np.inf], np.nan)
+        if prefix:
+            slopes = self._bt_slope[:prefix]
+        else:
+            slopes = pd.Series(ma_short).pct_change().replace(
+                [np.inf, -np.inf], np.nan).to_numpy()
         if len(slopes) > n:
-            recent_std = float(slopes.iloc[-n:].dropna().std())
+            recent_std = _tail_std(slopes, n)
             if recent_std > 1e-8:  # 避免除零（如停牌股）
                 slope_std = recent_std
 
@@ -131,19 +204,31 @@ class MACrossStrategy(Strategy):
         # 与斜率处理对称：低波动蓝筹（乖离 std ~0.5%）和高波动小盘股（std ~3%）
         # 都能获得充分的区分度，不再依赖固定 5% 阈值
         bias_std = 0.025  # 降级默认值（5% / 2 = 2.5%，保持与旧行为兼容）
-        bias_series = ((ma_short - ma_long) / ma_long).replace(
-            [np.inf, -np.inf], np.nan
-        )
+        if prefix:
+            bias_series = self._bt_bias[:prefix]
+        else:
+            bias_series = ((pd.Series(ma_short) - ma_long) / ma_long).replace(
+                [np.inf, -np.inf], np.nan
+            ).to_numpy()
         if len(bias_series) > n:
-            recent_bias_std = float(bias_series.iloc[-n:].dropna().std())
+            recent_bias_std = _tail_std(bias_series, n)
             if recent_bias_std > 1e-8:  # 避免除零（如停牌股）
                 bias_std = recent_bias_std
 
         # 成交量比: 当日量 / 20日均量（不含当日，更稳健）
         vol_ratio = 1.0
-        if 'volume' in df.columns:
+        vm = self._VOL_MA
+        if prefix and self._bt_volume is not None:
+            if prefix > vm:
+                # 与 Series.mean(skipna) 相同：NaN 按 0 求和、除以有效个数
+                tail = self._bt_volume[prefix - vm - 1:prefix - 1]
+                valid = ~np.isnan(tail)
+                count = int(valid.sum())
+                avg_vol = float(np.where(valid, tail, 0.0).sum() / count) if count else float('nan')
+                cur_vol = float(self._bt_volume[prefix - 1])
+                vol_ratio = cur_vol / avg_vol if avg_vol > 0 else 1.0
+        elif 'volume' in df.columns:
             vol = df['volume']
-            vm = self._VOL_MA
             if len(vol) > vm:
                 avg_vol = float(vol.iloc[-(vm + 1):-1].mean())
                 cur_vol = float(vol.iloc[-1])
@@ -180,17 +265,18 @@ class MACrossStrategy(Strategy):
         return self._SLOPE_W * norm_slope + self._VOL_W * norm_vol
 
     def analyze(self, df: pd.DataFrame) -> StrategySignal:
-        close = df['close']
+        prefix = self._prefix_len(df)
+        ma_short, ma_long = self._ma_lines(df, prefix)
 
-        ma_short = close.rolling(self.short_window).mean()
-        ma_long = close.rolling(self.long_window).mean()
+        cur_short = float(ma_short[-1])
+        cur_long = float(ma_long[-1])
+        prev_short = float(ma_short[-2])
+        prev_long = float(ma_long[-2])
 
-        cur_short = float(ma_short.iloc[-1])
-        cur_long = float(ma_long.iloc[-1])
-        prev_short = float(ma_short.iloc[-2])
-        prev_long = float(ma_long.iloc[-2])
+        # 近 4 日均线差，供多头/空头排列的"乖离扩大"判断复用，不再重复计算 rolling
+        gap_tail = ma_short[-4:] - ma_long[-4:]
 
-        dyn = self._calc_dynamics(df, ma_short, ma_long)
+        dyn = self._calc_dynamics(df, ma_short, ma_long, prefix)
         slope = dyn['slope']
         slope_std = dyn['slope_std']
         bias = dyn['bias']
@@ -198,7 +284,11 @@ class MACrossStrategy(Strategy):
         vol_ratio = dyn['vol_ratio']
         
         # 实盘标准：计算相对换手率（当前换手率/20日均换手率）
-        relative_turnover = calc_relative_turnover_rate(df, ma_period=20)
+        if prefix and self._bt_rel_turnover is not None:
+            rel = self._bt_rel_turnover[prefix - 1]
+            relative_turnover = None if rel != rel else float(rel)
+        else:
+            relative_turnover = calc_relative_turnover_rate(df, ma_period=20)
 
         indicators = {
             f'MA{self.short_window}': round(cur_short, 3),
@@ -292,10 +382,8 @@ class MACrossStrategy(Strategy):
             position = self._BULL_POS_MIN + norm_bias * (self._BULL_POS_MAX - self._BULL_POS_MIN)
 
             # 弱BUY：多头排列 + 乖离率扩大（短均线加速远离长均线）
-            ma_short_series = df['close'].rolling(self.short_window).mean()
-            ma_long_series = df['close'].rolling(self.long_window).mean()
-            if len(ma_short_series) >= 4 and len(ma_long_series) >= 4:
-                gaps = (ma_short_series - ma_long_series).iloc[-4:].values
+            if len(ma_short) >= 4:
+                gaps = gap_tail
                 gap_expanding = all(gaps[i] > gaps[i - 1] for i in range(1, len(gaps)))
                 if gap_expanding and bias > 0 and norm_bias > 0.3:
                     factor = min(norm_bias, 1.0)
@@ -323,10 +411,8 @@ class MACrossStrategy(Strategy):
         position = self._BEAR_POS_MAX - norm_bias * (self._BEAR_POS_MAX - self._BEAR_POS_MIN)
 
         # 弱SELL：空头排列 + 乖离率扩大（短均线加速远离长均线向下）
-        ma_short_series = df['close'].rolling(self.short_window).mean()
-        ma_long_series = df['close'].rolling(self.long_window).mean()
-        if len(ma_short_series) >= 4 and len(ma_long_series) >= 4:
-            gaps = (ma_short_series - ma_long_series).iloc[-4:].values
+        if len(ma_short) >= 4:
+            gaps = gap_tail
             gap_expanding_down = all(gaps[i] < gaps[i - 1] for i in range(1, len(gaps)))
             if gap_expanding_down and bias < 0 and norm_bias > 0.3:
                 factor = min(norm_bias, 1.0)
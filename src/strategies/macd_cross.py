@@ -58,6 +58,8 @@ HOLD 仓位（动态）:
 
 import numpy as np
 import pandas as pd
+from . import base as _base
+from ._macd_numba import macd_lines, macd_series
 from .base import Strategy, StrategySignal
 from .turnover_helper import (
     calc_relative_turnover_rate,
@@ -106,6 +108,33 @@ class MACDStrategy(Strategy):
         #   + 5               → 余量
         #   signal_period(9) << _SLOPE_LOOKBACK(60)，被后者覆盖
         self.min_bars = max(fast_period, slow_period) + self._SLOPE_LOOKBACK + 5
+        self._bt_close = None   # prepare_backtest 预计算的整段收盘价 / DIF / DEA
+        self._bt_dif = None
+        self._bt_dea = None
+
+    def prepare_backtest(self, df: pd.DataFrame) -> None:
+        """
+        回测前一次性算出整段 DIF/DEA（macd_lines 单遍递推）。
+        EMA 为因果递推，回测逐 bar 传入的前缀窗口直接切片复用，不再每根 K 线重算 ewm。
+        """
+        self._bt_close = None
+        if df is None or df.empty or 'close' not in df.columns:
+            return
+        close = df['close'].to_numpy(dtype=np.float64)
+        if np.isnan(close).any():
+            return  # ewm 对 NaN 有专门处理，含缺失值时走原路径
+        self._bt_dif, self._bt_dea = macd_lines(close, self.fast_period,
+                                                self.slow_period, self.signal_period)
+        self._bt_close = close
+
+    def _macd_lines(self, df: pd.DataFrame):
+        """返回 (DIF, DEA)；回测中窗口是预计算序列的前缀时直接切片"""
+        close = df['close']
+        n = _base._bt_prefix_len(close, self._bt_close)
+        if n:
+            return (pd.Series(self._bt_dif[:n], index=close.index),
+                    pd.Series(self._bt_dea[:n], index=close.index))
+        return macd_series(close, self.fast_period, self.slow_period, self.signal_period)
 
     def _calc_dynamics(self, df: pd.DataFrame,
                        dif: pd.Series, dea: pd.Series) -> dict:
@@ -175,12 +204,7 @@ class MACDStrategy(Strategy):
         return self._SLOPE_W * norm_slope + self._VOL_W * norm_vol
 
     def analyze(self, df: pd.DataFrame) -> StrategySignal:
-        close = df['close']
-
-        ema_fast = close.ewm(span=self.fast_period, adjust=False).mean()
-        ema_slow = close.ewm(span=self.slow_period, adjust=False).mean()
-        dif = ema_fast - ema_slow
-        dea = dif.ewm(span=self.signal_period, adjust=False).mean()
+        dif, dea = self._macd_lines(df)
         macd_hist = (dif - dea) * 2
 
         cur_dif = float(dif.iloc[-1])
@@ -17,6 +17,7 @@ from typing import Optional, Tuple
 import numpy as np
 import pandas as pd
 
+from ._macd_numba import macd_series
 from .base import Strategy, StrategySignal
 
 logger = logging.getLogger(__name__)
@@ -41,10 +42,7 @@ def _macd_hist_slope(close: pd.Series, fast: int = 12, slow: int = 26, signal: i
     """MACD 柱（红绿柱）最近 slope_n 日的线性回归斜率。"""
     if len(close) < slow + signal + slope_n:
         return None
-    ema_f = close.ewm(span=fast, adjust=False).mean()
-    ema_s = close.ewm(span=slow, adjust=False).mean()
-    dif = ema_f - ema_s
-    dea = dif.ewm(span=signal, adjust=False).mean()
+    dif, dea = macd_series(close, fast, slow, signal)
     hist = (dif - dea).values
     last = hist[-slope_n:]
     if np.any(np.isnan(last)):
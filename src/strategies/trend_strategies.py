@@ -7,6 +7,8 @@
 import pandas as pd
 import numpy as np
 
+from ._macd_numba import macd_series
+
 
 def wilder_smooth(series, period):
     """Wilder平滑（EMA with alpha=1/period）"""
@@ -325,10 +327,7 @@ class TechnicalConfirmation:
         ma_cross_score[no_cross & (ma_f < ma_s)] = -0.3  # 空头排列但未死叉
         
         # ========== 2. MACD金叉/死叉 ==========
-        ema_fast = close.ewm(span=macd_fast, adjust=False).mean()
-        ema_slow = close.ewm(span=macd_slow, adjust=False).mean()
-        dif = ema_fast - ema_slow
-        dea = dif.ewm(span=macd_signal, adjust=False).mean()
+        dif, dea = macd_series(close, macd_fast, macd_slow, macd_signal)
         
         macd_golden = (dif.shift(1) <= dea.shift(1)) & (dif > dea)
         macd_death = (dif.shift(1) >= dea.shift(1)) & (dif < dea)
@@ -19,6 +19,36 @@ import pandas as pd
 import numpy as np
 from typing import Optional, Tuple
 
+from src.utils._njit import njit
+
+
+@njit(cache=True)
+def _calc_relative_turnover_njit(turnover: np.ndarray, ma_period: int) -> float:
+    """相对换手率内核：turnover 为已去缺失的换手率数组，不可计算时返回 NaN"""
+    n = turnover.shape[0]
+    if n < ma_period + 1:
+        return np.nan
+    avg = turnover[n - ma_period - 1:n - 1].mean()
+    if avg <= 0:
+        return np.nan
+    return turnover[n - 1] / avg
+
+
+@njit(cache=True)
+def _relative_turnover_series_njit(turnover: np.ndarray, ma_period: int) -> np.ndarray:
+    """逐前缀的相对换手率：第 i 个值与只用前 i+1 行调用 _calc_relative_turnover_njit 相同"""
+    n = turnover.shape[0]
+    out = np.empty(n)
+    buf = np.empty(n)  # 已去缺失的前缀
+    k = 0
+    for i in range(n):
+        v = turnover[i]
+        if v == v:
+            buf[k] = v
+            k += 1
+        out[i] = _calc_relative_turnover_njit(buf[:k], ma_period)
+    return out
+
 
 def calc_relative_turnover_rate(df: pd.DataFrame, 
                                  ma_period: int = 20) -> Optional[float]:
@@ -35,19 +65,29 @@ def calc_relative_turnover_rate(df: pd.DataFrame,
     if 'turnover_rate' not in df.columns:
         return None
     
-    turnover = df['turnover_rate'].dropna()
+    turnover = df['turnover_rate'].to_numpy(dtype=np.float64, na_value=np.nan)
+    turnover = turnover[~np.isnan(turnover)]
     
-    if len(turnover) < ma_period + 1:
+    # 20日均换手率不含当日，更稳健
+    rel = _calc_relative_turnover_njit(turnover, ma_period)
+    if rel != rel:  # NaN：数据不足或均值<=0
         return None
+    return float(rel)
+
+
+def calc_relative_turnover_rate_vec(df: pd.DataFrame,
+                                    ma_period: int = 20) -> Optional[pd.Series]:
+    """
+    calc_relative_turnover_rate 的整段版本：第 i 个值等于对 df.iloc[:i+1] 调用的结果
+    （不可计算处为 NaN），供回测一次算出、逐 bar 按位置取值，不再每根 K 线重扫整段前缀
     
-    # 计算20日均换手率（不含当日，更稳健）
-    avg_turnover = float(turnover.iloc[-(ma_period + 1):-1].mean())
-    cur_turnover = float(turnover.iloc[-1])
-    
-    if avg_turnover <= 0:
+    Returns:
+        与 df 同索引的 float64 Series；没有 'turnover_rate' 列时返回 None
+    """
+    if 'turnover_rate' not in df.columns:
         return None
-    
-    return cur_turnover / avg_turnover
+    turnover = df['turnover_rate'].to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.Series(_relative_turnover_series_njit(turnover, ma_period), index=df.index)
 
 
 def check_turnover_liquidity(relative_turnover: Optional[float]) -> Tuple[bool, str]:
@@ -0,0 +1,33 @@
+"""
+numba 可选加速
+
+安装了 numba 时导出真正的 njit / prange；未安装时降级为原样返回函数的装饰器
+和内置 range，被装饰的函数按纯 Python/NumPy 语义执行，结果一致，只是更慢。
+
+用法:
+  from src.utils._njit import njit, prange, HAS_NUMBA
+
+  @njit(cache=True)
+  def kernel(x): ...
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+    logger.debug("numba not installed, JIT kernels will run as plain Python")
+
+    def njit(*args, **kwargs):
+        """numba.njit 的无操作替身，兼容 @njit 与 @njit(...) 两种写法"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def _decorator(func):
+            return func
+        return _decorator
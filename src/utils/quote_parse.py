@@ -0,0 +1,75 @@
+"""
+行情接口响应解析（数据层与 tools 脚本共用）
+
+- json_loads: 有 orjson 时按字节直接解析，非标准 JSON（NaN/Infinity）退回标准库
+- to_float64: 数字字符串列整块转 float64，脏值时逐列容错
+- parse_sina_kline: 新浪 getKLineData 响应 → DataFrame（day/open/high/low/close/volume + date）
+- parse_sina_hq_fields: 新浪 hq_str 行情字段 → dict
+
+用法:
+  from src.utils.quote_parse import json_loads, parse_sina_kline, parse_sina_hq_fields
+"""
+
+import json
+from typing import List
+
+import pandas as pd
+
+try:
+    import orjson
+
+    def json_loads(data):
+        """orjson 解析；遇到 NaN/Infinity 等 orjson 不接受的非标准 JSON 时退回标准库"""
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+except ImportError:
+    json_loads = json.loads
+
+SINA_KLINE_COLUMNS = ["day", "open", "high", "low", "close", "volume"]
+
+
+def to_float64(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    """
+    把接口返回的数字字符串列原地转为 float64。
+
+    整块一次 astype（一次 C 层转换、只分配一个块），不再逐列 pd.to_numeric；
+    偶发脏值（空串、"-" 等）导致整块转换失败时，退回逐列 errors="coerce" 容错转换。
+    """
+    try:
+        df[cols] = df[cols].astype("float64")
+    except (TypeError, ValueError):
+        for c in cols:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+def parse_sina_kline(content: bytes) -> pd.DataFrame:
+    """
+    解析 Sina getKLineData 返回的 JSON 数组（[{day, open, ...}, ...]）。
+
+    直接解析响应字节（有 orjson 时走 C 解析器，省去 text 解码），
+    按已知列名 from_records 构造，跳过逐行推断列的开销。
+    """
+    data = json_loads(content) if content and content.strip() else None
+    if not data:
+        return pd.DataFrame()
+    df = pd.DataFrame.from_records(data, columns=SINA_KLINE_COLUMNS)
+    df["date"] = pd.to_datetime(df["day"])
+    return to_float64(df, SINA_KLINE_COLUMNS[1:])
+
+
+def parse_sina_hq_fields(parts: list) -> dict:
+    """新浪 hq_str 行情字段 → dict"""
+    return {
+        'name': parts[0],
+        'open': float(parts[1]),
+        'prev_close': float(parts[2]),
+        'price': float(parts[3]),
+        'high': float(parts[4]),
+        'low': float(parts[5]),
+        'volume': float(parts[8]),
+        'date': parts[30],
+        'time': parts[31],
+    }
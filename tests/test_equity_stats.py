@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+回测权益统计内核测试
+
+base._equity_stats 与原 Strategy.backtest 里逐点算最大回撤、
+pd.Series.pct_change() 算夏普的写法对比。
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.strategies.base import _equity_stats
+
+
+def _pandas_equity_stats(equity_curve: list, risk_free_rate: float):
+    """原 Strategy.backtest 的最大回撤（比例）与夏普计算"""
+    max_drawdown = 0.0
+    if equity_curve:
+        peak = equity_curve[0]
+        for eq in equity_curve:
+            if eq > peak:
+                peak = eq
+            dd = (peak - eq) / peak
+            if dd > max_drawdown:
+                max_drawdown = dd
+    sharpe = 0.0
+    if len(equity_curve) > 1:
+        returns = pd.Series(equity_curve).pct_change().dropna()
+        excess = returns - risk_free_rate / 252
+        if excess.std() > 1e-10:
+            sharpe = float((excess.mean() / excess.std()) * (252 ** 0.5))
+    return max_drawdown, sharpe
+
+
+_CURVES = {
+    'random_walk': 100000 * np.cumprod(1 + np.random.RandomState(3).randn(500) * 0.01),
+    'flat': np.full(120, 100000.0),
+    'single_bar': np.array([100000.0]),
+    'two_bars': np.array([100000.0, 101000.0]),
+    'monotonic_down': np.linspace(100000.0, 60000.0, 250),
+    'empty': np.array([]),
+}
+
+
+@pytest.mark.parametrize('name', list(_CURVES))
+@pytest.mark.parametrize('risk_free_rate', [0.0, 0.03])
+def test_equity_stats_matches_pandas(name, risk_free_rate):
+    equity = _CURVES[name]
+    max_dd, sharpe = _equity_stats(equity, risk_free_rate / 252)
+    exp_dd, exp_sharpe = _pandas_equity_stats(equity.tolist(), risk_free_rate)
+    assert max_dd == pytest.approx(exp_dd, rel=1e-12, abs=1e-15)
+    assert sharpe == pytest.approx(exp_sharpe, rel=1e-9, abs=1e-12)
+
+
+def test_equity_stats_edge_values():
+    assert _equity_stats(_CURVES['flat'], 0.03 / 252) == (0.0, 0.0)
+    assert _equity_stats(_CURVES['single_bar'], 0.0) == (0.0, 0.0)
+    max_dd, sharpe = _equity_stats(_CURVES['monotonic_down'], 0.0)
+    assert max_dd == pytest.approx(0.4)
+    assert sharpe < 0
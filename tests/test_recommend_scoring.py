@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+每日推荐批量计算测试
+
+recommend_today 的批量实现与逐只实现对比：
+1. price_stats_batch vs 原 analyze_stock_extended 里逐只计算的辅助技术指标
+2. compute_scores_vec vs compute_score
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'tools' / 'analysis'))
+
+from recommend_today import compute_score, compute_scores_vec, price_stats_batch
+
+
+def _price_stats_single(df: pd.DataFrame) -> dict:
+    """原 analyze_stock_extended 的逐只辅助指标计算"""
+    close = df['close']
+    volume = df['volume']
+    price = float(close.iloc[-1])
+
+    if len(df) > 1:
+        change_5d = (price / float(close.iloc[max(0, len(df) - 6)]) - 1) * 100
+        change_20d = (price / float(close.iloc[max(0, len(df) - 21)]) - 1) * 100
+    else:
+        change_5d = change_20d = 0.0
+    change_60d = (price / float(close.iloc[-61]) - 1) * 100 if len(df) > 60 else 0
+
+    avg_vol_5 = float(volume.iloc[-6:-1].mean()) if len(df) > 5 else 1
+    vol_ratio = float(volume.iloc[-1]) / avg_vol_5 if avg_vol_5 > 0 else 1
+
+    ma5 = float(close.iloc[-5:].mean())
+    ma10 = float(close.iloc[-10:].mean()) if len(df) >= 10 else ma5
+    ma20 = float(close.iloc[-20:].mean()) if len(df) >= 20 else ma5
+    ma60 = float(close.iloc[-60:].mean()) if len(df) >= 60 else ma20
+
+    if price > ma5 > ma20:
+        trend = '多头排列↑'
+    elif price < ma5 < ma20:
+        trend = '空头排列↓'
+    elif price > ma20:
+        trend = '偏多↗'
+    else:
+        trend = '偏空↘'
+
+    high_60 = float(close.iloc[-60:].max()) if len(df) >= 60 else float(close.max())
+    low_60 = float(close.iloc[-60:].min()) if len(df) >= 60 else float(close.min())
+    return {
+        'price': price,
+        'change_5d': round(change_5d, 2),
+        'change_20d': round(change_20d, 2),
+        'change_60d': round(change_60d, 2),
+        'volume_ratio': round(vol_ratio, 2),
+        'ma5': round(ma5, 2),
+        'ma10': round(ma10, 2),
+        'ma20': round(ma20, 2),
+        'ma60': round(ma60, 2),
+        'trend': trend,
+        'distance_from_high': round((price / high_60 - 1) * 100, 2),
+        'distance_from_low': round((price / low_60 - 1) * 100, 2),
+    }
+
+
+def _frames() -> list:
+    """长度覆盖各分支边界（不足 5/10/20/60/61 根）的随机 K 线，含零成交量"""
+    rng = np.random.RandomState(5)
+    frames = []
+    for n in (1, 2, 5, 6, 9, 10, 19, 20, 21, 59, 60, 61, 62, 250):
+        for _ in range(3):
+            close = 10 + np.cumsum(rng.randn(n) * 0.3)
+            volume = rng.randint(0, 3, n) * rng.randint(100000, 1000000, n).astype(float)
+            frames.append(pd.DataFrame({'close': close, 'volume': volume}))
+    return frames
+
+
+def test_price_stats_batch_matches_single():
+    frames = _frames()
+    batch = price_stats_batch(frames)
+    assert len(batch) == len(frames)
+    for df, got in zip(frames, batch):
+        expected = _price_stats_single(df)
+        assert got.keys() == expected.keys()
+        for k, v in expected.items():
+            if isinstance(v, float):
+                assert got[k] == pytest.approx(v, abs=1e-9), k
+            else:
+                assert got[k] == v, k
+
+
+def test_price_stats_batch_empty():
+    assert price_stats_batch([]) == []
+
+
+def _score_rows(n: int) -> list:
+    """随机评分输入，数值列混入各阈值的边界值"""
+    rng = np.random.RandomState(9)
+    pick = lambda values: values[rng.randint(len(values))]
+    rows = []
+    for _ in range(n):
+        rows.append({
+            'action': pick(['BUY', 'SELL', 'HOLD']),
+            'confidence': round(rng.rand(), 3),
+            'trend': pick(['多头排列↑', '空头排列↓', '偏多↗', '偏空↘']),
+            'volume_ratio': pick([0.5, 1.0, 1.5, 2.0, round(rng.rand() * 3, 2)]),
+            'change_5d': pick([-5.0, 0.0, 10.0, round(rng.randn() * 8, 2)]),
+            'dist_high': pick([-5.0, -15.0, -30.0, round(-rng.rand() * 40, 2)]),
+            'pe_signal': pick(['BUY', 'SELL', 'HOLD', 'N/A']),
+            'pb_signal': pick(['BUY', 'SELL', 'HOLD', 'N/A']),
+            'fund_flow_signal': pick(['bullish', 'bearish', 'neutral']),
+        })
+    return rows
+
+
+def test_compute_scores_vec_matches_compute_score():
+    rows = _score_rows(2000)
+    got = compute_scores_vec(pd.DataFrame(rows))
+    expected = [compute_score({
+        'signal': SimpleNamespace(action=r['action'], confidence=r['confidence']),
+        'trend': r['trend'],
+        'volume_ratio': r['volume_ratio'],
+        'change_5d': r['change_5d'],
+        'distance_from_high': r['dist_high'],
+        'pe_signal': r['pe_signal'],
+        'pb_signal': r['pb_signal'],
+        'fund_flow_signal': r['fund_flow_signal'],
+    }) for r in rows]
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_compute_scores_vec_empty():
+    assert compute_scores_vec(pd.DataFrame()).shape == (0,)
@@ -13,10 +13,22 @@ A/B 回测验证：对比策略改动前后的表现差异。
 import sys
 import os
 import json
+import argparse
 import warnings
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-warnings.filterwarnings('ignore')
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import itemgetter
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+CACHE_DIR = os.path.join(_ROOT, 'mydate', 'backtest_kline')
+# 只屏蔽回测批量跑时逐根刷屏的已知告警，其余告警照常输出：
+# - pandas 对 pct_change 默认 fill_method='pad' 的弃用提示（停牌缺失的收盘价）
+# - 项目代码在停牌/常数序列上的 NaN 运算（除零、空切片求均值）
+warnings.filterwarnings('ignore', message=r"The default fill_method='pad' in Series\.pct_change",
+                        category=FutureWarning)
+warnings.filterwarnings('ignore', message=r'(invalid value|divide by zero) encountered|Mean of empty slice',
+                        category=RuntimeWarning, module=r'src\.')
 
 import pandas as pd
 import numpy as np
@@ -43,42 +55,104 @@ def load_sample_stocks(cache_dir: str, n: int = 30) -> list:
     return result
 
 
-def run_single_backtest(strategy, df: pd.DataFrame) -> dict:
-    """对单只股票跑回测，返回指标。"""
+# 单只股票回测指标，按股票预分配成结构化数组，聚合时直接对整列求值
+METRIC_DTYPE = np.dtype([
+    ('sharpe', 'f8'),
+    ('annualized_return', 'f8'),
+    ('max_drawdown', 'f8'),
+    ('win_rate', 'f8'),
+    ('trade_count', 'i4'),
+])
+# 按 METRIC_DTYPE 字段顺序从回测结果 dict 一次取出全部指标
+_GET_METRICS = itemgetter(*METRIC_DTYPE.names)
+
+
+def run_single_backtest(strategy, df: pd.DataFrame) -> tuple:
+    """对单只股票跑回测，返回与 METRIC_DTYPE 对应的指标元组。"""
     try:
-        return strategy.backtest(df)
+        return _GET_METRICS(strategy.backtest(df))
     except Exception as e:
-        return {
-            'total_return': 0.0, 'annualized_return': 0.0,
-            'max_drawdown': 0.0, 'sharpe': 0.0, 'win_rate': 0.0,
-            'trade_count': 0,
-        }
+        return (0.0, 0.0, 0.0, 0.0, 0)
 
 
-def aggregate_metrics(results: list) -> dict:
-    """聚合多只股票的回测结果。"""
-    if not results:
+def make_strategy(config: str):
+    """按配置构造组合策略：A=原始固定权重（无相关性折扣、无L2），B=新版"""
+    from src.strategies.ensemble import EnsembleStrategy
+
+    strat = EnsembleStrategy(dual_reverse=True)
+    if config == 'A':
+        strat._CORRELATED_PAIRS = {}
+        strat._compute_volatility_adjusted_weights = lambda df: None
+    return strat
+
+
+def _backtest_chunk(config: str, chunk: list) -> list:
+    """子进程入口：一个配置、一段连续股票，进程内只构造一个策略实例"""
+    from src.strategies.base import backtest_mode
+    strat = make_strategy(config)
+    out = []
+    with backtest_mode():
+        for code, df in chunk:
+            strat.set_symbol(code)
+            out.append(run_single_backtest(strat, df))
+    return out
+
+
+def run_config(config: str, stocks: list, jobs: int = 1) -> np.ndarray:
+    """
+    在全部样本股上回测一个配置，返回 METRIC_DTYPE 结构化数组（顺序与 stocks 一致）。
+    jobs>1 时把股票切成连续块分给进程池（各股回测相互独立），按完成顺序回填结果。
+    """
+    results = np.zeros(len(stocks), dtype=METRIC_DTYPE)
+    if jobs <= 1 or len(stocks) < 2:
+        # 每个配置只构造一个组合策略实例，逐股 set_symbol 注入（子策略与市场状态引擎不重复初始化）
+        strat = make_strategy(config)
+        for i, (code, df) in enumerate(stocks):
+            strat.set_symbol(code)
+            results[i] = run_single_backtest(strat, df)
+            if (i + 1) % 10 == 0:
+                print(f"  进度: {i+1}/{len(stocks)}")
+        return results
+
+    bounds = np.linspace(0, len(stocks), min(jobs, len(stocks)) + 1).astype(int)
+    done = 0
+    with ProcessPoolExecutor(max_workers=len(bounds) - 1) as ex:
+        futures = {ex.submit(_backtest_chunk, config, stocks[a:b]): (a, b)
+                   for a, b in zip(bounds[:-1], bounds[1:])}
+        for fut in as_completed(futures):
+            a, b = futures[fut]
+            results[a:b] = fut.result()
+            done += b - a
+            print(f"  进度: {done}/{len(stocks)}")
+    return results
+
+
+def aggregate_metrics(results: np.ndarray) -> dict:
+    """聚合多只股票的回测结果（results 为 METRIC_DTYPE 结构化数组）。"""
+    if len(results) == 0:
         return {}
-    sharpes = [r['sharpe'] for r in results if r.get('trade_count', 0) > 0]
-    returns = [r['annualized_return'] for r in results if r.get('trade_count', 0) > 0]
-    drawdowns = [r['max_drawdown'] for r in results if r.get('trade_count', 0) > 0]
-    win_rates = [r['win_rate'] for r in results if r.get('trade_count', 0) > 0]
-    
-    n = len(sharpes)
+    traded = results[results['trade_count'] > 0]
+
+    n = len(traded)
     if n == 0:
         return {'n': 0}
     return {
         'n': n,
-        'avg_sharpe': round(np.mean(sharpes), 4),
-        'med_sharpe': round(np.median(sharpes), 4),
-        'avg_ann_ret': round(np.mean(returns), 4),
-        'avg_max_dd': round(np.mean(drawdowns), 4),
-        'avg_win_rate': round(np.mean(win_rates), 2),
+        'avg_sharpe': round(float(traded['sharpe'].mean()), 4),
+        'med_sharpe': round(float(np.median(traded['sharpe'])), 4),
+        'avg_ann_ret': round(float(traded['annualized_return'].mean()), 4),
+        'avg_max_dd': round(float(traded['max_drawdown'].mean()), 4),
+        'avg_win_rate': round(float(traded['win_rate'].mean()), 2),
     }
 
 
 def main():
-    cache_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'mydate', 'backtest_kline')
+    parser = argparse.ArgumentParser(description='A/B 回测验证：策略改动前后对比')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='回测进程数（默认1串行；各股回测相互独立，可按 CPU 核数并行）')
+    args = parser.parse_args()
+
+    cache_dir = CACHE_DIR
     print("=" * 70)
     print("A/B 回测验证：策略改动前后对比")
     print("=" * 70)
@@ -90,30 +164,15 @@ def main():
         return
     print(f"✅ 加载 {len(stocks)} 只股票用于回测")
 
-    from src.strategies.base import _BACKTEST_ACTIVE
-    import src.strategies.base as base_mod
-    base_mod._BACKTEST_ACTIVE = True
+    from src.strategies.base import backtest_mode
 
     # ── 测试 A: 原始固定权重（无相关性折扣，无L2） ──
     print("\n" + "─" * 50)
     print("🔵 配置A: 原始固定权重（无相关性折扣，无L2波动率自适应）")
     print("─" * 50)
 
-    from src.strategies.ensemble import EnsembleStrategy
-
-    results_a = []
-    for i, (code, df) in enumerate(stocks):
-        strat_a = EnsembleStrategy(symbol=code, dual_reverse=True)
-        strat_a._CORRELATED_PAIRS = {}
-        
-        old_method = strat_a._compute_volatility_adjusted_weights
-        strat_a._compute_volatility_adjusted_weights = lambda df: None
-        
-        r = run_single_backtest(strat_a, df)
-        results_a.append(r)
-        if (i + 1) % 10 == 0:
-            print(f"  进度: {i+1}/{len(stocks)}")
-
+    with backtest_mode():
+        results_a = run_config('A', stocks, args.jobs)
     agg_a = aggregate_metrics(results_a)
     print(f"  结果: {agg_a}")
 
@@ -122,14 +181,8 @@ def main():
     print("🟢 配置B: 新版（含相关性折扣 + L2波动率自适应）")
     print("─" * 50)
 
-    results_b = []
-    for i, (code, df) in enumerate(stocks):
-        strat_b = EnsembleStrategy(symbol=code, dual_reverse=True)
-        r = run_single_backtest(strat_b, df)
-        results_b.append(r)
-        if (i + 1) % 10 == 0:
-            print(f"  进度: {i+1}/{len(stocks)}")
-
+    with backtest_mode():
+        results_b = run_config('B', stocks, args.jobs)
     agg_b = aggregate_metrics(results_b)
     print(f"  结果: {agg_b}")
 
@@ -168,7 +221,6 @@ def main():
     else:
         print("数据不足，无法对比")
 
-    base_mod._BACKTEST_ACTIVE = False
     print("\n回测完成。")
 
 
@@ -643,22 +643,26 @@ def backtest():
         else:
             phase_data.append('range')
 
+    # 各版本逐期收益一次算成数组，按阶段用布尔掩码取桶，不再逐期 append 到列表
+    phases = np.array(phase_data)
+    rets_by_version = {}
+    for v in versions:
+        nav_arr = np.asarray(nav[v], dtype=np.float64)
+        rets_by_version[v] = np.diff(nav_arr) / nav_arr[:-1]
+
     for phase in ['bull', 'bear', 'range']:
-        idxs = [i for i, p in enumerate(phase_data) if p == phase]
-        if len(idxs) < 5:
+        in_phase = phases == phase
+        n_phase = int(in_phase.sum())
+        if n_phase < 5:
             continue
-        print(f"\n  [{phase.upper()}] {len(idxs)} periods")
+        print(f"\n  [{phase.upper()}] {n_phase} periods")
         for v in versions:
-            nav_arr = np.array(nav[v])
-            rets = []
-            for i in idxs:
-                if i < len(nav_arr) - 1:
-                    r = (nav_arr[i+1] - nav_arr[i]) / nav_arr[i]
-                    rets.append(r)
-            if not rets:
+            m = min(len(rets_by_version[v]), len(in_phase))
+            rets = rets_by_version[v][:m][in_phase[:m]]
+            if rets.size == 0:
                 continue
-            avg_r = np.mean(rets) * 100
-            win = np.mean(np.array(rets) > 0) * 100
+            avg_r = rets.mean() * 100
+            win = (rets > 0).mean() * 100
             vol = np.std(rets) * np.sqrt(252/REBALANCE_FREQ) * 100
             print(f"    {v}: avg={avg_r:>+.2f}%/period  win={win:.0f}%  vol={vol:.1f}%")
 
@@ -38,6 +38,7 @@ logger.setLevel(logging.INFO)
 
 STOCK_LIMIT = 500
 KLINE_BARS = 250
+PROGRESS_EVERY = 50
 
 
 def load_stocks(pool_path: str, limit: int) -> list:
@@ -54,6 +55,15 @@ def load_stocks(pool_path: str, limit: int) -> list:
     return stocks
 
 
+def _log_progress(done: int, total: int, ok: int, fail: int, t0: float) -> None:
+    """按已处理数估算速度与剩余时间（t0 取自 time.perf_counter）"""
+    elapsed = time.perf_counter() - t0
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else 0.0
+    logger.info(f'进度: {done}/{total} | 成功={ok} 失败={fail} | '
+                f'速度={rate:.1f}只/秒 | ETA={eta:.0f}秒')
+
+
 def validate_signal(sig, strategy_name: str) -> list[str]:
     """校验 StrategySignal 字段类型是否正确"""
     errors = []
@@ -101,11 +111,17 @@ def run_validation():
     doubler_500_tests = []
     stock_ok = 0
     stock_fail = 0
-    t0 = time.time()
+    t0 = time.perf_counter()
+
+    # 14 个子策略与市场状态引擎只构造一次，逐股用 set_symbol 注入标的
+    ens = EnsembleStrategy()
 
     skip_network = {'NEWS', 'MONEY_FLOW', 'EARNINGS_GROWTH', 'INDUSTRY_TREND'}
 
     for i, s in enumerate(stocks):
+        # 放在循环开头：K 线失败 continue 的股票也计入进度
+        if i and i % PROGRESS_EVERY == 0:
+            _log_progress(i, len(stocks), stock_ok, stock_fail, t0)
         code = s['code']
         name = s.get('name', code)
 
@@ -119,7 +135,7 @@ def run_validation():
             stock_fail += 1
             continue
 
-        ens = EnsembleStrategy(symbol=code, stock_name=name)
+        ens.set_symbol(code, name)
 
         for sname, strat in ens.sub_strategies.items():
             if sname not in stats:
@@ -172,14 +188,9 @@ def run_validation():
             pe_pb_stats['no_data'] += 1
 
         stock_ok += 1
-        if (i + 1) % 50 == 0:
-            elapsed = time.time() - t0
-            rate = (i + 1) / elapsed
-            eta = (len(stocks) - i - 1) / rate
-            logger.info(f'进度: {i+1}/{len(stocks)} | 成功={stock_ok} 失败={stock_fail} | '
-                        f'速度={rate:.1f}只/秒 | ETA={eta:.0f}秒')
-
-    elapsed = time.time() - t0
+
+    _log_progress(len(stocks), len(stocks), stock_ok, stock_fail, t0)
+    elapsed = time.perf_counter() - t0
 
     lines = []
     lines.append('=' * 70)
@@ -33,6 +33,7 @@ import time
 import argparse
 import logging
 import re
+import warnings
 from datetime import datetime, timedelta
 from collections import defaultdict
 import threading
@@ -45,6 +46,11 @@ except (pd.errors.OptionError, Exception):
     pass
 import numpy as np
 
+try:
+    from tqdm import tqdm  # 可选：单策略分析循环的进度条
+except ImportError:
+    tqdm = None
+
 logger = logging.getLogger(__name__)
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
@@ -1411,6 +1417,8 @@ def save_incremental_report(
     report_parts.append(_render_holding_advice(holdings, all_results, today))
 
     # 3. 今日推荐
+    # 当日区块含十倍股/翻倍股全池评估与逐只深度分析，只渲染一次，主报告与归档共用
+    daily_section = None
     if holdings_only and (not top_list):
         # 仅持仓模式：不覆盖今日推荐（若已有则保留），避免把 top20 清空
         if today_daily_block.strip():
@@ -1420,9 +1428,10 @@ def save_incremental_report(
                                                       dual_advantage_stocks, mr_list, trend_list, hybrid_decision,
                                                       earnings_top, all_results=all_results))
     else:
-        report_parts.append(_render_daily_section(today, top_list, strategy_name, pool_size, valid_count,
-                                                  dual_advantage_stocks, mr_list, trend_list, hybrid_decision,
-                                                  earnings_top, all_results=all_results))
+        daily_section = _render_daily_section(today, top_list, strategy_name, pool_size, valid_count,
+                                              dual_advantage_stocks, mr_list, trend_list, hybrid_decision,
+                                              earnings_top, all_results=all_results)
+        report_parts.append(daily_section)
 
     # 4. 健康上涨组推荐（趋势跟随型）
     if not holdings_only and all_results:
@@ -1450,12 +1459,9 @@ def save_incremental_report(
 
     # 同时保存当日独立归档
     archive_path = os.path.join(DAILY_ARCHIVE_DIR, f'daily_recommendation_{today}.md')
-    if not (holdings_only and (not top_list)):
+    if daily_section is not None:
         with open(archive_path, 'w', encoding='utf-8') as f:
-            f.write(f"# 📈 每日选股推荐 — {today}\n\n")
-            f.write(_render_daily_section(today, top_list, strategy_name, pool_size, valid_count,
-                                         dual_advantage_stocks, mr_list, trend_list, hybrid_decision,
-                                         earnings_top, all_results=all_results))
+            f.write(f"# 📈 每日选股推荐 — {today}\n\n{daily_section}")
 
     return REPORT_FILE, archive_path
 
@@ -1666,10 +1672,10 @@ def _generate_healthy_growth_section(all_results: list, today: str) -> str:
 # 数据获取
 # ============================================================
 
-def fetch_stock_data(code: str, days: int = 200) -> pd.DataFrame:
-    """获取 K 线数据：优先拉取最新数据，失败时降级用缓存"""
+def fetch_stock_data(code: str, days: int = 200, refresh: bool = False) -> pd.DataFrame:
+    """获取 K 线数据：优先拉取最新数据，失败时降级用缓存；refresh=True 忽略缓存全量重拉"""
     try:
-        df = update_kline_cache(code, days=days)
+        df = update_kline_cache(code, days=days, refresh=refresh)
         if df is None:
             df = pd.DataFrame()
         df = _sanitize_ohlcv(df)
@@ -1710,15 +1716,92 @@ def load_stock_pool(pool_file: str, max_count: int = 0) -> list:
 # 技术指标扩展分析
 # ============================================================
 
+_STATS_WINDOW = 61  # 60 日涨跌幅需要 61 根，其余统计都在此窗口内
+
+
+def price_stats_batch(frames: list) -> list:
+    """
+    批量计算 analyze_stock_extended 的辅助技术指标（涨跌幅/量比/均线/趋势/60日高低点）。
+
+    各股末尾 61 根收盘价、成交量右对齐堆成 (n_stocks, 61) 矩阵（不足处补 NaN），
+    整批用 nan* 沿行一次算完，趋势用 np.select 判定；nan* 忽略补位，
+    与逐只对短序列切片的结果一致。返回与 frames 同序的字典列表。
+    """
+    n_stocks = len(frames)
+    if n_stocks == 0:
+        return []
+    w = _STATS_WINDOW
+    close = np.full((n_stocks, w), np.nan)
+    volume = np.full((n_stocks, w), np.nan)
+    lengths = np.empty(n_stocks, dtype=np.int64)
+    for r, df in enumerate(frames):
+        c = df['close'].to_numpy(dtype=np.float64)[-w:]
+        v = df['volume'].to_numpy(dtype=np.float64)[-w:]
+        close[r, w - c.size:] = c
+        volume[r, w - v.size:] = v
+        lengths[r] = len(df)
+
+    # 补位的 NaN / 零成交量只会落在 np.where 不取的分支上，屏蔽其告警
+    with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        rows = np.arange(n_stocks)
+        price = close[:, -1]
+
+        # 涨跌幅：序列不足时以首根为基准，与逐只版 close[max(0, n-6)] 一致
+        base_5 = close[rows, w - np.minimum(lengths, 6)]
+        base_20 = close[rows, w - np.minimum(lengths, 21)]
+        change_5d = np.where(lengths > 1, (price / base_5 - 1) * 100, 0.0)
+        change_20d = np.where(lengths > 1, (price / base_20 - 1) * 100, 0.0)
+        change_60d = np.where(lengths > 60, (price / close[:, 0] - 1) * 100, 0.0)
+
+        # 量比
+        avg_vol_5 = np.where(lengths > 5, np.nanmean(volume[:, -6:-1], axis=1), 1.0)
+        vol_ratio = np.where(avg_vol_5 > 0, volume[:, -1] / avg_vol_5, 1.0)
+
+        # 均线
+        ma5 = np.nanmean(close[:, -5:], axis=1)
+        ma10 = np.where(lengths >= 10, np.nanmean(close[:, -10:], axis=1), ma5)
+        ma20 = np.where(lengths >= 20, np.nanmean(close[:, -20:], axis=1), ma5)
+        ma60 = np.where(lengths >= 60, np.nanmean(close[:, -60:], axis=1), ma20)
+
+        # 趋势
+        trend = np.select(
+            [(price > ma5) & (ma5 > ma20), (price < ma5) & (ma5 < ma20), price > ma20],
+            ['多头排列↑', '空头排列↓', '偏多↗'], default='偏空↘')
+
+        # 60日高低点距离
+        dist_high = (price / np.nanmax(close[:, -60:], axis=1) - 1) * 100
+        dist_low = (price / np.nanmin(close[:, -60:], axis=1) - 1) * 100
+
+    cols = {
+        'change_5d': change_5d, 'change_20d': change_20d, 'change_60d': change_60d,
+        'volume_ratio': vol_ratio, 'ma5': ma5, 'ma10': ma10, 'ma20': ma20, 'ma60': ma60,
+    }
+    rounded = {k: [round(x, 2) for x in v.tolist()] for k, v in cols.items()}
+    high_r = [round(x, 2) for x in dist_high.tolist()]
+    low_r = [round(x, 2) for x in dist_low.tolist()]
+    price_l = price.tolist()
+    trend_l = trend.tolist()
+    return [{
+        'price': price_l[r],
+        **{k: v[r] for k, v in rounded.items()},
+        'trend': trend_l[r],
+        'distance_from_high': high_r[r],
+        'distance_from_low': low_r[r],
+    } for r in range(n_stocks)]
+
+
 def analyze_stock_extended(df: pd.DataFrame, strat,
                            pe_strat: PEStrategy = None,
                            pb_strat: PBStrategy = None,
-                           fund_flow_signal: dict = None) -> dict:
+                           fund_flow_signal: dict = None,
+                           stats: dict = None) -> dict:
     """
     扩展分析：MACD信号 + 基本面PE/PB信号 + 资金流信号 + 辅助技术指标
 
     Args:
         fund_flow_signal: 资金流信号字典（来自fundamental_fetcher.get_fund_flow_signal）
+        stats: price_stats_batch 已算好的该股辅助指标；为 None 时按单只现算
 
     Returns:
         {
@@ -1742,51 +1825,12 @@ def analyze_stock_extended(df: pd.DataFrame, strat,
             'fund_flow_reason': str,   # 资金流原因
         }
     """
-    close = df['close']
-    volume = df['volume']
-    price = float(close.iloc[-1])
+    if stats is None:
+        stats = price_stats_batch([df])[0]
 
     # MACD信号
     signal = strat.safe_analyze(df)
 
-    # 涨跌幅
-    if len(df) > 1:
-        idx_5 = max(0, len(df) - 6)
-        idx_20 = max(0, len(df) - 21)
-        idx_60 = max(0, len(df) - 61)
-        change_5d = (price / float(close.iloc[idx_5]) - 1) * 100
-        change_20d = (price / float(close.iloc[idx_20]) - 1) * 100
-        change_60d = (price / float(close.iloc[idx_60]) - 1) * 100
-    else:
-        change_5d = change_20d = change_60d = 0.0
-    change_60d = (price / float(close.iloc[-61]) - 1) * 100 if len(df) > 60 else 0
-
-    # 量比
-    avg_vol_5 = float(volume.iloc[-6:-1].mean()) if len(df) > 5 else 1
-    vol_ratio = float(volume.iloc[-1]) / avg_vol_5 if avg_vol_5 > 0 else 1
-
-    # 均线
-    ma5 = float(close.iloc[-5:].mean())
-    ma10 = float(close.iloc[-10:].mean()) if len(df) >= 10 else ma5
-    ma20 = float(close.iloc[-20:].mean()) if len(df) >= 20 else ma5
-    ma60 = float(close.iloc[-60:].mean()) if len(df) >= 60 else ma20
-
-    # 趋势
-    if price > ma5 > ma20:
-        trend = '多头排列↑'
-    elif price < ma5 < ma20:
-        trend = '空头排列↓'
-    elif price > ma20:
-        trend = '偏多↗'
-    else:
-        trend = '偏空↘'
-
-    # 60日高低点距离
-    high_60 = float(close.iloc[-60:].max()) if len(df) >= 60 else float(close.max())
-    low_60 = float(close.iloc[-60:].min()) if len(df) >= 60 else float(close.min())
-    dist_high = (price / high_60 - 1) * 100
-    dist_low = (price / low_60 - 1) * 100
-
     # 基本面信号
     pe_signal = 'N/A'
     pb_signal = 'N/A'
@@ -1819,18 +1863,7 @@ def analyze_stock_extended(df: pd.DataFrame, strat,
     
     return {
         'signal': signal,
-        'price': price,
-        'change_5d': round(change_5d, 2),
-        'change_20d': round(change_20d, 2),
-        'change_60d': round(change_60d, 2),
-        'volume_ratio': round(vol_ratio, 2),
-        'ma5': round(ma5, 2),
-        'ma10': round(ma10, 2),
-        'ma20': round(ma20, 2),
-        'ma60': round(ma60, 2),
-        'trend': trend,
-        'distance_from_high': round(dist_high, 2),
-        'distance_from_low': round(dist_low, 2),
+        **stats,
         'pe_signal': pe_signal,
         'pb_signal': pb_signal,
         'pe_ttm': pe_ttm,
@@ -1935,6 +1968,50 @@ def compute_score(info: dict) -> float:
     return round(score, 1)
 
 
+def compute_scores_vec(df: pd.DataFrame) -> np.ndarray:
+    """
+    compute_score 的批量版：直接在结果表的列上计算，各分项用 np.where / np.select
+    在整批股票上一次算完，分项相加顺序与逐只版相同，结果逐位一致。
+
+    df 为单策略结果表（列名同 main 中 all_results 的记录：action/confidence/trend/
+    volume_ratio/change_5d/dist_high/pe_signal/pb_signal/fund_flow_signal）。
+    """
+    if df.empty:
+        return np.zeros(0)
+    action = df['action'].to_numpy(dtype=str)
+    conf = df['confidence'].to_numpy(dtype=np.float64)
+    trend = df['trend'].to_numpy(dtype=str)
+    vr = df['volume_ratio'].to_numpy(dtype=np.float64)
+    chg5 = df['change_5d'].to_numpy(dtype=np.float64)
+    dist = df['dist_high'].to_numpy(dtype=np.float64)
+    pe = df['pe_signal'].to_numpy(dtype=str)
+    pb = df['pb_signal'].to_numpy(dtype=str)
+    flow = df['fund_flow_signal'].to_numpy(dtype=str)
+    is_buy = action == 'BUY'
+    is_sell = action == 'SELL'
+
+    macd = np.where(is_buy, 20 + conf * 15, np.where(is_sell, -(20 + conf * 15), 0.0))
+    trend_s = np.select(
+        [np.char.find(trend, '多头') >= 0, np.char.find(trend, '偏多') >= 0,
+         np.char.find(trend, '偏空') >= 0, np.char.find(trend, '空头') >= 0],
+        [20.0, 10.0, -10.0, -20.0], default=0.0)
+    vol = np.select(
+        [is_buy & (vr > 1.5), is_buy & (vr > 1.0), is_buy,
+         is_sell & (vr > 2.0), is_sell & (vr > 1.5), is_sell & (vr > 1.0), is_sell],
+        [15.0, 8.0, 3.0, -15.0, -10.0, -5.0, -2.0], default=0.0)
+    chg = np.select(
+        [(chg5 > 0) & (chg5 < 10), chg5 > 10, (chg5 > -5) & (chg5 < 0)],
+        [10.0, 5.0, 3.0], default=-5.0)
+    pos = np.select([dist > -5, dist > -15, dist > -30], [2.0, 10.0, 5.0], default=-5.0)
+    pe_s = np.select([pe == 'BUY', pe == 'SELL'], [5.0, -3.0], default=0.0)
+    pb_s = np.select([pb == 'BUY', pb == 'SELL'], [5.0, -3.0], default=0.0)
+    flow_s = np.select([flow == 'bullish', flow == 'bearish'], [8.0, -5.0], default=0.0)
+
+    total = 0.0 + macd + trend_s + vol + chg + pos + pe_s + pb_s + flow_s
+    # Python round 与逐只版口径一致（np.round 在 .x5 边界上可能差一位）
+    return np.array([round(x, 1) for x in total.tolist()])
+
+
 # ============================================================
 # 14 策略全量分析（与持仓分析一致）
 # ============================================================
@@ -1989,13 +2066,37 @@ _KLINE_CIRCUIT_THRESHOLD = 30
 _kline_fails_lock = threading.Lock()
 
 
-def update_kline_cache(code: str, cache_dir: str = None, days: int = 200) -> pd.DataFrame:
+_KLINE_DELTA_MARGIN = 5  # 增量拉取时多取的重叠根数，覆盖盘中临时 bar 与节假日误差
+_KLINE_BASIS_TOL = 0.011  # 重叠 bar 收盘价允许的差（元）：分位四舍五入 + 浮点误差
+
+
+def _kline_basis_changed(cached_df: pd.DataFrame, new_df: pd.DataFrame) -> bool:
+    """
+    增量数据与缓存在重叠日期上的收盘价是否不一致。
+
+    前复权价在除权除息后整段重算，旧缓存里的历史 bar 与新拉到的 bar 不再同一基准；
+    重叠 bar 差出分位舍入以上时返回 True，调用方应全量重拉。
+    """
+    if 'date' not in new_df.columns or 'close' not in new_df.columns:
+        return False
+    overlap = cached_df[['date', 'close']].merge(new_df[['date', 'close']], on='date',
+                                                 suffixes=('_old', '_new'))
+    if overlap.empty:
+        return False
+    diff = (overlap['close_old'].astype(float) - overlap['close_new'].astype(float)).abs()
+    return bool((diff > _KLINE_BASIS_TOL).any())
+
+
+def update_kline_cache(code: str, cache_dir: str = None, days: int = 200,
+                       refresh: bool = False) -> pd.DataFrame:
     """
     增量更新K线缓存：优先拉取最新数据，拉不到时降级用缓存。
     
     缓存跳过条件（避免重复请求）：
     - 缓存已包含最近一个交易日数据 → 直接返回
-    - 否则 → 尝试下载，失败则降级用缓存
+    - 否则 → 只拉缓存末日之后的增量（多取几根重叠），失败则降级用缓存；
+      重叠 bar 与缓存对不上（除权后复权基准变了）时自动全量重拉
+    - refresh=True：不看缓存新旧，全量拉取 days 根并覆盖缓存（除权后复权价需要重建时用）
 
     熔断机制：连续失败 N 次后自动切换为纯缓存模式，避免串行等待浪费时间。
     """
@@ -2005,7 +2106,8 @@ def update_kline_cache(code: str, cache_dir: str = None, days: int = 200) -> pd.
     if not cache_dir:
         cache_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'mydate', 'backtest_kline')
 
-    cached_df = load_cached_kline(code, cache_dir)
+    disk_df = load_cached_kline(code, cache_dir)
+    cached_df = pd.DataFrame() if refresh else disk_df
 
     now = datetime.now()
     today_str = now.strftime('%Y-%m-%d')
@@ -2016,6 +2118,12 @@ def update_kline_cache(code: str, cache_dir: str = None, days: int = 200) -> pd.
     parquet_stale = _kline_parquet_stale_on_weekday(code, cache_dir, now)
     effective_for_skip = pd.DataFrame() if parquet_stale else cached_df
 
+    # 缓存历史够长时只拉末日之后的增量；日历天数不少于其间的交易日数
+    datalen = days
+    if len(cached_df) >= days and 'date' in cached_df.columns:
+        gap = (pd.Timestamp(now.date()) - pd.Timestamp(cached_df['date'].max())).days
+        datalen = int(min(days, max(gap, 0) + _KLINE_DELTA_MARGIN))
+
     if not effective_for_skip.empty and 'date' in effective_for_skip.columns:
         last_date = pd.Timestamp(effective_for_skip['date'].max())
         days_behind = (pd.Timestamp(now.date()) - last_date).days
@@ -2033,8 +2141,8 @@ def update_kline_cache(code: str, cache_dir: str = None, days: int = 200) -> pd.
     # 熔断：连续失败超阈值，直接用缓存，不再浪费时间等网络
     with _kline_fails_lock:
         if _kline_consecutive_fails >= _KLINE_CIRCUIT_THRESHOLD:
-            if not cached_df.empty:
-                return cached_df
+            if not disk_df.empty:
+                return disk_df
             return pd.DataFrame()
 
     # 需要更新：下载最新数据（缩短超时，快速失败）
@@ -2045,7 +2153,7 @@ def update_kline_cache(code: str, cache_dir: str = None, days: int = 200) -> pd.
         effective_timeout = 8 if _kline_consecutive_fails < 3 else 4
     try:
         with ThreadPoolExecutor(max_workers=1) as ex:
-            fut = ex.submit(provider.get_kline, symbol=code, datalen=days, min_bars=1, retries=1, timeout=6)
+            fut = ex.submit(provider.get_kline, symbol=code, datalen=datalen, min_bars=1, retries=1, timeout=6)
             new_df = fut.result(timeout=effective_timeout)
     except (FutureTimeout, Exception) as e:
         logger.warning(f"数据获取超时或失败({code}): {e}")
@@ -2055,10 +2163,27 @@ def update_kline_cache(code: str, cache_dir: str = None, days: int = 200) -> pd.
             _kline_consecutive_fails += 1
             if _kline_consecutive_fails == _KLINE_CIRCUIT_THRESHOLD:
                 print(f"⚡ 网络数据源连续{_KLINE_CIRCUIT_THRESHOLD}次失败，切换纯缓存模式（加速处理）")
-        return cached_df if not cached_df.empty else pd.DataFrame()
+        return disk_df if not disk_df.empty else pd.DataFrame()
     
     with _kline_fails_lock:
         _kline_consecutive_fails = 0
+
+    # 增量与缓存在重叠 bar 上对不上（除权后前复权基准变了）：全量重拉，丢弃旧缓存
+    if datalen < days and not cached_df.empty and _kline_basis_changed(cached_df, new_df):
+        logger.info(f"{code} 缓存复权基准与最新数据不一致，全量重拉 {days} 根")
+        full_df = None
+        try:
+            with ThreadPoolExecutor(max_workers=1) as ex:
+                fut = ex.submit(provider.get_kline, symbol=code, datalen=days, min_bars=1,
+                                retries=1, timeout=6)
+                full_df = fut.result(timeout=effective_timeout)
+        except (FutureTimeout, Exception) as e:
+            logger.warning(f"全量重拉超时或失败({code}): {e}")
+        if full_df is None or full_df.empty:
+            # 拿不到同一基准的全量数据时，不把两种基准的 bar 拼在一起
+            return disk_df
+        new_df = full_df
+        cached_df = pd.DataFrame()
     
     if not cached_df.empty:
         combined = pd.concat([cached_df, new_df], ignore_index=True)
@@ -3112,6 +3237,8 @@ def main():
                         help='策略: macd | ensemble(14策略固定权重，推荐) | full_11/full_12(同ensemble，兼容命令)')
     parser.add_argument('--cache-only', action='store_true', default=False,
                         help='纯缓存模式：只使用本地缓存，不发起任何网络请求（适合API限流时）')
+    parser.add_argument('--refresh', action='store_true', default=False,
+                        help='忽略本地K线缓存，全量重新拉取并覆盖（除权后复权价不连续时用）')
     parser.add_argument('--fast', type=int, default=12, help='MACD快线(仅macd模式)')
     parser.add_argument('--slow', type=int, default=30, help='MACD慢线(仅macd模式)')
     parser.add_argument('--signal', type=int, default=9, help='MACD信号线(仅macd模式)')
@@ -3297,6 +3424,17 @@ def main():
 
         _cache_only = args.cache_only
 
+        # 盘中先用新浪多代码接口批量预取实时行情，get_kline 拼接当日数据时直接命中缓存（阶段1结束时清空）
+        _now = datetime.now()
+        if not _cache_only and is_cn_trading_day(_now.date()) and (_now.hour, _now.minute) >= (9, 15):
+            try:
+                from src.data.provider.adapters import prefetch_realtime_bars
+                _rt_codes = [si.get('code') or si.get('symbol', '') for si in stocks]
+                _rt_n = prefetch_realtime_bars([c for c in _rt_codes if c])
+                print(f"   实时行情批量预取: {_rt_n}/{len(_rt_codes)}")
+            except Exception as e:
+                logger.debug("实时行情批量预取失败: %s", e)
+
         def _fetch_one_stock(stock_info):
             """单只股票的数据获取（线程安全）"""
             code = stock_info.get('code') or stock_info.get('symbol', '')
@@ -3311,7 +3449,7 @@ def main():
                 df = load_cached_kline(code, cache_dir) if use_kline_cache else pd.DataFrame()
             else:
                 try:
-                    df = update_kline_cache(code, cache_dir, days=200)
+                    df = update_kline_cache(code, cache_dir, days=200, refresh=args.refresh)
                 except Exception:
                     df = load_cached_kline(code, cache_dir) if use_kline_cache else pd.DataFrame()
             df = _sanitize_ohlcv(df)
@@ -3428,6 +3566,9 @@ def main():
             print(f"  ✅ 缓存兜底恢复: {_cache_recovered}只, 仍无数据: {not_done - _cache_recovered}只", flush=True)
         finally:
             executor.shutdown(wait=False, cancel_futures=True)
+            # 预取的实时行情只服务于本阶段，结束即清空，后续阶段重新按源优先级获取
+            from src.data.provider.adapters import clear_realtime_cache
+            clear_realtime_cache()
         
         try:
             fetcher._bs_logout()
@@ -4688,85 +4829,113 @@ def main():
     all_results = []
     fail_count = 0
 
-    for i, stock in enumerate(stocks, 1):
-        code = stock['code']
-        name = stock['name']
-        sector = stock.get('sector', '')
+    # K 线拉取是纯 I/O，先全部提交到线程池并发预取；分析仍按原顺序串行
+    # （strat.set_symbol 有状态，基本面接口走 baostock 单连接，都不宜多线程）
+    frames = []
+    with ThreadPoolExecutor(max_workers=8) as kline_pool:
+        kline_futures = [kline_pool.submit(fetch_stock_data, s['code'], 200, args.refresh)
+                         for s in stocks]
+        for fut in kline_futures:
+            try:
+                frames.append(fut.result())
+            except Exception:
+                frames.append(pd.DataFrame())
 
-        # 进度
-        if len(stocks) <= 50:
-            print(f"\r  分析 [{i}/{len(stocks)}] {code} {name} ...", end='', flush=True)
-        elif i == 1 or i % 50 == 0 or i == len(stocks):
-            pct = i / len(stocks) * 100
-            bar = '█' * int(pct / 2) + '░' * (50 - int(pct / 2))
-            print(f"\r  [{bar}] {i}/{len(stocks)} ({pct:.0f}%)", end='', flush=True)
+    # 辅助技术指标（涨跌幅/量比/均线/趋势/高低点）整池一次向量化算完，循环内只跑策略信号
+    valid_idx = [j for j, f in enumerate(frames) if len(f) >= strat.min_bars]
+    pool_stats = dict(zip(valid_idx, price_stats_batch([frames[j] for j in valid_idx])))
 
-        # 获取数据（统一接口自带重试和降级）
-        df = fetch_stock_data(code, 200)
+    # 终端下用进度条（tqdm 刷新限频，未安装时手写 \r 进度行）；
+    # 输出被重定向到日志时不写回车刷新，每 50 只打一行
+    is_tty = sys.stdout.isatty()
+    progress = (tqdm(total=len(stocks), desc='  分析', unit='只', mininterval=0.1)
+                if tqdm and is_tty else None)
 
-        if len(df) < strat.min_bars:
-            fail_count += 1
-            continue
+    try:
+        for i, stock in enumerate(stocks, 1):
+            code = stock['code']
+            name = stock['name']
+            sector = stock.get('sector', '')
+
+            # 进度
+            if progress is not None:
+                progress.update(1)
+            elif not is_tty:
+                if i % 50 == 0 or i == len(stocks):
+                    print(f"  分析进度 {i}/{len(stocks)}")
+            elif len(stocks) <= 50:
+                print(f"\r  分析 [{i}/{len(stocks)}] {code} {name} ...", end='', flush=True)
+            elif i == 1 or i % 50 == 0 or i == len(stocks):
+                pct = i / len(stocks) * 100
+                bar = '█' * int(pct / 2) + '░' * (50 - int(pct / 2))
+                print(f"\r  [{bar}] {i}/{len(stocks)} ({pct:.0f}%)", end='', flush=True)
+
+            # 获取数据（统一接口自带重试和降级，已在线程池中预取）
+            df = frames[i - 1]
 
-        # 合并基本面数据（PE/PB）
-        fund_flow_signal = None
-        if fund_fetcher:
-            try:
-                start_dt = df['date'].iloc[0].strftime('%Y%m%d')
-                end_dt = df['date'].iloc[-1].strftime('%Y%m%d')
-                fund_df = fund_fetcher.get_daily_basic(code, start_date=start_dt, end_date=end_dt)
-                if not fund_df.empty:
-                    df = fund_fetcher.merge_to_daily(df, fund_df, fill_method='ffill')
-                
-                # 获取资金流信号
+            if len(df) < strat.min_bars:
+                fail_count += 1
+                continue
+
+            # 合并基本面数据（PE/PB）
+            fund_flow_signal = None
+            if fund_fetcher:
                 try:
-                    fund_flow_signal = fund_fetcher.get_fund_flow_signal(code)
+                    start_dt = df['date'].iloc[0].strftime('%Y%m%d')
+                    end_dt = df['date'].iloc[-1].strftime('%Y%m%d')
+                    fund_df = fund_fetcher.get_daily_basic(code, start_date=start_dt, end_date=end_dt)
+                    if not fund_df.empty:
+                        df = fund_fetcher.merge_to_daily(df, fund_df, fill_method='ffill')
+                
+                    # 获取资金流信号
+                    try:
+                        fund_flow_signal = fund_fetcher.get_fund_flow_signal(code)
+                    except Exception:
+                        pass
                 except Exception:
                     pass
-            except Exception:
-                pass
 
-        # 注入 symbol + sector，让子策略知道当前标的及行业
-        if hasattr(strat, 'set_symbol'):
-            strat.set_symbol(code, name, sector=sector)
-
-        info = analyze_stock_extended(df, strat, pe_strat, pb_strat, fund_flow_signal)
-        score = compute_score(info)
-
-        all_results.append({
-            'code': code,
-            'name': name,
-            'sector': sector,
-            'action': info['signal'].action,
-            'confidence': info['signal'].confidence,
-            'position': info['signal'].position,
-            'reason': info['signal'].reason,
-            'price': info['price'],
-            'change_5d': info['change_5d'],
-            'change_20d': info['change_20d'],
-            'change_60d': info.get('change_60d', 0),
-            'volume_ratio': info['volume_ratio'],
-            'trend': info['trend'],
-            'ma5': info['ma5'],
-            'ma10': info['ma10'],
-            'ma20': info['ma20'],
-            'ma60': info['ma60'],
-            'dist_high': info['distance_from_high'],
-            'dist_low': info['distance_from_low'],
-            'score': score,
-            'dif': info['signal'].indicators.get('DIF', 0),
-            'dea': info['signal'].indicators.get('DEA', 0),
-            'pe_signal': info['pe_signal'],
-            'pb_signal': info['pb_signal'],
-            'pe_ttm': info['pe_ttm'],
-            'pe_quantile': info['pe_quantile'],
-            'pb': info['pb'],
-            'pb_quantile': info['pb_quantile'],
-            'fund_flow_signal': info.get('fund_flow_signal', 'neutral'),
-            'fund_flow_reason': info.get('fund_flow_reason', ''),
-        })
-
-        time.sleep(0.05)
+            # 注入 symbol + sector，让子策略知道当前标的及行业
+            if hasattr(strat, 'set_symbol'):
+                strat.set_symbol(code, name, sector=sector)
+
+            info = analyze_stock_extended(df, strat, pe_strat, pb_strat, fund_flow_signal,
+                                          stats=pool_stats[i - 1])
+
+            all_results.append({
+                'code': code,
+                'name': name,
+                'sector': sector,
+                'action': info['signal'].action,
+                'confidence': info['signal'].confidence,
+                'position': info['signal'].position,
+                'reason': info['signal'].reason,
+                'price': info['price'],
+                'change_5d': info['change_5d'],
+                'change_20d': info['change_20d'],
+                'change_60d': info.get('change_60d', 0),
+                'volume_ratio': info['volume_ratio'],
+                'trend': info['trend'],
+                'ma5': info['ma5'],
+                'ma10': info['ma10'],
+                'ma20': info['ma20'],
+                'ma60': info['ma60'],
+                'dist_high': info['distance_from_high'],
+                'dist_low': info['distance_from_low'],
+                'dif': info['signal'].indicators.get('DIF', 0),
+                'dea': info['signal'].indicators.get('DEA', 0),
+                'pe_signal': info['pe_signal'],
+                'pb_signal': info['pb_signal'],
+                'pe_ttm': info['pe_ttm'],
+                'pe_quantile': info['pe_quantile'],
+                'pb': info['pb'],
+                'pb_quantile': info['pb_quantile'],
+                'fund_flow_signal': info.get('fund_flow_signal', 'neutral'),
+                'fund_flow_reason': info.get('fund_flow_reason', ''),
+            })
+    finally:
+        if progress is not None:
+            progress.close()
 
     if fail_count:
         print(f"\n⚠️  {fail_count} 只数据不足，已跳过")
@@ -4775,10 +4944,18 @@ def main():
     # 分类排序
     # ============================================================
     df_all = pd.DataFrame(all_results)
-
-    buy_stocks = df_all[df_all['action'] == 'BUY'].sort_values('score', ascending=False)
-    sell_stocks = df_all[df_all['action'] == 'SELL'].sort_values('score', ascending=True)
-    hold_stocks = df_all[df_all['action'] == 'HOLD'].sort_values('score', ascending=False)
+    # 全部股票分析完后在结果表上一次性向量化打分
+    df_all['score'] = compute_scores_vec(df_all)
+    # action 只有三种取值，转为分类类型后比较/分组都在整数编码上进行
+    df_all['action'] = pd.Categorical(df_all['action'], categories=['BUY', 'SELL', 'HOLD'])
+
+    # 一次排序后按 action 分组：SELL 按评分升序，BUY/HOLD 降序（取负分统一成升序）
+    sort_key = np.where(df_all['action'] == 'SELL', df_all['score'], -df_all['score'])
+    ranked = df_all.assign(_key=sort_key).sort_values('_key', kind='stable').drop(columns='_key')
+    groups = dict(list(ranked.groupby('action', sort=False, observed=True)))
+    buy_stocks = groups.get('BUY', df_all.iloc[:0])
+    sell_stocks = groups.get('SELL', df_all.iloc[:0])
+    hold_stocks = groups.get('HOLD', df_all.iloc[:0])
 
     # ============================================================
     # 终端输出
@@ -4791,18 +4968,18 @@ def main():
         print(f"{'排名':>4} {'代码':>8} {'名称':>8} {'价格':>8} {'评分':>6} "
               f"{'信心':>5} {'仓位':>5} {'5日涨幅':>8} {'量比':>5} {'PE':>6} {'PB':>5} {'资金流':>6} {'趋势':>8} {'理由'}")
         print("-" * 145)
-        for rank, (_, row) in enumerate(buy_stocks.head(args.top).iterrows(), 1):
-            star = '🌟' if row['score'] >= 60 else ('⭐' if row['score'] >= 45 else '  ')
-            pe_str = f"{row['pe_ttm']:.0f}" if pd.notna(row.get('pe_ttm')) and row.get('pe_ttm') else '-'
-            pb_str = f"{row['pb']:.1f}" if pd.notna(row.get('pb')) and row.get('pb') else '-'
-            flow_emoji = '🟢' if row.get('fund_flow_signal') == 'bullish' else ('🔴' if row.get('fund_flow_signal') == 'bearish' else '⚪')
-            flow_str = f"{flow_emoji}{row.get('fund_flow_signal', 'neutral')[:4]}"
-            print(f"{star}{rank:>2} {row['code']:>8} {row['name']:>8} "
-                  f"{row['price']:>8.2f} {row['score']:>6.1f} "
-                  f"{row['confidence']:>5.0%} {row['position']:>5.0%} "
-                  f"{row['change_5d']:>+8.2f}% {row['volume_ratio']:>5.1f}x "
+        for rank, row in enumerate(buy_stocks.head(args.top).itertuples(index=False), 1):
+            star = '🌟' if row.score >= 60 else ('⭐' if row.score >= 45 else '  ')
+            pe_str = f"{row.pe_ttm:.0f}" if pd.notna(row.pe_ttm) and row.pe_ttm else '-'
+            pb_str = f"{row.pb:.1f}" if pd.notna(row.pb) and row.pb else '-'
+            flow_emoji = '🟢' if row.fund_flow_signal == 'bullish' else ('🔴' if row.fund_flow_signal == 'bearish' else '⚪')
+            flow_str = f"{flow_emoji}{row.fund_flow_signal[:4]}"
+            print(f"{star}{rank:>2} {row.code:>8} {row.name:>8} "
+                  f"{row.price:>8.2f} {row.score:>6.1f} "
+                  f"{row.confidence:>5.0%} {row.position:>5.0%} "
+                  f"{row.change_5d:>+8.2f}% {row.volume_ratio:>5.1f}x "
                   f"{pe_str:>6} {pb_str:>5} {flow_str:>6} "
-                  f"{row['trend']:>8} {row['reason'][:30]}")
+                  f"{row.trend:>8} {row.reason[:30]}")
     else:
         print("  ⚠️ 今日无买入信号")
 
@@ -4811,9 +4988,9 @@ def main():
     print(f"{'='*70}")
 
     if len(sell_stocks) > 0:
-        for rank, (_, row) in enumerate(sell_stocks.head(10).iterrows(), 1):
-            print(f"  {rank:>2}. {row['code']} {row['name']:8s} "
-                  f"¥{row['price']:.2f} | 5日{row['change_5d']:+.2f}% | {row['reason'][:50]}")
+        for rank, row in enumerate(sell_stocks.head(10).itertuples(index=False), 1):
+            print(f"  {rank:>2}. {row.code} {row.name:8s} "
+                  f"¥{row.price:.2f} | 5日{row.change_5d:+.2f}% | {row.reason[:50]}")
     else:
         print("  ✅ 今日无卖出信号")
 
@@ -4855,21 +5032,21 @@ def main():
         print("  " + "-" * 90)
 
         total_used = 0
-        for _, row in top_buys.iterrows():
-            weight = min(row['score'] / total_score, max_per_stock)
+        for row in top_buys.itertuples(index=False):
+            weight = min(row.score / total_score, max_per_stock)
             amount = total_capital * weight
-            shares = int(amount / row['price'] / 100) * 100  # 整百股
+            shares = int(amount / row.price / 100) * 100  # 整百股
 
             if shares <= 0:
                 continue
 
-            actual_amount = shares * row['price']
+            actual_amount = shares * row.price
             total_used += actual_amount
 
-            print(f"  {row['code']:>8} {row['name']:>8} "
-                  f"¥{row['price']:>7.2f} {weight:>7.0%} "
+            print(f"  {row.code:>8} {row.name:>8} "
+                  f"¥{row.price:>7.2f} {weight:>7.0%} "
                   f"¥{actual_amount:>9,.0f} {shares:>7}股 "
-                  f"{row['reason'][:35]}")
+                  f"{row.reason[:35]}")
 
         remaining = total_capital - total_used
         print(f"\n  💵 预计投入: ¥{total_used:,.0f}")
@@ -4882,33 +5059,33 @@ def main():
     # ============================================================
     # 将 ensemble/macd 结果转换为统一格式
     unified_results = []
-    for _, row in df_all.iterrows():
-        buy_count = 1 if row['action'] == 'BUY' else 0
-        sell_count = 1 if row['action'] == 'SELL' else 0
-        hold_count = 1 if row['action'] == 'HOLD' else 0
+    for row in df_all.itertuples(index=False):
+        buy_count = 1 if row.action == 'BUY' else 0
+        sell_count = 1 if row.action == 'SELL' else 0
+        hold_count = 1 if row.action == 'HOLD' else 0
         unified_results.append({
-            'code': row['code'],
-            'name': row['name'],
-            'price': row['price'],
-            'score': row['score'],
+            'code': row.code,
+            'name': row.name,
+            'price': row.price,
+            'score': row.score,
             'buy_count': buy_count,
             'sell_count': sell_count,
             'hold_count': hold_count,
-            'change_5d': row.get('change_5d', 0),
-            'change_20d': row.get('change_20d', 0),
-            'change_60d': row.get('change_60d', 0),
-            'sector': row.get('sector', ''),
+            'change_5d': row.change_5d,
+            'change_20d': row.change_20d,
+            'change_60d': row.change_60d,
+            'sector': row.sector,
             'signals': [],
-            'trend': row.get('trend', ''),
-            'volume_ratio': row.get('volume_ratio', 0),
-            'ma5': row.get('ma5', 0),
-            'ma10': row.get('ma10', 0),
-            'ma20': row.get('ma20', 0),
-            'ma60': row.get('ma60', 0),
-            'dist_high': row.get('dist_high', 0),
-            'dist_low': row.get('dist_low', 0),
-            'pe_ttm': row.get('pe_ttm'),
-            'pb': row.get('pb'),
+            'trend': row.trend,
+            'volume_ratio': row.volume_ratio,
+            'ma5': row.ma5,
+            'ma10': row.ma10,
+            'ma20': row.ma20,
+            'ma60': row.ma60,
+            'dist_high': row.dist_high,
+            'dist_low': row.dist_low,
+            'pe_ttm': row.pe_ttm,
+            'pb': row.pb,
         })
     unified_results.sort(key=lambda x: x['score'], reverse=True)
     top_list = unified_results[:args.top]
@@ -17,11 +17,14 @@
 """
 
 import argparse
+import itertools
 import json
 import os
+import queue
 import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
@@ -77,6 +80,51 @@ def prefetch_one(code: str, datalen: int, out_dir: str, min_bars: int = 100) ->
         return (code, False, str(e))
 
 
+def start_progress_printer(total: int):
+    """
+    启动后台进度输出线程：结果收集主循环只把 (序号, code, 描述) 入队，
+    格式化与写 stdout 由守护线程完成，不阻塞结果收集。
+
+    返回 (q, stop)：q.put((i, code, msg)) 推送进度；结束时调用 stop() 刷完队列。
+    """
+    q = queue.SimpleQueue()
+    fmt = "  [{}/" + str(total) + "] {} {}\n"
+
+    def drain():
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            sys.stdout.write(fmt.format(*item))
+        sys.stdout.flush()
+
+    th = threading.Thread(target=drain, daemon=True)
+    th.start()
+
+    def stop():
+        q.put(None)
+        th.join()
+
+    return q, stop
+
+
+def iter_bounded(executor, fn, items, max_pending: int):
+    """
+    限流提交：在途任务不超过 max_pending，完成一个补交一个，按完成顺序产出 fn(item) 的结果。
+
+    相比一次性 submit 全部标的，在途 future 与结果数据保持 O(workers)，
+    Ctrl+C 中断时也不会残留大批待执行任务。
+    """
+    it = iter(items)
+    pending = {executor.submit(fn, item) for item in itertools.islice(it, max_pending)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            for nxt in itertools.islice(it, 1):
+                pending.add(executor.submit(fn, nxt))
+            yield fut.result()
+
+
 def get_codes_to_update(out_dir: str) -> tuple:
     """
     获取需要更新的标的列表（用于 --update）。
@@ -210,18 +258,22 @@ def main():
         start = time.time()
         ok, fail = 0, 0
         failed_codes = []
-        with ThreadPoolExecutor(max_workers=args.workers) as ex:
-            futures = {ex.submit(prefetch_one, code, args.datalen, out_dir): code for code in codes}
-            for i, fut in enumerate(as_completed(futures)):
-                code, success, reason = fut.result()
-                if success:
-                    ok += 1
-                    if (i + 1) % 50 == 0 or i < 3:
-                        print(f"  [{i+1}/{len(codes)}] {code} 已更新 {reason}")
-                else:
-                    fail += 1
-                    failed_codes.append(code)
-                    print(f"  [{i+1}/{len(codes)}] {code} 失败: {reason}")
+        progress, stop_progress = start_progress_printer(len(codes))
+        try:
+            with ThreadPoolExecutor(max_workers=args.workers) as ex:
+                fetch = lambda c: prefetch_one(c, args.datalen, out_dir)
+                for i, (code, success, reason) in enumerate(
+                        iter_bounded(ex, fetch, codes, 2 * args.workers)):
+                    if success:
+                        ok += 1
+                        if (i + 1) % 50 == 0 or i < 3:
+                            progress.put((i + 1, code, f"已更新 {reason}"))
+                    else:
+                        fail += 1
+                        failed_codes.append(code)
+                        progress.put((i + 1, code, f"失败: {reason}"))
+        finally:
+            stop_progress()
         elapsed = time.time() - start
 
         try:
@@ -265,17 +317,21 @@ def main():
     start = time.time()
     ok, fail = 0, 0
     failed_codes = []
-    with ThreadPoolExecutor(max_workers=args.workers) as ex:
-        futures = {ex.submit(prefetch_one, s["code"], args.datalen, out_dir): s["code"] for s in stocks}
-        for i, fut in enumerate(as_completed(futures)):
-            code, success, reason = fut.result()
-            if success:
-                ok += 1
-                print(f"  [{i+1}/{len(stocks)}] {code} 已写入 {reason}")
-            else:
-                fail += 1
-                failed_codes.append(code)
-                print(f"  [{i+1}/{len(stocks)}] {code} 失败: {reason}")
+    progress, stop_progress = start_progress_printer(len(stocks))
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as ex:
+            fetch = lambda c: prefetch_one(c, args.datalen, out_dir)
+            for i, (code, success, reason) in enumerate(
+                    iter_bounded(ex, fetch, [s["code"] for s in stocks], 2 * args.workers)):
+                if success:
+                    ok += 1
+                    progress.put((i + 1, code, f"已写入 {reason}"))
+                else:
+                    fail += 1
+                    failed_codes.append(code)
+                    progress.put((i + 1, code, f"失败: {reason}"))
+    finally:
+        stop_progress()
     elapsed = time.time() - start
     # 写入 manifest，记录所用股票池与标的列表、未拉取成功的代码，便于策略验证与回测复现
     try:
@@ -24,8 +24,12 @@ import os
 import json
 import time
 import argparse
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
@@ -34,17 +38,47 @@ base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 DATA_DIR = os.path.join(base_dir, 'mydate')
 OUTPUT_FILE = os.path.join(DATA_DIR, 'stock_pool_all.json')
 ETF_POOL_FILE = os.path.join(DATA_DIR, 'etf_pool.json')
+_VERIFY_WORKERS = 4        # 验证默认并发
+_VERIFY_MAX_WORKERS = 8    # --workers 上限
+_EM_MIN_INTERVAL = 0.15    # 东方财富同一主机相邻两次请求的最小间隔（秒），与原串行节流一致
 
 
-def _eastmoney_session():
+def _eastmoney_session(pool_size: int = _VERIFY_WORKERS):
+    """
+    东方财富会话：连接池按并发度配置，保持 keep-alive 复用连接，
+    5xx 与连接错误由 urllib3 Retry 自动退避重试。调用方用 with 关闭。
+    """
     s = requests.Session()
     s.headers.update({
         'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
         'Referer': 'http://quote.eastmoney.com/',
     })
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[500, 502, 503, 504]))
+    s.mount('http://', adapter)
+    s.mount('https://', adapter)
     return s
 
 
+class _RateLimiter:
+    """多线程共享的请求节流：相邻两次请求的发出时间间隔不小于 interval 秒"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            start = max(time.monotonic(), self._next)
+            self._next = start + self.interval
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
 # ============================================================
 # 来源1+2: 沪深300 + 中证500 (baostock)
 # ============================================================
@@ -58,43 +92,48 @@ def fetch_index_constituents_bs():
         print("  ❌ baostock未安装")
         return {}
 
-    bs.login()
-    today = datetime.now().strftime('%Y-%m-%d')
-    all_stocks = {}
-
-    for index_name, query_fn in [
-        ('沪深300', lambda d: bs.query_hs300_stocks(date=d)),
-        ('中证500', lambda d: bs.query_zz500_stocks(date=d)),
-    ]:
-        rs = query_fn(today)
-        count = 0
-        while rs.error_code == '0' and rs.next():
-            row = rs.get_row_data()
-            code = row[1].split('.')[1] if '.' in row[1] else row[1]
-            name = row[2]
-            if code not in all_stocks:
-                all_stocks[code] = {'code': code, 'name': name}
-                count += 1
-        print(f"  {index_name}: {count}只 (去重后)")
-
-    # 获取行业分类（批量）
-    print("  获取行业分类...")
-    industry_map = {}
-    codes_list = list(all_stocks.keys())
-    for i, code in enumerate(codes_list):
-        prefix = 'sh' if code.startswith(('5', '6')) else 'sz'
-        try:
-            rs = bs.query_stock_industry(code=f'{prefix}.{code}')
-            if rs.error_code == '0' and rs.next():
-                row = rs.get_row_data()
-                industry = row[3] if len(row) > 3 else '未知'
-                industry_map[code] = industry
-        except Exception:
-            pass
-        if (i + 1) % 200 == 0:
-            print(f"    进度: {i+1}/{len(codes_list)}")
-
-    bs.logout()
+    # 走进程级共享会话（持锁、按需 login），不自行 login/logout，
+    # 以免登出同进程里 K 线/指数查询正在使用的会话
+    from src.data.provider.adapters import bs_session
+    try:
+        with bs_session():
+            today = datetime.now().strftime('%Y-%m-%d')
+            all_stocks = {}
+
+            for index_name, query_fn in [
+                ('沪深300', lambda d: bs.query_hs300_stocks(date=d)),
+                ('中证500', lambda d: bs.query_zz500_stocks(date=d)),
+            ]:
+                rs = query_fn(today)
+                count = 0
+                while rs.error_code == '0' and rs.next():
+                    row = rs.get_row_data()
+                    code = row[1].split('.')[1] if '.' in row[1] else row[1]
+                    name = row[2]
+                    if code not in all_stocks:
+                        all_stocks[code] = {'code': code, 'name': name}
+                        count += 1
+                print(f"  {index_name}: {count}只 (去重后)")
+
+            # 获取行业分类（批量）
+            print("  获取行业分类...")
+            industry_map = {}
+            codes_list = list(all_stocks.keys())
+            for i, code in enumerate(codes_list):
+                prefix = 'sh' if code.startswith(('5', '6')) else 'sz'
+                try:
+                    rs = bs.query_stock_industry(code=f'{prefix}.{code}')
+                    if rs.error_code == '0' and rs.next():
+                        row = rs.get_row_data()
+                        industry = row[3] if len(row) > 3 else '未知'
+                        industry_map[code] = industry
+                except Exception:
+                    pass
+                if (i + 1) % 200 == 0:
+                    print(f"    进度: {i+1}/{len(codes_list)}")
+    except RuntimeError as e:  # 登录失败或已全局熔断
+        print(f"  ❌ {e}")
+        return {}
 
     sectors = {}
     for code, info in all_stocks.items():
@@ -433,8 +472,27 @@ def build_pool(dry_run: bool = False, **kwargs):
 # 验证
 # ============================================================
 
-def verify():
-    """验证综合股票池"""
+def _has_kline(session, limiter: _RateLimiter, code: str):
+    """东方财富日K是否有数据：有→True，无→False，请求异常→None"""
+    market = '1' if code.startswith(('5', '6')) else '0'
+    params = {
+        'secid': f'{market}.{code}',
+        'fields1': 'f1,f2,f3,f4,f5,f6',
+        'fields2': 'f51,f52,f53,f54,f55,f56,f57',
+        'klt': '101', 'fqt': '1', 'lmt': '1', 'end': '20500101',
+    }
+    limiter.wait()
+    try:
+        resp = session.get('http://push2his.eastmoney.com/api/qt/stock/kline/get',
+                           params=params, timeout=10)
+        data = resp.json()
+    except Exception:
+        return None
+    return bool(data.get('data') and data['data'].get('klines'))
+
+
+def verify(workers: int = _VERIFY_WORKERS):
+    """验证综合股票池（workers 为并发请求上限）"""
     if not os.path.exists(OUTPUT_FILE):
         print("❌ 股票池文件不存在")
         return
@@ -447,36 +505,30 @@ def verify():
         for s in stocks:
             all_codes.append((s['code'], s.get('name', ''), sector))
 
-    print(f"验证 {len(all_codes)} 只标的...")
-    session = _eastmoney_session()
+    workers = max(1, min(workers, _VERIFY_MAX_WORKERS))
+    print(f"验证 {len(all_codes)} 只标的（并发 {workers}）...")
+    limiter = _RateLimiter(_EM_MIN_INTERVAL)
     ok = fail = 0
 
-    for i, (code, name, sector) in enumerate(all_codes):
-        market = '1' if code.startswith(('5', '6')) else '0'
-        try:
-            url = 'http://push2his.eastmoney.com/api/qt/stock/kline/get'
-            params = {
-                'secid': f'{market}.{code}',
-                'fields1': 'f1,f2,f3,f4,f5,f6',
-                'fields2': 'f51,f52,f53,f54,f55,f56,f57',
-                'klt': '101', 'fqt': '1', 'lmt': '1', 'end': '20500101',
-            }
-            resp = session.get(url, params=params, timeout=10)
-            data = resp.json()
-            if data.get('data') and data['data'].get('klines'):
+    # 各标的互不依赖，少量线程并发请求以重叠网络延迟，发出节奏仍由 limiter 按原间隔节流；
+    # 按完成顺序流式汇总，慢请求不阻塞其后已返回的结果
+    with _eastmoney_session(workers) as session, \
+            ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(_has_kline, session, limiter, c[0]): c for c in all_codes}
+        for i, fut in enumerate(as_completed(futures), 1):
+            code, name, sector = futures[fut]
+            has_data = fut.result()
+            if has_data:
                 ok += 1
             else:
-                print(f"  ❌ {code} {name:8s} [{sector[:10]}] 无数据")
+                if has_data is not None:
+                    print(f"  ❌ {code} {name:8s} [{sector[:10]}] 无数据")
                 fail += 1
-            time.sleep(0.15)
-        except Exception:
-            fail += 1
 
-        if (i + 1) % 100 == 0:
-            print(f"  ... {i+1}/{len(all_codes)}, 成功{ok}, 失败{fail}")
+            if i % 100 == 0:
+                print(f"  ... {i}/{len(all_codes)}, 成功{ok}, 失败{fail}")
 
     print(f"\n总计: {len(all_codes)}, 成功: {ok}, 失败: {fail}")
-    session.close()
 
 
 # ============================================================
@@ -487,10 +539,12 @@ def main():
     parser = argparse.ArgumentParser(description='股票池刷新工具 v2')
     parser.add_argument('--verify', action='store_true', help='验证股票池数据')
     parser.add_argument('--dry-run', action='store_true', help='只显示统计不保存')
+    parser.add_argument('--workers', type=int, default=_VERIFY_WORKERS,
+                        help=f'验证时的并发请求数（默认 {_VERIFY_WORKERS}，上限 {_VERIFY_MAX_WORKERS}）')
     args = parser.parse_args()
 
     if args.verify:
-        verify()
+        verify(workers=args.workers)
     else:
         build_pool(dry_run=args.dry_run)
 
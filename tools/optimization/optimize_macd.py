@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+MACD 参数网格扫描（快速筛选）
+
+在本地回测缓存（mydate/backtest_kline/*.parquet，由 backtest_prefetch.py 生成）上，
+对 MACDStrategy.param_ranges 定义的 (fast, slow, signal) 网格批量评估，按平均 Sharpe 排序。
+
+评估口径（纯 DIF/DEA 交叉，用于快速筛选）：
+  - T 日收盘 DIF 上穿 DEA → 持仓；下穿 → 空仓；其余沿用前一状态
+  - 持仓收益按 T→T+1 收盘计，换仓扣佣金（卖出另扣印花税）
+  - 不含 MACDStrategy 的置信度/仓位/换手率过滤，筛出的候选用 --verify-top
+    交给 MACDStrategy.backtest 复核
+
+各周期 EMA 每只股票只算一次放入表中（numba 单遍递推 / scipy lfilter），
+整个网格再在一个 @njit(parallel=True) 内核里按参数组合 prange 并行跑状态机；
+未安装 numba 时按纯 Python 执行（慢但结果一致），此时默认按股票分到多进程并行
+（joblib 可选，缺省用 ProcessPoolExecutor）。
+
+用法:
+  python3 tools/optimization/optimize_macd.py
+  python3 tools/optimization/optimize_macd.py --limit 100 --top 20 --verify-top 5
+  python3 tools/optimization/optimize_macd.py --two-stage --top-k 5   # 粗到细两阶段，组合数约为全网格 1/10
+  python3 tools/optimization/optimize_macd.py --output output/macd_scan   # → .parquet + .json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+_ROOT = Path(__file__).resolve().parents[2]
+if str(_ROOT) not in sys.path:  # 子进程重复导入时不再重复插入
+    sys.path.insert(0, str(_ROOT))
+
+from src.strategies._macd_numba import ema
+from src.strategies.macd_cross import MACDStrategy
+from src.utils._njit import HAS_NUMBA, njit, prange
+
+METRIC_COLUMNS = ['total_return', 'sharpe', 'max_drawdown', 'trade_count']
+DEFAULT_CACHE_DIR = str(_ROOT / 'mydate' / 'backtest_kline')
+
+
+@njit(cache=True)
+def _ema_table(close: np.ndarray, need: np.ndarray) -> np.ndarray:
+    """
+    一次遍历收盘价，同时递推所有需要的周期（need[p]=True）的 EMA，
+    返回 (len(need), n) 表，table[p] 即周期 p 的 EMA。
+    """
+    n = close.shape[0]
+    n_p = need.shape[0]
+    table = np.zeros((n_p, n))
+    alphas = np.zeros(n_p)
+    for p in range(n_p):
+        if need[p]:
+            alphas[p] = 2.0 / (p + 1.0)
+            table[p, 0] = close[0]
+    for t in range(1, n):
+        x = close[t]
+        for p in range(n_p):
+            if need[p]:
+                table[p, t] = alphas[p] * x + (1.0 - alphas[p]) * table[p, t - 1]
+    return table
+
+
+def build_ema_table(close: np.ndarray, fasts: np.ndarray, slows: np.ndarray) -> np.ndarray:
+    """
+    预计算网格中出现的全部 fast/slow 周期的 EMA 表（每只股票一次，所有组合共用）。
+
+    有 numba 时用 _ema_table 单遍递推；否则走 C 实现的 scipy.signal.lfilter，
+    scipy 也不可用时退回 pandas ewm。三者均与 ewm(span, adjust=False) 一致。
+    """
+    max_p = int(max(fasts.max(), slows.max()))
+    need = np.zeros(max_p + 1, dtype=np.bool_)
+    need[fasts] = True
+    need[slows] = True
+    if HAS_NUMBA:
+        return _ema_table(close, need)
+
+    table = np.zeros((max_p + 1, close.shape[0]))
+    periods = np.flatnonzero(need)
+    try:
+        from scipy.signal import lfilter
+        for p in periods:
+            a = 2.0 / (p + 1.0)
+            table[p] = lfilter([a], [1.0, a - 1.0], close, zi=[(1.0 - a) * close[0]])[0]
+    except ImportError:
+        s = pd.Series(close)
+        for p in periods:
+            table[p] = s.ewm(span=int(p), adjust=False).mean().to_numpy()
+    return table
+
+
+@njit(cache=True)
+def _walk(close: np.ndarray, dif: np.ndarray, dea: np.ndarray, start: int,
+          commission: float, stamp_tax: float, daily_rf: float, out: np.ndarray) -> None:
+    """按 DIF/DEA 交叉状态机逐日持仓，指标写入 out（长度 4，顺序同 METRIC_COLUMNS）"""
+    n = close.shape[0]
+    pos = 0
+    equity = 1.0
+    peak = 1.0
+    max_dd = 0.0
+    trades = 0
+    cnt = 0
+    mean = 0.0
+    m2 = 0.0
+    for t in range(start, n - 1):
+        new_pos = pos
+        if dif[t] > dea[t] and dif[t - 1] <= dea[t - 1]:
+            new_pos = 1
+        elif dif[t] < dea[t] and dif[t - 1] >= dea[t - 1]:
+            new_pos = 0
+
+        r = 0.0
+        if new_pos > pos:
+            r -= commission
+        elif new_pos < pos:
+            r -= commission + stamp_tax
+            trades += 1
+        pos = new_pos
+        if pos == 1:
+            r += close[t + 1] / close[t] - 1.0
+
+        equity *= 1.0 + r
+        if equity > peak:
+            peak = equity
+        dd = (peak - equity) / peak
+        if dd > max_dd:
+            max_dd = dd
+
+        # Welford 在线方差（ddof=1），用于夏普
+        cnt += 1
+        x = r - daily_rf
+        delta = x - mean
+        mean += delta / cnt
+        m2 += delta * (x - mean)
+
+    sharpe = 0.0
+    if cnt > 1:
+        std = (m2 / (cnt - 1)) ** 0.5
+        if std > 1e-10:
+            sharpe = mean / std * (252 ** 0.5)
+    out[0] = (equity - 1.0) * 100
+    out[1] = sharpe
+    out[2] = max_dd * 100
+    out[3] = trades
+
+
+@njit(parallel=True, cache=True)
+def sweep_macd(close: np.ndarray, table: np.ndarray, fasts: np.ndarray,
+               slows: np.ndarray, signals: np.ndarray, commission: float,
+               stamp_tax: float, daily_rf: float) -> np.ndarray:
+    """
+    对一只股票的收盘价序列评估全部参数组合。
+
+    table 为 build_ema_table 预计算的 EMA 表。组合按 (fast, slow) 分组（build_grid
+    的顺序里同组的 signal 相邻），每组只做一次减法得到 DIF，组内各 signal
+    再分别对 DIF 求信号线 EMA；prange 按组并行。
+
+    Returns:
+        (n_combos, 4) 数组，列依次为 METRIC_COLUMNS：
+        总收益%、年化夏普、最大回撤%、卖出次数
+    """
+    n = close.shape[0]
+    m = fasts.shape[0]
+    out = np.zeros((m, 4))
+
+    # 分组边界：offsets[g]..offsets[g+1] 为同一 (fast, slow) 的组合
+    offsets = np.empty(m + 1, dtype=np.int64)
+    g = 0
+    for k in range(m):
+        if k == 0 or fasts[k] != fasts[k - 1] or slows[k] != slows[k - 1]:
+            offsets[g] = k
+            g += 1
+    offsets[g] = m
+
+    for gi in prange(g):
+        k0 = offsets[gi]
+        dif = table[fasts[k0]] - table[slows[k0]]
+        for k in range(k0, offsets[gi + 1]):
+            start = slows[k] + signals[k]
+            if start + 2 > n:
+                out[k, 0] = np.nan
+                out[k, 1] = np.nan
+                out[k, 2] = np.nan
+                continue
+            dea = ema(dif, signals[k])
+            _walk(close, dif, dea, start, commission, stamp_tax, daily_rf, out[k])
+    return out
+
+
+_PARAM_KEYS = ('fast_period', 'slow_period', 'signal_period')
+
+
+def _combos_to_grid(combos) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """组合列表 → 去重、剔除 fast >= slow、按 (fast, slow, signal) 字典序排列的三列数组"""
+    arr = np.asarray([c for c in combos if c[0] < c[1]], dtype=np.int64).reshape(-1, 3)
+    arr = np.unique(arr, axis=0)
+    return arr[:, 0].copy(), arr[:, 1].copy(), arr[:, 2].copy()
+
+
+def build_grid(stride: Tuple[int, int, int] = (1, 1, 1)) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    按 MACDStrategy.param_ranges 生成 (fast, slow, signal) 网格，剔除 fast >= slow。
+    stride 为各轴在原步长上的倍数，>1 时得到粗网格（两阶段搜索的第一阶段）。
+    """
+    axes = []
+    for key, mult in zip(_PARAM_KEYS, stride):
+        lo, _, hi, step = MACDStrategy.param_ranges[key]
+        axes.append(np.arange(lo, hi + step, step * mult, dtype=np.int64))
+    return _combos_to_grid(itertools.product(*axes))
+
+
+def refine_grid(seeds: pd.DataFrame, radius: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    在 seeds 各行 (fast, slow, signal) 周围 ±radius 个原步长内生成细网格，
+    截断到 param_ranges 范围内并去重。
+    """
+    offsets = []
+    for key, r in zip(_PARAM_KEYS, radius):
+        lo, _, hi, step = MACDStrategy.param_ranges[key]
+        offsets.append((lo, hi, np.arange(-r, r + 1) * step))
+    combos = []
+    for row in seeds[['fast', 'slow', 'signal']].itertuples(index=False):
+        axes = [np.clip(v + d, lo, hi) for v, (lo, hi, d) in zip(row, offsets)]
+        combos.extend(itertools.product(*axes))
+    return _combos_to_grid(combos)
+
+
+_PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+
+def downcast_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    OHLC 降为 float32、成交量在取值范围内时降为 uint32，常驻内存减半。
+
+    两位小数的价格在 float32 下精度足够；内核计算前会再转回 float64，
+    EMA 递推等累积运算仍在双精度下进行。
+    """
+    dtypes = {c: 'float32' for c in _PRICE_COLUMNS if c in df.columns}
+    if 'volume' in df.columns:
+        vol = df['volume']
+        if vol.notna().all() and len(vol) and vol.min() >= 0 and vol.max() < 2 ** 32:
+            dtypes['volume'] = 'uint32'
+    return df.astype(dtypes, copy=False)
+
+
+def _read_cached(path: Path, min_len: int) -> pd.DataFrame:
+    """读取单个缓存文件，数据不足或读取失败返回 None"""
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        return None
+    if len(df) >= min_len and 'close' in df.columns:
+        return downcast_ohlcv(df)
+    return None
+
+
+def load_stocks_data(cache_dir: str, limit: int = 50, min_len: int = 200,
+                     workers: int = 8) -> Dict[str, pd.DataFrame]:
+    """
+    从回测缓存加载前 limit 只数据足够的股票。
+
+    多线程并发读取 parquet（解码在 pyarrow 中释放 GIL），按文件名顺序分块提交，
+    凑满 limit 只即停止，结果与顺序读取一致。
+    """
+    cache_path = Path(cache_dir)
+    if not cache_path.exists():
+        return {}
+    paths = sorted(cache_path.glob('*.parquet'))
+    stocks_data = {}
+    chunk = max(1, workers) * 2
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        for i in range(0, len(paths), chunk):
+            batch = paths[i:i + chunk]
+            for p, df in zip(batch, ex.map(_read_cached, batch, itertools.repeat(min_len))):
+                if df is not None and len(stocks_data) < limit:
+                    stocks_data[p.stem] = df
+            if len(stocks_data) >= limit:
+                break
+    return stocks_data
+
+
+def _scan_one(close: np.ndarray, fasts: np.ndarray, slows: np.ndarray, signals: np.ndarray,
+              commission: float, stamp_tax: float, daily_rf: float) -> np.ndarray:
+    """单只股票：建 EMA 表并跑完整网格，返回 (n_combos, 4) 指标矩阵"""
+    table = build_ema_table(close, fasts, slows)
+    return sweep_macd(close, table, fasts, slows, signals, commission, stamp_tax, daily_rf)
+
+
+def _map_stocks(closes: List[np.ndarray], args: tuple, n_jobs: int) -> List[np.ndarray]:
+    """
+    按股票分发 _scan_one。n_jobs 为 0/1 时串行；否则多进程（负数表示按核心数），优先 joblib(loky)，
+    未安装时退回 ProcessPoolExecutor。只向子进程传收盘价数组，避免序列化整张 DataFrame。
+    """
+    if n_jobs in (0, 1) or len(closes) < 2:
+        return [_scan_one(c, *args) for c in closes]
+    try:
+        from joblib import Parallel, delayed
+        return Parallel(n_jobs=n_jobs, backend='loky', batch_size='auto')(
+            delayed(_scan_one)(c, *args) for c in closes)
+    except ImportError:
+        from concurrent.futures import ProcessPoolExecutor
+        workers = None if n_jobs < 0 else n_jobs
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(_scan_one, closes, *[itertools.repeat(a) for a in args]))
+
+
+def extract_closes(stocks_data: Dict[str, pd.DataFrame]) -> Dict[str, np.ndarray]:
+    """
+    预加载后一次性抽出每只股票的连续 float64 收盘价数组（扫描只需要收盘价），
+    之后的网格扫描与多进程分发都不再触碰 DataFrame。
+    """
+    return {code: np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+            for code, df in stocks_data.items()}
+
+
+def run_param_scan(closes: Dict[str, np.ndarray],
+                   commission: float = 0.0002, stamp_tax: float = 0.001,
+                   risk_free_rate: float = 0.03, n_jobs: int = None,
+                   grid: Tuple[np.ndarray, np.ndarray, np.ndarray] = None) -> pd.DataFrame:
+    """
+    在所有股票上扫描全部参数组合，返回按平均 Sharpe 降序的汇总表。
+
+    closes 为 extract_closes 的输出（代码 → float64 收盘价数组）。
+    每只股票一次内核调用得到 (n_combos, 4) 指标矩阵，堆叠后沿股票维度求均值。
+    n_jobs 为按股票并行的进程数：默认有 numba 时为 1（内核已按组合 prange 占满核心），
+    无 numba 时为 -1（纯 Python 内核按股票分到全部核心）。
+    grid 为 (fasts, slows, signals)，默认 build_grid() 全网格。
+    """
+    if n_jobs is None:
+        n_jobs = 1 if HAS_NUMBA else -1
+    fasts, slows, signals = build_grid() if grid is None else grid
+
+    # 提前剔除：任何股票都不够长的组合不进内核；短到所有组合都跑不了的股票不分发
+    lengths = np.fromiter((len(c) for c in closes.values()), dtype=np.int64, count=len(closes))
+    need = slows + signals + 2
+    if lengths.size:
+        keep = need <= lengths.max()
+        fasts, slows, signals = fasts[keep], slows[keep], signals[keep]
+    if fasts.size == 0:
+        return pd.DataFrame()
+    arrays = [c for c, n in zip(closes.values(), lengths) if n >= need.min()]
+    per_stock = _map_stocks(arrays, (fasts, slows, signals, commission, stamp_tax,
+                                     risk_free_rate / 252), n_jobs)
+    if not per_stock:
+        return pd.DataFrame()
+
+    stacked = np.stack(per_stock)                       # (n_stocks, n_combos, 4)
+    with np.errstate(invalid='ignore'):
+        mean = np.nanmean(stacked, axis=0)
+    result = pd.DataFrame(mean, columns=METRIC_COLUMNS)
+    result.insert(0, 'signal', signals)
+    result.insert(0, 'slow', slows)
+    result.insert(0, 'fast', fasts)
+    result['win_stock_pct'] = (stacked[:, :, 0] > 0).mean(axis=0) * 100
+    return result.sort_values('sharpe', ascending=False).reset_index(drop=True)
+
+
+def run_two_stage_scan(closes: Dict[str, np.ndarray], top_k: int = 3,
+                       stride: Tuple[int, int, int] = (3, 3, 2),
+                       **kwargs) -> pd.DataFrame:
+    """
+    粗到细两阶段扫描：先在 stride 倍步长的粗网格上扫描，再在粗扫前 top_k 组周围
+    ±stride-1 个原步长内细扫（覆盖粗网格点之间的空隙），两次结果合并后按 Sharpe 排序。
+    """
+    coarse = run_param_scan(closes, grid=build_grid(stride), **kwargs)
+    if coarse.empty:
+        return coarse
+    radius = tuple(max(1, m - 1) for m in stride)
+    fine = run_param_scan(closes, grid=refine_grid(coarse.head(top_k), radius), **kwargs)
+    merged = pd.concat([fine, coarse], ignore_index=True)
+    merged = merged.drop_duplicates(subset=['fast', 'slow', 'signal'])
+    return merged.sort_values('sharpe', ascending=False).reset_index(drop=True)
+
+
+def marginal_summary(result: pd.DataFrame) -> pd.DataFrame:
+    """
+    各参数维度的边际平均表现：fast/slow/signal 三列先 melt 成长表，
+    一次 groupby(['dim', 'val']) 聚合，按 .loc['fast'] 等切片查看。
+    """
+    long = result.melt(id_vars=['total_return', 'sharpe', 'max_drawdown'],
+                       value_vars=['fast', 'slow', 'signal'],
+                       var_name='dim', value_name='val')
+    return long.groupby(['dim', 'val']).agg(
+        avg_return=('total_return', 'mean'),
+        avg_sharpe=('sharpe', 'mean'),
+        avg_drawdown=('max_drawdown', 'mean'),
+        n=('sharpe', 'size'),
+    )
+
+
+def param_labels(df: pd.DataFrame) -> pd.Series:
+    """(fast,slow,signal) 标签，整列向量化拼接，只在展示时生成"""
+    return ('(' + df['fast'].astype(str) + ',' + df['slow'].astype(str)
+            + ',' + df['signal'].astype(str) + ')')
+
+
+def verify_top(result: pd.DataFrame, stocks_data: Dict[str, pd.DataFrame], top: int) -> pd.DataFrame:
+    """用完整的 MACDStrategy.backtest 复核前 top 组参数"""
+    rows = []
+    # 每组参数复用一块 (2, n_stocks) 缓冲：行 0 = sharpe，行 1 = 年化收益
+    metrics = np.empty((2, len(stocks_data)), dtype=np.float64)
+    for row in result.head(top).itertuples(index=False):
+        strat = MACDStrategy(fast_period=int(row.fast), slow_period=int(row.slow),
+                             signal_period=int(row.signal))
+        valid = 0
+        for df in stocks_data.values():
+            try:
+                bt = strat.backtest(df)
+            except Exception:
+                continue
+            if bt.get('trade_count', 0) > 0:
+                metrics[0, valid] = bt['sharpe']
+                metrics[1, valid] = bt['annualized_return']
+                valid += 1
+        avg_sharpe, avg_ret = metrics[:, :valid].mean(axis=1) if valid else (0.0, 0.0)
+        rows.append({
+            'fast': int(row.fast), 'slow': int(row.slow), 'signal': int(row.signal),
+            'n': valid,
+            'avg_sharpe': round(float(avg_sharpe), 4),
+            'avg_ann_ret': round(float(avg_ret), 4),
+        })
+    return pd.DataFrame(rows)
+
+
+def save_scan_results(result: pd.DataFrame, output: str, meta: dict, top: int = 20) -> Tuple[str, str]:
+    """
+    保存扫描结果：全量组合明细写 Parquet（列式，体积小、重载快），
+    运行参数与前 top 组摘要写一个可读的小 JSON。返回 (明细路径, 摘要路径)。
+    """
+    base = os.path.splitext(os.path.abspath(output))[0]
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    details_path = base + '.parquet'
+    summary_path = base + '.json'
+    result.to_parquet(details_path, index=False)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': meta,
+            'details': os.path.basename(details_path),
+            'top': result.head(top).round(4).to_dict('records'),
+        }, f, ensure_ascii=False, indent=2)
+    return details_path, summary_path
+
+
+def read_scan_results(path: str) -> Tuple[dict, pd.DataFrame]:
+    """读取 save_scan_results 的输出（传 .json/.parquet 或不带扩展名的前缀均可），返回 (摘要, 明细表)"""
+    base = os.path.splitext(path)[0]
+    with open(base + '.json', 'r', encoding='utf-8') as f:
+        summary = json.load(f)
+    return summary, pd.read_parquet(base + '.parquet')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MACD 参数网格扫描（快速筛选）')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='回测日线缓存目录')
+    parser.add_argument('--limit', type=int, default=50, help='参与扫描的股票数量')
+    parser.add_argument('--top', type=int, default=15, help='输出前 N 组参数')
+    parser.add_argument('--verify-top', type=int, default=0,
+                        help='用 MACDStrategy.backtest 复核前 N 组（0=不复核）')
+    parser.add_argument('--io-workers', type=int, default=8, help='并发读取缓存的线程数')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='按股票并行的进程数（默认：有 numba 时 1，否则 -1=全部核心；0 同 1）')
+    parser.add_argument('--two-stage', action='store_true',
+                        help='粗到细两阶段搜索（先粗网格，再细扫前 --top-k 组邻域），默认全网格')
+    parser.add_argument('--top-k', type=int, default=3, help='两阶段搜索中进入细扫的粗网格组数')
+    parser.add_argument('--output', default='',
+                        help='结果输出前缀（可选）：写 <前缀>.parquet 明细 + <前缀>.json 摘要')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("MACD 参数网格扫描")
+    print("=" * 70)
+
+    stocks_data = load_stocks_data(args.cache_dir, limit=args.limit, workers=args.io_workers)
+    if not stocks_data:
+        print(f"❌ 未在 {args.cache_dir} 找到可用缓存，请先运行 tools/data/backtest_prefetch.py")
+        return
+    fasts, _, _ = build_grid()
+    mode = f"两阶段(粗扫前 {args.top_k} 组细化)" if args.two_stage else "全网格"
+    print(f"✅ 加载 {len(stocks_data)} 只股票，全网格参数组合 {len(fasts)} 组，本次: {mode}")
+
+    t0 = time.perf_counter()
+    closes = extract_closes(stocks_data)
+    if args.two_stage:
+        result = run_two_stage_scan(closes, top_k=args.top_k, n_jobs=args.jobs)
+    else:
+        result = run_param_scan(closes, n_jobs=args.jobs)
+    print(f"⏱  扫描耗时 {time.perf_counter() - t0:.2f}s\n")
+
+    with pd.option_context('display.width', 120, 'display.max_columns', 20):
+        shown = result.head(args.top).round(3)
+        shown.insert(0, 'param_str', param_labels(shown))
+        print(shown.drop(columns=['fast', 'slow', 'signal']).to_string(index=False))
+
+        summary = marginal_summary(result).round(3)
+        for dim, label in (('fast', '快线'), ('slow', '慢线'), ('signal', '信号线')):
+            print(f"\n📊 各{label}周期的平均表现:")
+            print(summary.loc[dim].to_string())
+
+    if args.output:
+        meta = {
+            'scan_time': datetime.now().isoformat(timespec='seconds'),
+            'cache_dir': os.path.abspath(args.cache_dir),
+            'n_stocks': len(stocks_data),
+            'n_combos': len(result),
+            'two_stage': args.two_stage,
+            'param_ranges': {k: list(v) for k, v in MACDStrategy.param_ranges.items()},
+        }
+        details_path, summary_path = save_scan_results(result, args.output, meta, top=args.top)
+        print(f"\n✅ 完整结果已保存: {details_path}（摘要: {summary_path}）")
+
+    if args.verify_top > 0:
+        print(f"\n🔍 MACDStrategy.backtest 复核前 {args.verify_top} 组...")
+        print(verify_top(result, stocks_data, args.verify_top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -55,26 +55,38 @@ def _load_test_stocks(pool_path: str, limit: int = 50) -> List[dict]:
     return stocks[:limit]
 
 
-def _run_ensemble_on_stock(stock: dict, excluded: List[str] = None) -> Optional[dict]:
+def _load_klines(stocks: List[dict]) -> List[tuple]:
     """
-    对单只股票跑 Ensemble 策略（排除指定策略），返回决策结果。
+    每只股票的日线只拉一次，返回 [(code, df), ...]；各剔除配置共用同一份 K 线（只读）。
+    数据不足 30 根或获取失败的股票跳过。
     """
-    from src.data.fetchers.data_prefetch import get_default_kline_provider
-    code = stock.get('code', '')
-    try:
-        provider = get_default_kline_provider()
-        df = provider.get_kline(code, days=120)
-        if df is None or len(df) < 30:
-            return None
-    except Exception:
-        return None
-
+    from src.data.provider.data_provider import get_default_kline_provider
+    provider = get_default_kline_provider()
+    frames = []
+    for stock in stocks:
+        code = stock.get('code', '')
+        try:
+            df = provider.get_kline(code, datalen=120, min_bars=30)
+        except Exception:
+            continue
+        if df is not None and len(df) >= 30:
+            frames.append((code, df))
+    return frames
+
+
+def _build_ensemble(excluded: List[str] = None) -> EnsembleStrategy:
+    """按剔除列表构造 Ensemble；同一配置下所有股票复用这一个实例"""
     weights = EnsembleStrategy.DEFAULT_WEIGHTS.copy() if hasattr(EnsembleStrategy, 'DEFAULT_WEIGHTS') else {}
     if excluded:
         for s in excluded:
             weights.pop(s, None)
+    return EnsembleStrategy(weights=weights if weights else None)
+
 
-    ens = EnsembleStrategy(weights=weights if weights else None)
+def _run_ensemble_on_stock(ens: EnsembleStrategy, code: str, df: pd.DataFrame) -> Optional[dict]:
+    """
+    对单只股票跑 Ensemble 策略，返回决策结果。
+    """
     try:
         signal = ens.analyze(df)
         return {
@@ -87,6 +99,27 @@ def _run_ensemble_on_stock(stock: dict, excluded: List[str] = None) -> Optional[
         return None
 
 
+def _collect_stats(frames: List[tuple], excluded: List[str]) -> tuple:
+    """
+    对全部股票跑一轮（排除 excluded），返回 (有效股数, BUY率, 平均置信度)。
+
+    结果直接写入按股票数预分配的数组，再整列求均值，不再逐条 append dict。
+    """
+    ens = _build_ensemble(excluded)
+    is_buy = np.zeros(len(frames), dtype=bool)
+    conf = np.empty(len(frames), dtype=np.float64)
+    n = 0
+    for code, df in frames:
+        r = _run_ensemble_on_stock(ens, code, df)
+        if r:
+            is_buy[n] = r['action'] == 'BUY'
+            conf[n] = r['confidence']
+            n += 1
+    if n == 0:
+        return 0, 0.0, 0.0
+    return n, float(is_buy[:n].mean()), float(conf[:n].mean())
+
+
 def run_ablation(pool_path: str, limit: int = 50) -> str:
     """
     执行完整剔除实验，返回 Markdown 报告。
@@ -98,17 +131,17 @@ def run_ablation(pool_path: str, limit: int = 50) -> str:
     lines = ["# 策略剔除实验报告\n"]
     lines.append(f"测试股票数: {len(stocks)}\n")
 
+    # K 线只拉一次，下面 1 + 单策略 + 整组 + 核心组 共二十余轮实验共用
+    frames = _load_klines(stocks)
+    if not frames:
+        # 一只都没拉到时直接返回，不再为二十余轮实验逐轮构造 Ensemble
+        return "❌ 测试股票均未获取到足够K线"
+
     # Baseline: 全策略
     print(f"[Ablation] Running baseline with all strategies on {len(stocks)} stocks...")
-    baseline = []
-    for s in stocks:
-        r = _run_ensemble_on_stock(s, excluded=[])
-        if r:
-            baseline.append(r)
-    base_buy_rate = sum(1 for r in baseline if r['action'] == 'BUY') / max(1, len(baseline))
-    base_avg_conf = np.mean([r['confidence'] for r in baseline]) if baseline else 0
+    n_base, base_buy_rate, base_avg_conf = _collect_stats(frames, excluded=[])
 
-    lines.append(f"**基准**: BUY率={base_buy_rate:.1%}, 平均置信度={base_avg_conf:.3f}, 有效股={len(baseline)}\n")
+    lines.append(f"**基准**: BUY率={base_buy_rate:.1%}, 平均置信度={base_avg_conf:.3f}, 有效股={n_base}\n")
 
     # === 1. 单策略剔除 ===
     lines.append("## 1. 单策略剔除\n")
@@ -118,14 +151,8 @@ def run_ablation(pool_path: str, limit: int = 50) -> str:
     single_results = {}
     for strat in ALL_STRATEGIES:
         print(f"  [Single] Excluding {strat}...")
-        results = []
-        for s in stocks:
-            r = _run_ensemble_on_stock(s, excluded=[strat])
-            if r:
-                results.append(r)
-        if results:
-            buy_rate = sum(1 for r in results if r['action'] == 'BUY') / max(1, len(results))
-            avg_conf = np.mean([r['confidence'] for r in results])
+        n_ok, buy_rate, avg_conf = _collect_stats(frames, excluded=[strat])
+        if n_ok:
             delta_buy = buy_rate - base_buy_rate
             delta_conf = avg_conf - base_avg_conf
             verdict = "✅有贡献" if abs(delta_buy) > 0.02 or abs(delta_conf) > 0.01 else "⚠可能冗余"
@@ -143,14 +170,8 @@ def run_ablation(pool_path: str, limit: int = 50) -> str:
 
     for gname, members in SIGNAL_GROUPS.items():
         print(f"  [Group] Excluding {gname}: {members}...")
-        results = []
-        for s in stocks:
-            r = _run_ensemble_on_stock(s, excluded=members)
-            if r:
-                results.append(r)
-        if results:
-            buy_rate = sum(1 for r in results if r['action'] == 'BUY') / max(1, len(results))
-            avg_conf = np.mean([r['confidence'] for r in results])
+        n_ok, buy_rate, avg_conf = _collect_stats(frames, excluded=members)
+        if n_ok:
             delta_buy = buy_rate - base_buy_rate
             delta_conf = avg_conf - base_avg_conf
             lines.append(
@@ -173,14 +194,8 @@ def run_ablation(pool_path: str, limit: int = 50) -> str:
     for combo_name, keep_list in combos:
         exclude = [s for s in ALL_STRATEGIES if s not in keep_list]
         print(f"  [Core] Keeping only {combo_name}...")
-        results = []
-        for s in stocks:
-            r = _run_ensemble_on_stock(s, excluded=exclude)
-            if r:
-                results.append(r)
-        if results:
-            buy_rate = sum(1 for r in results if r['action'] == 'BUY') / max(1, len(results))
-            avg_conf = np.mean([r['confidence'] for r in results])
+        n_ok, buy_rate, avg_conf = _collect_stats(frames, excluded=exclude)
+        if n_ok:
             lines.append(f"| {combo_name} | {buy_rate:.1%} | {avg_conf:.3f} |")
     lines.append("")
 
@@ -27,6 +27,8 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 logger = logging.getLogger(__name__)
 
+_ACTION_COL = {'BUY': 0, 'SELL': 1}  # 其余动作计入 HOLD 列（2）
+
 STRATEGY_NAMES = [
     'MA', 'MACD', 'RSI', 'BOLL', 'KDJ', 'DUAL',
     'PE', 'PB', 'PEPB',
@@ -57,10 +59,13 @@ def run_diagnostic(pool_path: str, limit: int = 50) -> str:
     provider = get_default_kline_provider()
     stocks = _load_stocks(pool_path, limit)
 
-    stats = {name: {'buy': 0, 'sell': 0, 'hold': 0, 'conf_sum': 0.0, 'count': 0}
-             for name in STRATEGY_NAMES}
+    # 列式计数：每个策略一行，列为 BUY/SELL/HOLD；置信度累加单独一列，汇总时整列运算
+    row_of = {name: i for i, name in enumerate(STRATEGY_NAMES)}
+    counts = np.zeros((len(STRATEGY_NAMES), 3), dtype=np.int64)
+    conf_sum = np.zeros(len(STRATEGY_NAMES), dtype=np.float64)
     dual_signals = {}
     stock_count = 0
+    ens = EnsembleStrategy()  # 与 recommend_today 一样整轮复用同一实例，不逐股重建子策略
 
     for s in stocks:
         code = s['code']
@@ -71,28 +76,21 @@ def run_diagnostic(pool_path: str, limit: int = 50) -> str:
         except Exception:
             continue
 
-        ens = EnsembleStrategy()
         try:
             for name, strat in ens.sub_strategies.items():
-                if name not in stats:
+                row = row_of.get(name)
+                if row is None:
                     continue
                 try:
                     sig = strat.analyze(df)
                     action = sig.action
-                    stats[name]['count'] += 1
-                    if action == 'BUY':
-                        stats[name]['buy'] += 1
-                    elif action == 'SELL':
-                        stats[name]['sell'] += 1
-                    else:
-                        stats[name]['hold'] += 1
-                    stats[name]['conf_sum'] += sig.confidence
+                    counts[row, _ACTION_COL.get(action, 2)] += 1
+                    conf_sum[row] += sig.confidence
 
                     if name == 'DUAL':
                         dual_signals[code] = action
                 except Exception:
-                    stats[name]['count'] += 1
-                    stats[name]['hold'] += 1
+                    counts[row, 2] += 1
         except Exception:
             continue
 
@@ -107,34 +105,31 @@ def run_diagnostic(pool_path: str, limit: int = 50) -> str:
     lines.append('| 策略 | 总数 | BUY | SELL | HOLD | BUY% | SELL% | 有效率 | 平均置信度 |')
     lines.append('|------|------|-----|------|------|------|-------|--------|----------|')
 
-    sorted_names = sorted(STRATEGY_NAMES,
-                          key=lambda n: (stats[n]['buy'] + stats[n]['sell']) / max(1, stats[n]['count']),
-                          reverse=True)
-
-    for name in sorted_names:
-        s = stats[name]
-        total = s['count'] or 1
-        buy_pct = s['buy'] / total * 100
-        sell_pct = s['sell'] / total * 100
-        active_rate = (s['buy'] + s['sell']) / total * 100
-        avg_conf = s['conf_sum'] / total
+    count = counts.sum(axis=1)
+    total = np.maximum(count, 1)
+    active = counts[:, 0] + counts[:, 1]
+    pct = counts / total[:, None] * 100          # BUY% / SELL% / HOLD%
+    active_frac = active / total
+    avg_conf = conf_sum / total
+
+    # 按有效率降序；stable 排序保证并列时保持 STRATEGY_NAMES 原顺序
+    for i in np.argsort(-active_frac, kind='stable'):
         lines.append(
-            f"| {name:18s} | {total:4d} | {s['buy']:3d} | {s['sell']:3d} | {s['hold']:3d} | "
-            f"{buy_pct:5.1f}% | {sell_pct:5.1f}% | {active_rate:5.1f}% | {avg_conf:.3f} |"
+            f"| {STRATEGY_NAMES[i]:18s} | {total[i]:4d} | {counts[i, 0]:3d} | {counts[i, 1]:3d} | "
+            f"{counts[i, 2]:3d} | {pct[i, 0]:5.1f}% | {pct[i, 1]:5.1f}% | "
+            f"{active_frac[i] * 100:5.1f}% | {avg_conf[i]:.3f} |"
         )
 
     lines.append('')
     lines.append('## 诊断结论\n')
 
-    silent = [n for n in STRATEGY_NAMES
-              if stats[n]['count'] > 0
-              and (stats[n]['buy'] + stats[n]['sell']) / stats[n]['count'] < 0.05]
-    active = [n for n in STRATEGY_NAMES
-              if stats[n]['count'] > 0
-              and (stats[n]['buy'] + stats[n]['sell']) / stats[n]['count'] > 0.30]
-    moderate = [n for n in STRATEGY_NAMES if n not in silent and n not in active and stats[n]['count'] > 0]
+    seen = count > 0
+    names = np.array(STRATEGY_NAMES)
+    silent = names[seen & (active_frac < 0.05)].tolist()
+    high = names[seen & (active_frac > 0.30)].tolist()
+    moderate = names[seen & (active_frac >= 0.05) & (active_frac <= 0.30)].tolist()
 
-    lines.append(f'- **高活跃** (>30%有效信号): {", ".join(active) if active else "无"}')
+    lines.append(f'- **高活跃** (>30%有效信号): {", ".join(high) if high else "无"}')
     lines.append(f'- **中等活跃** (5-30%): {", ".join(moderate) if moderate else "无"}')
     lines.append(f'- **长期沉默** (<5%有效信号): {", ".join(silent) if silent else "无"}')
     lines.append('')
@@ -13,12 +13,12 @@
 
 import sys
 import os
-import json
 import csv
 import warnings
 from datetime import datetime
 
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import numpy as np
 
@@ -31,64 +31,145 @@ from src.strategies.rsi_signal import RSIStrategy
 from src.strategies.bollinger_band import BollingerBandStrategy
 from src.strategies.kdj_signal import KDJStrategy
 from src.strategies.ensemble import EnsembleStrategy
+from src.utils.quote_parse import json_loads, parse_sina_kline, parse_sina_hq_fields
 
 
 # ── 数据获取 ──
+_SINA_HQ_HEADERS = {'Referer': 'https://finance.sina.com.cn',
+                    'User-Agent': 'Mozilla/5.0'}
+_KLINE_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+# 逐只拉行情/K线时复用 keep-alive 连接，不再每个请求重新握手
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+
+def _sina_symbol(code: str) -> str:
+    return ('sh' if code.startswith(('5', '6')) else 'sz') + code
+
+
 def get_realtime(code: str) -> dict:
     """新浪实时行情"""
-    prefix = 'sh' if code.startswith(('5', '6')) else 'sz'
-    url = f'https://hq.sinajs.cn/list={prefix}{code}'
-    r = requests.get(url,
-                     headers={'Referer': 'https://finance.sina.com.cn',
-                              'User-Agent': 'Mozilla/5.0'},
-                     timeout=10)
+    url = f'https://hq.sinajs.cn/list={_sina_symbol(code)}'
+    r = _SESSION.get(url, headers=_SINA_HQ_HEADERS, timeout=10)
     parts = r.text.split('="')[1].rstrip('";\n').split(',')
-    return {
-        'name': parts[0],
-        'open': float(parts[1]),
-        'prev_close': float(parts[2]),
-        'price': float(parts[3]),
-        'high': float(parts[4]),
-        'low': float(parts[5]),
-        'volume': float(parts[8]),
-        'date': parts[30],
-        'time': parts[31],
-    }
+    return parse_sina_hq_fields(parts)
 
 
-def fetch_sina_kline(code: str, datalen: int = 100) -> pd.DataFrame:
-    """新浪日K线"""
+def get_realtime_batch(codes: list, batch_size: int = 50) -> dict:
+    """
+    新浪实时行情批量版：list= 一次传多个代码，每 batch_size 只一个请求。
+    返回 {code: 行情dict}；请求失败或停牌/无数据的代码不在结果中，调用方可再逐只获取。
+    """
+    result = {}
+    for i in range(0, len(codes), batch_size):
+        symbols = ','.join(_sina_symbol(c) for c in codes[i:i + batch_size])
+        try:
+            r = _SESSION.get(f'https://hq.sinajs.cn/list={symbols}',
+                             headers=_SINA_HQ_HEADERS, timeout=10)
+        except requests.RequestException:
+            continue
+        for line in r.text.split('\n'):
+            # var hq_str_sh600000="名称,开盘,...";
+            if '="' not in line:
+                continue
+            head, body = line.split('="', 1)
+            parts = body.rstrip('";\r').split(',')
+            if len(parts) < 32:
+                continue
+            try:
+                result[head[-6:]] = parse_sina_hq_fields(parts)
+            except ValueError:
+                continue
+    return result
+
+
+def _download_sina_kline(code: str, datalen: int) -> pd.DataFrame:
+    """新浪日K线（网络请求）"""
     prefix = 'sh' if code.startswith(('5', '6')) else 'sz'
     symbol = f'{prefix}{code}'
     url = ('https://money.finance.sina.com.cn/quotes_service/api/'
            'json_v2.php/CN_MarketData.getKLineData')
     try:
-        r = requests.get(url,
+        r = _SESSION.get(url,
                          params={'symbol': symbol, 'scale': '240',
                                  'ma': 'no', 'datalen': str(datalen)},
                          headers={'User-Agent': 'Mozilla/5.0'},
                          timeout=15)
-        data = json.loads(r.text) if r.text.strip() else None
-        if not data:
-            return pd.DataFrame()
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['day'])
-        for c in ['open', 'high', 'low', 'close', 'volume']:
-            df[c] = pd.to_numeric(df[c], errors='coerce')
-        return df
+        # 与 data_prefetch 共用解析：orjson 直接解析响应字节，按列名 from_records，数值列整块转换
+        df = parse_sina_kline(r.content)
+        if df.empty:
+            return df
+        return df[_KLINE_COLUMNS]
     except Exception:
         return pd.DataFrame()
 
 
+# 日K线磁盘缓存：收盘后同一天内重复运行直接读盘，不再逐只请求新浪
+_KLINE_CACHE_DIR = os.path.join(os.path.dirname(__file__), '../../mycache/sina_kline')
+_MARKET_CLOSE_HOUR = 15
+
+
+def _kline_cache_path(code: str, datalen: int, day: str) -> str:
+    return os.path.join(_KLINE_CACHE_DIR, f'{code}_{datalen}_{day}.parquet')
+
+
+def fetch_sina_kline(code: str, datalen: int = 100) -> pd.DataFrame:
+    """
+    新浪日K线，按 (代码, datalen, 当天日期) 缓存到磁盘（parquet）。
+
+    只在收盘后落盘：开盘前拿到的是截至上一交易日的K线，盘中最后一根是未收盘的当日K线，
+    两者都会让同一天后续运行读到旧值；
+    读写缓存失败（如未安装 pyarrow）时照常走网络，不影响结果。
+    """
+    now = datetime.now()
+    path = _kline_cache_path(code, datalen, now.strftime('%Y%m%d'))
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            pass
+    df = _download_sina_kline(code, datalen)
+    if df.empty:
+        return df
+    if now.hour >= _MARKET_CLOSE_HOUR:
+        try:
+            os.makedirs(_KLINE_CACHE_DIR, exist_ok=True)
+            df.to_parquet(path, index=False)
+        except Exception:
+            pass  # 写缓存失败不影响本次返回
+    return df
+
+
 def append_realtime(df: pd.DataFrame, rt: dict) -> pd.DataFrame:
-    """将实时数据追加到K线DataFrame"""
-    new_row = pd.DataFrame([{
+    """
+    将实时数据追加到K线DataFrame。
+
+    每列预分配 len+1 的数组、拷贝历史后在末位写入当日值，再一次性构造 DataFrame，
+    省去 pd.concat 的对齐与类型合并开销。
+    """
+    row = {
         'date': pd.Timestamp(rt['date']),
         'open': rt['open'], 'high': rt['high'],
         'low': rt['low'], 'close': rt['price'],
         'volume': rt['volume'],
-    }])
-    return pd.concat([df, new_row], ignore_index=True)
+    }
+    if list(df.columns) != _KLINE_COLUMNS:
+        return pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+    n = len(df)
+    cols = {}
+    for c in _KLINE_COLUMNS:
+        src = df[c].to_numpy()
+        buf = np.empty(n + 1, dtype=src.dtype)
+        buf[:n] = src
+        buf[n] = row[c].to_datetime64() if c == 'date' else row[c]
+        cols[c] = buf
+    return pd.DataFrame(cols)
+
+
+def evaluate_all_strategies(strategies: dict, df: pd.DataFrame) -> dict:
+    """在同一份K线上依次运行各策略的 safe_analyze，按 strategies 的顺序返回 {名称: 信号}"""
+    return {name: st.safe_analyze(df) for name, st in strategies.items()}
 
 
 # ── 主逻辑 ──
@@ -104,8 +185,8 @@ def main():
     portfolio_path = os.path.join(
         os.path.dirname(__file__), '../..', args.portfolio)
 
-    with open(portfolio_path, 'r', encoding='utf-8') as f:
-        portfolio = json.load(f)
+    with open(portfolio_path, 'rb') as f:
+        portfolio = json_loads(f.read())
 
     strategies = {
         'MA': MACrossStrategy(),
@@ -133,6 +214,10 @@ def main():
     records = []
     day_pnl = 0  # 今日盈亏
 
+    # 一次批量拉取全部持仓的实时行情，循环内按代码查表
+    realtime = get_realtime_batch(
+        [h['code'] for h in portfolio['holdings'] if h.get('shares', 0) > 0])
+
     for h in portfolio['holdings']:
         code = h['code']
         name = h['name']
@@ -148,7 +233,7 @@ def main():
             continue
 
         try:
-            rt = get_realtime(code)
+            rt = realtime.get(code) or get_realtime(code)
             price = rt['price']
             prev_close = rt['prev_close']
             day_chg = (price / prev_close - 1) * 100 if prev_close > 0 else 0
@@ -164,8 +249,7 @@ def main():
                 df_s = append_realtime(df_s, rt)
                 buy_c = sell_c = 0
                 detail_lines = []
-                for sn, st in strategies.items():
-                    sig = st.safe_analyze(df_s)
+                for sn, sig in evaluate_all_strategies(strategies, df_s).items():
                     if sig.action == 'BUY':
                         buy_c += 1
                     elif sig.action == 'SELL':
@@ -280,8 +364,7 @@ def main():
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         if not file_exists:
             writer.writeheader()
-        for rec in records:
-            writer.writerow(rec)
+        writer.writerows(records)
 
     # 汇总
     summary_file = os.path.join(data_dir, 'portfolio_daily_summary.csv')
@@ -0,0 +1,126 @@
+"""
+验证脚本共用的合成行情数据
+
+各 test_*.py 之前在每个场景里重新跑 np.random + pd.date_range + merge 生成数据，
+这里按参数组合记忆化：同一组参数只构造一次，之后直接返回同一对象。
+
+- 返回的是共享对象，只读使用；只改最后一天的场景用 with_last() 派生，
+  最后几天连续上涨的场景用 with_rally() 派生，其他需要改动的先 .copy() 再改；
+- 随机数用局部 np.random.RandomState(seed)，抽样顺序与原脚本相同，不污染全局随机状态；
+- 安装了 numba 时，导入本模块即用小数组触发各 njit 内核编译，
+  首个场景不再承担编译耗时（cache=True 落盘后，后续进程直接加载）。
+
+用法:
+  from tools.validation._fixtures import build_fixture
+  df = build_fixture(800, with_pe=True, with_pb=True, with_turnover=True)
+  df1 = with_last(df, pe_ttm=..., pb=...)
+"""
+
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.data.fetchers.fundamental_fetcher import create_mock_fundamental_arrays
+from src.strategies._ma_numba import ma_cross_lines, rolling_mean
+from src.strategies._macd_numba import ema, macd_lines
+from src.strategies.base import _equity_stats
+from src.strategies.turnover_helper import (_calc_relative_turnover_njit,
+                                            _relative_turnover_series_njit)
+from src.utils._njit import HAS_NUMBA
+
+
+def _warmup() -> None:
+    """用小数组调用一次 njit 内核，触发编译或加载磁盘缓存"""
+    if not HAS_NUMBA:
+        return
+    x = np.linspace(1.0, 2.0, 32)
+    ema(x, 12)
+    macd_lines(x, 12, 26, 9)
+    rolling_mean(x, 5)
+    ma_cross_lines(x, 5, 20)
+    _equity_stats(x, 0.0)
+    _calc_relative_turnover_njit(x, 20)
+    _relative_turnover_series_njit(x, 20)
+
+
+_warmup()
+
+
+@lru_cache(maxsize=None)
+def build_fixture(days: int = 800, seed: int = 42, with_pe: bool = False,
+                  with_pb: bool = False, with_turnover: bool = False,
+                  walk_std: float = 0.3, pe_range: tuple = (5, 30),
+                  pb_range: tuple = (0.5, 3.0)) -> pd.DataFrame:
+    """
+    随机游走日线（date/open/high/low/close/volume），按需附加换手率（%）与模拟 PE/PB。
+
+    与原 test_all_fundamental.create_test_data 逐个抽样一致（收盘价 10 + cumsum(randn * walk_std)，
+    按自然日排日期），seed 相同时数值完全相同，各脚本的输出与改造前可直接对比。
+
+    Args:
+        walk_std: 每日价格增量的标准差
+        pe_range / pb_range: 交给 create_mock_fundamental_arrays 的取值范围
+    """
+    rng = np.random.RandomState(seed)
+    close = 10 + np.cumsum(rng.randn(days) * walk_std)
+    volume = rng.randint(1000000, 10000000, days)
+    # 不要换手率时也照常抽样，保证后面 open/high/low 的随机序列不变
+    turnover = np.clip(rng.normal(2.0, 0.5, days), 0.1, 10.0)
+    cols = {
+        'date': pd.date_range('2020-01-01', periods=days, freq='D'),
+        'open': close + rng.randn(days) * 0.1,
+        'high': close + np.abs(rng.randn(days) * 0.2),
+        'low': close - np.abs(rng.randn(days) * 0.2),
+        'close': close,
+        'volume': volume,
+    }
+    if with_turnover:
+        cols['turnover_rate'] = turnover
+    if with_pe or with_pb:
+        # 直接拿与行对齐的数组作为列，不再先建表再按日期 merge
+        fund = create_mock_fundamental_arrays(close, pe_range=pe_range, pb_range=pb_range,
+                                              random_seed=seed)
+        if with_pe:
+            cols['pe_ttm'] = fund['pe_ttm']
+        if with_pb:
+            cols['pb'] = fund['pb']
+    return pd.DataFrame(cols, copy=False)
+
+
+def quantile_grid(df: pd.DataFrame, cols: tuple, qs: tuple) -> dict:
+    """
+    场景用的分位数表 {列: {分位: 值}}：所有列在一次 np.quantile(axis=0) 中算出，
+    各场景按表取值，不再对同一列反复 Series.quantile（每次都要重新排序）
+    """
+    values = np.quantile(df[list(cols)].to_numpy(dtype=np.float64), qs, axis=0)
+    return {c: dict(zip(qs, values[:, j])) for j, c in enumerate(cols)}
+
+
+def with_rally(df: pd.DataFrame, days: int = 5, gain: float = 1.1) -> pd.DataFrame:
+    """
+    派生一个最后 days 天收盘价都拉到前一日 gain 倍的场景（连续上涨），
+    只替换 close 一列，其余列与 df 共享
+    """
+    close = df['close'].to_numpy(copy=True)
+    close[-days:] = close[-days - 1] * gain
+    out = df.copy(deep=False)
+    out['close'] = close
+    return out
+
+
+def with_last(df: pd.DataFrame, **last_values) -> pd.DataFrame:
+    """
+    派生一个只改最后一天若干列的场景：浅拷贝后整列替换被改的列，
+    只复制这几列的数组，其余列与 df 共享，df 本身不受影响
+    """
+    out = df.copy(deep=False)
+    for col, value in last_values.items():
+        arr = df[col].to_numpy(copy=True)
+        arr[-1] = value
+        out[col] = arr
+    return out
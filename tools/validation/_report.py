@@ -0,0 +1,41 @@
+"""
+验证脚本共用的信号打印
+
+各 test_*.py 逐行 print 信号字段和 indicators.get(...)，这里拼成一段文本一次写出。
+只写 sys.stdout（不走 sys.stdout.buffer），以便 redirect_stdout 捕获并行场景的输出。
+"""
+
+import sys
+from typing import Iterable
+
+# 指标键 → 数值格式；未列出的按 str 输出
+FORMATS = {
+    'pe_quantile': '{:.3f}',
+    'pb_quantile': '{:.3f}',
+}
+
+
+def _fmt(key: str, value) -> str:
+    if value is None:
+        return 'N/A'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return FORMATS.get(key, '{}').format(value)
+    return str(value)
+
+
+def print_signal(signal, fields: Iterable[tuple] = (), indent: str = '  ') -> None:
+    """
+    打印信号的 动作/置信度/仓位/原因，以及 fields 指定的指标，末尾空一行
+
+    fields: [(标签, indicators 键), ...]，可带第三项作为缺失时的默认值（否则显示 N/A）
+    """
+    lines = [
+        f"{indent}信号: {signal.action}",
+        f"{indent}置信度: {signal.confidence:.2f}",
+        f"{indent}仓位: {signal.position:.2f}",
+        f"{indent}原因: {signal.reason}",
+    ]
+    for label, key, *default in fields:
+        value = signal.indicators.get(key, default[0] if default else None)
+        lines.append(f"{indent}{label}: {_fmt(key, value)}")
+    sys.stdout.write('\n'.join(lines) + '\n\n')
@@ -12,6 +12,10 @@
 
 import sys
 import os
+import io
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 import pandas as pd
@@ -21,38 +25,12 @@ from src.strategies.fundamental_pb import PBStrategy
 from src.strategies.fundamental_pe_pb import PE_PB_CombinedStrategy
 from src.strategies.ma_cross import MACrossStrategy
 from src.strategies.ensemble import EnsembleStrategy
-from src.data.fetchers.fundamental_fetcher import create_mock_fundamental_data
+from tools.validation._fixtures import build_fixture, quantile_grid, with_last, with_rally
+from tools.validation._report import print_signal
 
 def create_test_data():
-    """创建测试数据（包含PE、PB、换手率）"""
-    dates = pd.date_range('2020-01-01', periods=800, freq='D')
-    np.random.seed(42)
-    
-    # 模拟价格数据
-    prices = 10 + np.cumsum(np.random.randn(800) * 0.3)
-    
-    # 模拟成交量
-    volumes = np.random.randint(1000000, 10000000, 800)
-    
-    # 模拟换手率（单位：%）
-    turnover_rates = np.random.normal(2.0, 0.5, 800)
-    turnover_rates = np.clip(turnover_rates, 0.1, 10.0)
-    
-    df = pd.DataFrame({
-        'date': dates,
-        'open': prices + np.random.randn(800) * 0.1,
-        'high': prices + abs(np.random.randn(800) * 0.2),
-        'low': prices - abs(np.random.randn(800) * 0.2),
-        'close': prices,
-        'volume': volumes,
-        'turnover_rate': turnover_rates,
-    })
-    
-    # 添加模拟基本面数据
-    fund_df = create_mock_fundamental_data(df, pe_range=(5, 30), pb_range=(0.5, 3.0))
-    df = pd.merge(df, fund_df, on='date', how='left')
-    
-    return df
+    """测试数据（包含PE、PB、换手率），共享对象只读使用，场景用 with_last() 派生"""
+    return build_fixture(800, with_pe=True, with_pb=True, with_turnover=True)
 
 def test_pe_strategy(df):
     """测试PE策略"""
@@ -63,13 +41,10 @@ def test_pe_strategy(df):
     strategy = PEStrategy()
     signal = strategy.analyze(df)
     
-    print(f"  信号: {signal.action}")
-    print(f"  置信度: {signal.confidence:.2f}")
-    print(f"  仓位: {signal.position:.2f}")
-    print(f"  原因: {signal.reason}")
-    print(f"  PE分位数: {signal.indicators.get('pe_quantile', 'N/A'):.3f}")
-    print(f"  当前PE: {signal.indicators.get('pe_ttm', 'N/A')}")
-    print()
+    print_signal(signal, [
+        ('PE分位数', 'pe_quantile'),
+        ('当前PE', 'pe_ttm'),
+    ])
 
 def test_pb_strategy(df):
     """测试PB策略"""
@@ -80,14 +55,11 @@ def test_pb_strategy(df):
     strategy = PBStrategy()
     signal = strategy.analyze(df)
     
-    print(f"  信号: {signal.action}")
-    print(f"  置信度: {signal.confidence:.2f}")
-    print(f"  仓位: {signal.position:.2f}")
-    print(f"  原因: {signal.reason}")
-    print(f"  PB分位数: {signal.indicators.get('pb_quantile', 'N/A'):.3f}")
-    print(f"  当前PB: {signal.indicators.get('pb', 'N/A')}")
-    print(f"  ROE过滤: {signal.indicators.get('roe_filter', 'N/A')}")
-    print()
+    print_signal(signal, [
+        ('PB分位数', 'pb_quantile'),
+        ('当前PB', 'pb'),
+        ('ROE过滤', 'roe_filter'),
+    ])
 
 def test_pe_pb_combined(df):
     """测试PE+PB双因子策略"""
@@ -98,15 +70,12 @@ def test_pe_pb_combined(df):
     strategy = PE_PB_CombinedStrategy()
     signal = strategy.analyze(df)
     
-    print(f"  信号: {signal.action}")
-    print(f"  置信度: {signal.confidence:.2f}")
-    print(f"  仓位: {signal.position:.2f}")
-    print(f"  原因: {signal.reason}")
-    print(f"  PE分位数: {signal.indicators.get('pe_quantile', 'N/A'):.3f}")
-    print(f"  PB分位数: {signal.indicators.get('pb_quantile', 'N/A'):.3f}")
-    print(f"  PE信号: {signal.indicators.get('pe_signal', 'N/A')}")
-    print(f"  PB信号: {signal.indicators.get('pb_signal', 'N/A')}")
-    print()
+    print_signal(signal, [
+        ('PE分位数', 'pe_quantile'),
+        ('PB分位数', 'pb_quantile'),
+        ('PE信号', 'pe_signal'),
+        ('PB信号', 'pb_signal'),
+    ])
 
 def test_ma_with_turnover(df):
     """测试MA策略集成换手率辅助"""
@@ -117,13 +86,10 @@ def test_ma_with_turnover(df):
     strategy = MACrossStrategy()
     signal = strategy.analyze(df)
     
-    print(f"  信号: {signal.action}")
-    print(f"  置信度: {signal.confidence:.2f}")
-    print(f"  仓位: {signal.position:.2f}")
-    print(f"  原因: {signal.reason}")
-    print(f"  相对换手率: {signal.indicators.get('relative_turnover', 'N/A')}")
-    print(f"  量比: {signal.indicators.get('vol_ratio', 'N/A')}")
-    print()
+    print_signal(signal, [
+        ('相对换手率', 'relative_turnover'),
+        ('量比', 'vol_ratio'),
+    ])
 
 def test_ensemble_with_fundamental(df):
     """测试组合策略集成基本面策略"""
@@ -134,15 +100,12 @@ def test_ensemble_with_fundamental(df):
     ensemble = EnsembleStrategy()
     signal = ensemble.analyze(df)
     
-    print(f"  信号: {signal.action}")
-    print(f"  置信度: {signal.confidence:.2f}")
-    print(f"  仓位: {signal.position:.2f}")
-    print(f"  原因: {signal.reason}")
-    print(f"  投票详情: {signal.indicators.get('投票详情', {})}")
-    print(f"  买入票: {signal.indicators.get('买入票', 0)}")
-    print(f"  卖出票: {signal.indicators.get('卖出票', 0)}")
-    print(f"  观望票: {signal.indicators.get('观望票', 0)}")
-    print()
+    print_signal(signal, [
+        ('投票详情', '投票详情', {}),
+        ('买入票', '买入票', 0),
+        ('卖出票', '卖出票', 0),
+        ('观望票', '观望票', 0),
+    ])
 
 def test_extreme_scenarios():
     """测试极端场景"""
@@ -150,11 +113,13 @@ def test_extreme_scenarios():
     print("测试6: 极端场景验证")
     print("=" * 80)
     
+    base = create_test_data()
+    grid = quantile_grid(base, ('pe_ttm', 'pb'), (0.05, 0.5, 0.95))
+    pe_q, pb_q = grid['pe_ttm'], grid['pb']
+    
     # 场景1: PE和PB都极低估
     print("\n  场景1: PE和PB都极低估（应该强烈买入）")
-    df1 = create_test_data()
-    df1.loc[df1.index[-1], 'pe_ttm'] = df1['pe_ttm'].quantile(0.05)  # 5%分位
-    df1.loc[df1.index[-1], 'pb'] = df1['pb'].quantile(0.05)  # 5%分位
+    df1 = with_last(base, pe_ttm=pe_q[0.05], pb=pb_q[0.05])  # 均为5%分位
     
     strategy = PE_PB_CombinedStrategy()
     signal1 = strategy.analyze(df1)
@@ -162,21 +127,20 @@ def test_extreme_scenarios():
     
     # 场景2: PE高估但PB不高估（"或"逻辑，应该卖出）
     print("\n  场景2: PE高估但PB不高估（\"或\"逻辑，应该卖出）")
-    df2 = create_test_data()
-    df2.loc[df2.index[-1], 'pe_ttm'] = df2['pe_ttm'].quantile(0.95)  # 95%分位
-    df2.loc[df2.index[-1], 'pb'] = df2['pb'].quantile(0.5)  # 50%分位
+    df2 = with_last(base, pe_ttm=pe_q[0.95], pb=pb_q[0.5])  # PE 95%分位，PB 50%分位
     
     signal2 = strategy.analyze(df2)
     print(f"    信号: {signal2.action}, 置信度: {signal2.confidence:.2f}, 仓位: {signal2.position:.2f}")
     
     # 场景3: MA金叉 + 放量突破（换手率辅助应该增强信号）
     print("\n  场景3: MA金叉 + 放量突破（换手率辅助应该增强信号）")
-    df3 = create_test_data()
+    # 场景3/4 共用同一段调整后的价格，只有最后一天的换手率不同：价格只改一次
     # 调整价格形成金叉
-    df3.loc[df3.index[-5:], 'close'] = df3['close'].iloc[-6] * 1.1  # 连续上涨
+    rally = with_rally(base, days=5, gain=1.1)  # 连续上涨
+    avg_turnover = rally['turnover_rate'].iloc[-21:-1].mean()
+    
     # 放量（相对换手率>1.2）
-    avg_turnover = df3['turnover_rate'].iloc[-21:-1].mean()
-    df3.loc[df3.index[-1], 'turnover_rate'] = avg_turnover * 1.5
+    df3 = with_last(rally, turnover_rate=avg_turnover * 1.5)
     
     ma_strategy = MACrossStrategy()
     signal3 = ma_strategy.analyze(df3)
@@ -185,12 +149,8 @@ def test_extreme_scenarios():
     
     # 场景4: 流动性差（换手率<0.5，应该回避）
     print("\n  场景4: 流动性差（换手率<0.5，应该回避）")
-    df4 = create_test_data()
-    # 调整价格形成金叉
-    df4.loc[df4.index[-5:], 'close'] = df4['close'].iloc[-6] * 1.1
     # 缩量严重（相对换手率<0.5）
-    avg_turnover = df4['turnover_rate'].iloc[-21:-1].mean()
-    df4.loc[df4.index[-1], 'turnover_rate'] = avg_turnover * 0.3
+    df4 = with_last(rally, turnover_rate=avg_turnover * 0.3)
     
     signal4 = ma_strategy.analyze(df4)
     print(f"    信号: {signal4.action}, 置信度: {signal4.confidence:.2f}, 仓位: {signal4.position:.2f}")
@@ -198,22 +158,53 @@ def test_extreme_scenarios():
     
     print()
 
+_SCENARIOS = [
+    ('test_pe_strategy', True),
+    ('test_pb_strategy', True),
+    ('test_pe_pb_combined', True),
+    ('test_ma_with_turnover', True),
+    ('test_ensemble_with_fundamental', True),
+    ('test_extreme_scenarios', False),
+]
+
+
+def _run_captured(name: str, with_df: bool) -> str:
+    """子进程入口：运行一个场景并返回其打印输出（按名字查函数，便于 pickle）"""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        fn = globals()[name]
+        if with_df:
+            fn(create_test_data())
+        else:
+            fn()
+    return buf.getvalue()
+
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='基本面功能综合验证')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='并行进程数（默认1串行；各场景相互独立，输出按原顺序打印）')
+    args = parser.parse_args()
+
     print("\n" + "=" * 80)
     print("基本面功能综合验证")
     print("=" * 80 + "\n")
     
-    # 创建测试数据
-    df = create_test_data()
-    
     # 运行各项测试
-    test_pe_strategy(df)
-    test_pb_strategy(df)
-    test_pe_pb_combined(df)
-    test_ma_with_turnover(df)
-    test_ensemble_with_fundamental(df)
-    test_extreme_scenarios()
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(_SCENARIOS))) as ex:
+            outputs = list(ex.map(_run_captured, *zip(*_SCENARIOS)))
+        for out in outputs:
+            print(out, end='')
+    else:
+        df = create_test_data()
+        for name, with_df in _SCENARIOS:
+            fn = globals()[name]
+            if with_df:
+                fn(df)
+            else:
+                fn()
     
     print("=" * 80)
     print("验证完成")
@@ -39,21 +39,17 @@ def test_pe_strategy_with_industry():
     print("测试2: PE策略支持行业参数")
     print("=" * 80)
     
-    # 创建模拟数据
-    dates = pd.date_range('2020-01-01', periods=800, freq='D')
-    np.random.seed(42)
+    # 创建模拟数据（估值策略只读 pe_ttm/pb，不生成用不到的 OHLCV 列）
+    dates = pd.date_range('2020-01-01', periods=800, freq='B')
+    # 个股 PE（800）与测试2.3 的行业 PE（1000）一次抽出（局部 Generator，不动全局随机状态）
+    noise = np.random.default_rng(42).standard_normal(1800)
     
     # 模拟PE数据（银行股，PE通常较低）
-    pe_values = np.random.normal(8, 2, 800)  # 均值8，标准差2
+    pe_values = 8 + 2 * noise[:800]  # 均值8，标准差2
     pe_values = np.clip(pe_values, 3, 20)  # 限制在3-20之间
     
     df = pd.DataFrame({
         'date': dates,
-        'open': np.random.randn(800) * 10 + 10,
-        'high': np.random.randn(800) * 10 + 11,
-        'low': np.random.randn(800) * 10 + 9,
-        'close': np.random.randn(800) * 10 + 10,
-        'volume': np.random.randint(1000000, 10000000, 800),
         'pe_ttm': pe_values,
     })
     
@@ -76,7 +72,7 @@ def test_pe_strategy_with_industry():
     # 测试3: 使用行业PE数据（模拟同行业所有股票的PE数据）
     print("\n测试2.3: 使用行业PE数据（模拟同行业所有股票的PE数据）")
     # 模拟行业PE数据（银行行业，PE通常较低，范围3-15）
-    industry_pe = np.random.normal(7, 1.5, 1000)  # 1000个银行股的PE数据
+    industry_pe = 7 + 1.5 * noise[800:]  # 1000个银行股的PE数据
     industry_pe = np.clip(industry_pe, 3, 15)
     industry_pe_series = pd.Series(industry_pe)
     
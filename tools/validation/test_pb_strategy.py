@@ -16,6 +16,7 @@ import pandas as pd
 import numpy as np
 from src.strategies.fundamental_pb import PBStrategy
 from src.strategies.fundamental_pe_pb import PE_PB_CombinedStrategy
+from tools.validation._fixtures import quantile_grid, with_last
 
 def test_pb_strategy():
     """测试PB策略"""
@@ -23,21 +24,17 @@ def test_pb_strategy():
     print("测试1: PB策略")
     print("=" * 80)
     
-    # 创建模拟数据
-    dates = pd.date_range('2020-01-01', periods=800, freq='D')
-    np.random.seed(42)
+    # 创建模拟数据（估值策略只读 pe_ttm/pb，不生成用不到的 OHLCV 列）
+    dates = pd.date_range('2020-01-01', periods=800, freq='B')
+    # PB 与测试1.3 的 ROE 一次抽出（局部 Generator，不动全局随机状态）
+    noise = np.random.default_rng(42).standard_normal((2, 800))
     
     # 模拟PB数据（银行股，PB通常较低）
-    pb_values = np.random.normal(1.0, 0.3, 800)  # 均值1.0，标准差0.3
+    pb_values = 1.0 + 0.3 * noise[0]  # 均值1.0，标准差0.3
     pb_values = np.clip(pb_values, 0.3, 3.0)  # 限制在0.3-3.0之间
     
     df = pd.DataFrame({
         'date': dates,
-        'open': np.random.randn(800) * 10 + 10,
-        'high': np.random.randn(800) * 10 + 11,
-        'low': np.random.randn(800) * 10 + 9,
-        'close': np.random.randn(800) * 10 + 10,
-        'volume': np.random.randint(1000000, 10000000, 800),
         'pb': pb_values,
     })
     
@@ -61,9 +58,9 @@ def test_pb_strategy():
     
     # 测试3: 模拟ROE数据（测试ROE过滤）
     print("\n测试1.3: 模拟ROE数据（测试ROE过滤）")
-    df3 = df.copy()
+    df3 = df.copy(deep=False)  # 只新增一列，其余列与 df 共享
     # 添加ROE数据（最近3年都>8%）
-    roe_values = np.random.normal(12.0, 2.0, 800)  # 均值12%，标准差2%
+    roe_values = 12.0 + 2.0 * noise[1]  # 均值12%，标准差2%
     roe_values = np.clip(roe_values, 8.0, 20.0)  # 限制在8-20%之间
     df3['roe'] = roe_values
     
@@ -82,35 +79,32 @@ def test_pe_pb_combined_strategy():
     print("测试2: PE+PB双因子策略")
     print("=" * 80)
     
-    # 创建模拟数据（包含PE和PB）
-    dates = pd.date_range('2020-01-01', periods=800, freq='D')
-    np.random.seed(42)
+    # 创建模拟数据（包含PE和PB；估值策略不读 OHLCV，不生成这些列）
+    dates = pd.date_range('2020-01-01', periods=800, freq='B')
+    noise = np.random.default_rng(42).standard_normal((2, 800))
     
     # 模拟PE数据
-    pe_values = np.random.normal(10, 3, 800)
+    pe_values = 10 + 3 * noise[0]
     pe_values = np.clip(pe_values, 5, 30)
     
     # 模拟PB数据
-    pb_values = np.random.normal(1.5, 0.4, 800)
+    pb_values = 1.5 + 0.4 * noise[1]
     pb_values = np.clip(pb_values, 0.5, 3.0)
     
     df = pd.DataFrame({
         'date': dates,
-        'open': np.random.randn(800) * 10 + 10,
-        'high': np.random.randn(800) * 10 + 11,
-        'low': np.random.randn(800) * 10 + 9,
-        'close': np.random.randn(800) * 10 + 10,
-        'volume': np.random.randint(1000000, 10000000, 800),
         'pe_ttm': pe_values,
         'pb': pb_values,
     })
     
+    # 各场景用到的分位数一次算出
+    grid = quantile_grid(df, ('pe_ttm', 'pb'), (0.1, 0.5, 0.9))
+    pe_q, pb_q = grid['pe_ttm'], grid['pb']
+    
     # 测试1: 双低估（PE和PB都低估）
     print("\n测试2.1: 双低估（PE和PB都低估）")
     # 调整最后一天的PE和PB，使其都低估
-    df1 = df.copy()
-    df1.loc[df1.index[-1], 'pe_ttm'] = df1['pe_ttm'].quantile(0.1)  # 10%分位
-    df1.loc[df1.index[-1], 'pb'] = df1['pb'].quantile(0.1)  # 10%分位
+    df1 = with_last(df, pe_ttm=pe_q[0.1], pb=pb_q[0.1])  # 均为10%分位
     
     strategy1 = PE_PB_CombinedStrategy()
     signal1 = strategy1.analyze(df1)
@@ -121,9 +115,7 @@ def test_pe_pb_combined_strategy():
     
     # 测试2: 双高估（PE和PB都高估）
     print("\n测试2.2: 双高估（PE和PB都高估）")
-    df2 = df.copy()
-    df2.loc[df2.index[-1], 'pe_ttm'] = df2['pe_ttm'].quantile(0.9)  # 90%分位
-    df2.loc[df2.index[-1], 'pb'] = df2['pb'].quantile(0.9)  # 90%分位
+    df2 = with_last(df, pe_ttm=pe_q[0.9], pb=pb_q[0.9])  # 均为90%分位
     
     strategy2 = PE_PB_CombinedStrategy()
     signal2 = strategy2.analyze(df2)
@@ -132,9 +124,7 @@ def test_pe_pb_combined_strategy():
     
     # 测试3: PE高估但PB不高估（"或"逻辑，应该卖出）
     print("\n测试2.3: PE高估但PB不高估（\"或\"逻辑，应该卖出）")
-    df3 = df.copy()
-    df3.loc[df3.index[-1], 'pe_ttm'] = df3['pe_ttm'].quantile(0.9)  # PE高估
-    df3.loc[df3.index[-1], 'pb'] = df3['pb'].quantile(0.5)  # PB中性
+    df3 = with_last(df, pe_ttm=pe_q[0.9], pb=pb_q[0.5])  # PE高估，PB中性
     
     strategy3 = PE_PB_CombinedStrategy()
     signal3 = strategy3.analyze(df3)
@@ -145,9 +135,7 @@ def test_pe_pb_combined_strategy():
     
     # 测试4: PE低估但PB不低估（"与"逻辑，不应该买入）
     print("\n测试2.4: PE低估但PB不低估（\"与\"逻辑，不应该买入）")
-    df4 = df.copy()
-    df4.loc[df4.index[-1], 'pe_ttm'] = df4['pe_ttm'].quantile(0.1)  # PE低估
-    df4.loc[df4.index[-1], 'pb'] = df4['pb'].quantile(0.5)  # PB中性
+    df4 = with_last(df, pe_ttm=pe_q[0.1], pb=pb_q[0.5])  # PE低估，PB中性
     
     strategy4 = PE_PB_CombinedStrategy()
     signal4 = strategy4.analyze(df4)
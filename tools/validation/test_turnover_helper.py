@@ -21,6 +21,7 @@ from src.strategies.turnover_helper import (
     enhance_signal_with_turnover
 )
 from src.strategies.ma_cross import MACrossStrategy
+from tools.validation._fixtures import build_fixture, with_last
 
 def test_relative_turnover_rate():
     """测试相对换手率计算"""
@@ -28,32 +29,21 @@ def test_relative_turnover_rate():
     print("测试1: 相对换手率计算")
     print("=" * 80)
     
-    # 创建模拟数据
-    dates = pd.date_range('2020-01-01', periods=100, freq='D')
-    np.random.seed(42)
-    
     # 模拟换手率数据（单位：%）
     # 前80天：平均2%，最后20天：平均3%（放量）
-    turnover_base = np.random.normal(2.0, 0.3, 80)
-    turnover_recent = np.random.normal(3.0, 0.3, 20)
-    turnover_values = np.concatenate([turnover_base, turnover_recent])
-    turnover_values = np.clip(turnover_values, 0.1, 10.0)  # 限制在合理范围
+    rng = np.random.RandomState(42)
+    turnover_values = np.concatenate([rng.normal(2.0, 0.3, 80), rng.normal(3.0, 0.3, 20)])
+    np.clip(turnover_values, 0.1, 10.0, out=turnover_values)  # 限制在合理范围
     
-    df = pd.DataFrame({
-        'date': dates,
-        'open': np.random.randn(100) * 10 + 10,
-        'high': np.random.randn(100) * 10 + 11,
-        'low': np.random.randn(100) * 10 + 9,
-        'close': np.random.randn(100) * 10 + 10,
-        'volume': np.random.randint(1000000, 10000000, 100),
-        'turnover_rate': turnover_values,
-    })
+    df = build_fixture(100).assign(turnover_rate=turnover_values)
     
     relative_turnover = calc_relative_turnover_rate(df, ma_period=20)
     print(f"  相对换手率: {relative_turnover:.2f}倍")
     print(f"  当前换手率: {df['turnover_rate'].iloc[-1]:.2f}%")
-    print(f"  20日均换手率: {df['turnover_rate'].iloc[-21:-1].mean():.2f}%")
-    print(f"  预期相对换手率: {df['turnover_rate'].iloc[-1] / df['turnover_rate'].iloc[-21:-1].mean():.2f}倍")
+    tr = df['turnover_rate'].to_numpy()
+    base_mean = tr[-21:-1].mean()
+    print(f"  20日均换手率: {base_mean:.2f}%")
+    print(f"  预期相对换手率: {tr[-1] / base_mean:.2f}倍")
     print()
 
 def test_liquidity_filter():
@@ -88,23 +78,19 @@ def test_signal_enhancement():
     base_conf = 0.7
     base_pos = 0.8
     
-    # 测试突破信号
-    print("\n  突破信号:")
-    for rel_turnover in [0.5, 1.0, 1.5, 2.0]:
-        conf, pos, reason = enhance_signal_with_turnover(
-            'breakout', rel_turnover, base_conf, base_pos
-        )
-        print(f"    相对换手率={rel_turnover:.2f}: "
-              f"置信度 {base_conf:.2f}→{conf:.2f}, {reason}")
-    
-    # 测试回调信号
-    print("\n  回调信号:")
-    for rel_turnover in [0.5, 0.8, 1.0, 2.0]:
-        conf, pos, reason = enhance_signal_with_turnover(
-            'pullback', rel_turnover, base_conf, base_pos
-        )
-        print(f"    相对换手率={rel_turnover:.2f}: "
-              f"置信度 {base_conf:.2f}→{conf:.2f}, {reason}")
+    # (标题, 信号类型, 相对换手率取值)
+    cases = [
+        ("突破信号", 'breakout', [0.5, 1.0, 1.5, 2.0]),
+        ("回调信号", 'pullback', [0.5, 0.8, 1.0, 2.0]),
+    ]
+    for title, signal_type, rel_values in cases:
+        print(f"\n  {title}:")
+        for rel_turnover in rel_values:
+            conf, pos, reason = enhance_signal_with_turnover(
+                signal_type, rel_turnover, base_conf, base_pos
+            )
+            print(f"    相对换手率={rel_turnover:.2f}: "
+                  f"置信度 {base_conf:.2f}→{conf:.2f}, {reason}")
     print()
 
 def test_ma_strategy_with_turnover():
@@ -115,56 +101,42 @@ def test_ma_strategy_with_turnover():
     
     # 创建模拟数据（包含换手率）
     dates = pd.date_range('2020-01-01', periods=200, freq='D')
-    np.random.seed(42)
+    rng = np.random.RandomState(42)
     
     # 模拟价格数据（形成金叉）
-    prices = 10 + np.cumsum(np.random.randn(200) * 0.5)
+    prices = 10 + np.cumsum(rng.randn(200) * 0.5)
     
     # 模拟换手率数据
-    turnover_values = np.random.normal(2.0, 0.5, 200)
-    turnover_values = np.clip(turnover_values, 0.1, 10.0)
+    turnover_values = np.clip(rng.normal(2.0, 0.5, 200), 0.1, 10.0)
     
     df = pd.DataFrame({
         'date': dates,
-        'open': prices + np.random.randn(200) * 0.1,
-        'high': prices + abs(np.random.randn(200) * 0.2),
-        'low': prices - abs(np.random.randn(200) * 0.2),
+        'open': prices + rng.randn(200) * 0.1,
+        'high': prices + abs(rng.randn(200) * 0.2),
+        'low': prices - abs(rng.randn(200) * 0.2),
         'close': prices,
-        'volume': np.random.randint(1000000, 10000000, 200),
+        'volume': rng.randint(1000000, 10000000, 200),
         'turnover_rate': turnover_values,
     })
     
     strategy = MACrossStrategy(short_window=5, long_window=20)
-    
-    # 测试1: 正常换手率
-    print("\n  测试4.1: 正常换手率（相对换手率≈1.0）")
-    signal1 = strategy.analyze(df)
-    print(f"    信号: {signal1.action}, 置信度: {signal1.confidence:.2f}, "
-          f"仓位: {signal1.position:.2f}")
-    print(f"    原因: {signal1.reason}")
-    print(f"    相对换手率: {signal1.indicators.get('relative_turnover', 'N/A')}")
-    
-    # 测试2: 放量突破（相对换手率>1.2）
-    print("\n  测试4.2: 放量突破（相对换手率>1.2）")
-    df2 = df.copy()
-    # 最后一天放量
-    df2.loc[df2.index[-1], 'turnover_rate'] = df2['turnover_rate'].iloc[-21:-1].mean() * 1.5
-    signal2 = strategy.analyze(df2)
-    print(f"    信号: {signal2.action}, 置信度: {signal2.confidence:.2f}, "
-          f"仓位: {signal2.position:.2f}")
-    print(f"    原因: {signal2.reason}")
-    print(f"    相对换手率: {signal2.indicators.get('relative_turnover', 'N/A')}")
-    
-    # 测试3: 流动性差（相对换手率<0.5）
-    print("\n  测试4.3: 流动性差（相对换手率<0.5）")
-    df3 = df.copy()
-    # 最后一天缩量严重
-    df3.loc[df3.index[-1], 'turnover_rate'] = df3['turnover_rate'].iloc[-21:-1].mean() * 0.3
-    signal3 = strategy.analyze(df3)
-    print(f"    信号: {signal3.action}, 置信度: {signal3.confidence:.2f}, "
-          f"仓位: {signal3.position:.2f}")
-    print(f"    原因: {signal3.reason}")
-    print(f"    相对换手率: {signal3.indicators.get('relative_turnover', 'N/A')}")
+    # 20日均换手率（不含当日）只算一次，场景只替换最后一天的换手率
+    base_mean = df['turnover_rate'].to_numpy()[-21:-1].mean()
+    
+    # (编号, 场景说明, 最后一天换手率相对20日均值的倍数；None 表示原始数据)
+    scenarios = [
+        ("4.1", "正常换手率（相对换手率≈1.0）", None),
+        ("4.2", "放量突破（相对换手率>1.2）", 1.5),
+        ("4.3", "流动性差（相对换手率<0.5）", 0.3),
+    ]
+    for no, desc, factor in scenarios:
+        print(f"\n  测试{no}: {desc}")
+        case_df = df if factor is None else with_last(df, turnover_rate=base_mean * factor)
+        signal = strategy.analyze(case_df)
+        print(f"    信号: {signal.action}, 置信度: {signal.confidence:.2f}, "
+              f"仓位: {signal.position:.2f}")
+        print(f"    原因: {signal.reason}")
+        print(f"    相对换手率: {signal.indicators.get('relative_turnover', 'N/A')}")
     
     print()
 